@@ -0,0 +1 @@
+"""Benchmarks for understatapi, run with ``asv run``"""
@@ -0,0 +1,55 @@
+# pylint: disable=unused-argument
+# pylint: disable=attribute-defined-outside-init
+"""Benchmarks for decoding AJAX responses"""
+
+import json
+from understatapi.decoders import get_decoder
+from .common import read_resource
+
+
+class DecodeAjax:
+    """Decode the raw bytes of AJAX responses with each JSON backend"""
+
+    params = (
+        ["json", "orjson", "msgspec"],
+        [
+            "data/league_ajax.json",
+            "data/player_ajax.json",
+            "data/match_ajax.json",
+        ],
+    )
+    param_names = ["decoder", "payload"]
+
+    def setup(self, decoder: str, payload: str) -> None:
+        """Read the payload and load the decoder"""
+        self.content = read_resource(payload)
+        try:
+            self.decode = get_decoder(decoder)
+        except ImportError as err:
+            raise NotImplementedError(str(err)) from err
+
+    def time_decode(self, decoder: str, payload: str) -> None:
+        """Time to decode the payload from bytes"""
+        self.decode(self.content)
+
+
+class DecodeAjaxText:
+    """
+    Decode AJAX responses the way ``requests.Response.json()`` does, by
+    decoding the bytes to text first, as a baseline for ``DecodeAjax``
+    """
+
+    params = [
+        "data/league_ajax.json",
+        "data/player_ajax.json",
+        "data/match_ajax.json",
+    ]
+    param_names = ["payload"]
+
+    def setup(self, payload: str) -> None:
+        """Read the payload"""
+        self.content = read_resource(payload)
+
+    def time_decode(self, payload: str) -> None:
+        """Time to decode the payload via text"""
+        json.loads(self.content.decode("utf-8"))
@@ -0,0 +1,137 @@
+# pylint: disable=unused-argument
+# pylint: disable=attribute-defined-outside-init
+"""
+Benchmarks for end-to-end endpoint calls, with the network replaced by a
+transport which answers every request from the fixtures
+"""
+
+from typing import Any, Callable, Dict
+import requests
+from requests.adapters import HTTPAdapter
+from understatapi import UnderstatClient
+from understatapi.endpoints import BaseEndpoint
+from understatapi.throttle import ThrottledHTTPAdapter
+from .common import peak_size, read_resource, traced_size
+
+# The fixture which answers requests to each AJAX endpoint
+ROUTES = {
+    "getLeagueData": "data/league_ajax.json",
+    "getPlayerData": "data/player_ajax.json",
+    "getTeamData": "data/team_ajax.json",
+    "getMatchData": "data/match_ajax.json",
+}
+
+CALLS: Dict[str, Callable[[UnderstatClient], Any]] = {
+    "league.get_player_data": lambda understat: understat.league(
+        "EPL"
+    ).get_player_data(season="2020"),
+    "league.get_match_data": lambda understat: understat.league(
+        "EPL"
+    ).get_match_data(season="2020"),
+    "player.get_shot_data": lambda understat: understat.player(
+        "647"
+    ).get_shot_data(),
+    "team.get_player_data": lambda understat: understat.team(
+        "Manchester_United"
+    ).get_player_data(season="2020"),
+    "match.get_shot_data": lambda understat: understat.match(
+        "14717"
+    ).get_shot_data(),
+}
+
+
+class _FixtureTransport(HTTPAdapter):
+    """Answer requests from the fixtures instead of the network"""
+
+    def __init__(self, **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        self.contents = {
+            name: read_resource(path) for name, path in ROUTES.items()
+        }
+
+    def send(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+        self,
+        request: requests.PreparedRequest,
+        stream: bool = False,
+        timeout: Any = None,
+        verify: Any = True,
+        cert: Any = None,
+        proxies: Any = None,
+    ) -> requests.Response:
+        path = str(request.url)[len(BaseEndpoint.base_url) :]
+        response = requests.Response()
+        response.status_code = 200
+        response.url = str(request.url)
+        response.request = request
+        response.headers["Content-Type"] = "application/json"
+        response._content = self.contents[  # pylint: disable=protected-access
+            path.split("/", 1)[0]
+        ]
+        return response
+
+
+class FixtureAdapter(ThrottledHTTPAdapter, _FixtureTransport):
+    """
+    The client's adapter, with only the network replaced, so that every
+    other layer of a request is measured
+    """
+
+
+def make_client(cache: bool) -> UnderstatClient:
+    """Create a client whose requests are answered from the fixtures"""
+    understat = UnderstatClient(cache_maxsize=128 if cache else 0)
+    understat.session.mount(BaseEndpoint.base_url, FixtureAdapter())
+    return understat
+
+
+class EndpointCall:
+    """
+    Time and memory of a call to an endpoint accessor, from sending the
+    request to returning the data. Without the cache every call decodes
+    the payload again, with it only the first call does
+    """
+
+    params = (list(CALLS), [False, True])
+    param_names = ["call", "cache"]
+
+    def setup(self, call: str, cache: bool) -> None:
+        """Create the client, and warm its cache if it has one"""
+        self.understat = make_client(cache)
+        self.call = CALLS[call]
+        self.call(self.understat)
+
+    def teardown(self, call: str, cache: bool) -> None:
+        """Close the client"""
+        self.understat.session.close()
+
+    def time_call(self, call: str, cache: bool) -> None:
+        """Time to call the accessor"""
+        self.call(self.understat)
+
+    def track_peak_memory(self, call: str, cache: bool) -> int:
+        """Peak bytes allocated while calling the accessor"""
+        return peak_size(lambda: self.call(self.understat))
+
+    track_peak_memory.unit = "bytes"  # type: ignore[attr-defined]
+
+
+class EndpointFootprint:
+    """Memory held by a client after a call, including its cached payload"""
+
+    params = list(CALLS)
+    param_names = ["call"]
+
+    def setup(self, call: str) -> None:
+        """Look up the call"""
+        self.call = CALLS[call]
+
+    def make_call(self) -> Any:
+        """Create a client and call the accessor, keeping both alive"""
+        understat = make_client(cache=True)
+        return understat, self.call(understat)
+
+    def track_retained_memory(self, call: str) -> int:
+        """Bytes still held by the client and the data it returned"""
+        return traced_size(self.make_call)
+
+    track_retained_memory.unit = "bytes"  # type: ignore[attr-defined]
@@ -0,0 +1,86 @@
+# pylint: disable=unused-argument
+# pylint: disable=attribute-defined-outside-init
+"""
+Benchmarks for fetching many matches at once over HTTP/1.1, with the
+client's session, and over HTTP/2, with
+:class:`~understatapi.transport.HTTP2Transport`. Both talk to a local
+:class:`~understatapi.replay.StandInServer` which answers every match
+from the fixtures after a fixed latency
+"""
+
+import tempfile
+from understatapi import UnderstatClient
+from understatapi.replay import RecordingStore, StandInServer
+from understatapi.transport import HTTP2Transport
+from .bench_endpoints import ROUTES
+from .common import read_resource
+
+MATCHES = [str(14000 + i) for i in range(200)]
+
+# Seconds the stand-in server waits before answering each request
+LATENCY = 0.02
+
+
+class ManyMatches:
+    """
+    Time to get the shots of 200 matches with a batch call, and the
+    number of connections it opens
+    """
+
+    params = (["http1.1", "http2"], [8, 32])
+    param_names = ["protocol", "workers"]
+    timeout = 120
+
+    def setup(self, protocol: str, workers: int) -> None:
+        """Record the matches, start the server and create the client"""
+        # pylint: disable=consider-using-with
+        self.tmpdir = tempfile.TemporaryDirectory()
+        store = RecordingStore(self.tmpdir.name)
+        content = read_resource(ROUTES["getMatchData"])
+        for match_id in MATCHES:
+            store.set(f"getMatchData/{match_id}", content)
+        self.server = StandInServer(
+            self.tmpdir.name, latency=LATENCY, http2=protocol == "http2"
+        )
+        self.server.start()
+        self.transport = (
+            HTTP2Transport(prior_knowledge=True)
+            if protocol == "http2"
+            else None
+        )
+        self.understat = UnderstatClient(
+            cache_maxsize=0,
+            pool_maxsize=workers,
+            base_url=self.server.url,
+            transport=self.transport,
+        )
+
+    def teardown(self, protocol: str, workers: int) -> None:
+        """Close the client and stop the server"""
+        self.understat.__exit__(None, None, None)
+        self.server.stop()
+        self.tmpdir.cleanup()
+
+    def fetch(self, workers: int) -> None:
+        """Get the shots of every match"""
+        result = self.understat.match(MATCHES).get_shot_data(
+            max_workers=workers
+        )
+        if result.errors:
+            raise next(iter(result.errors.values()))
+
+    def time_get_shot_data(self, protocol: str, workers: int) -> None:
+        """Time to get the shots of every match"""
+        self.fetch(workers)
+
+    def track_connections(self, protocol: str, workers: int) -> int:
+        """Number of connections open after getting the shots of every match"""
+        self.fetch(workers)
+        # pylint: disable=protected-access
+        if self.transport is not None:
+            return len(self.transport.client._transport._pool.connections)
+        adapter = self.understat.session.get_adapter(self.server.url)
+        pools = adapter.poolmanager.pools
+        return sum(pools[key].num_connections for key in pools.keys())
+
+    track_connections.unit = "connections"  # type: ignore[attr-defined]
@@ -0,0 +1,100 @@
+# pylint: disable=unused-argument
+# pylint: disable=attribute-defined-outside-init
+"""Benchmarks for the memory used by typed records and columns"""
+
+import json
+from typing import Any
+from understatapi.columns import np, pa, to_columns
+from understatapi.models import Fixture, Player, Shot, to_records
+from .common import read_resource, traced_size
+
+ROWS = {
+    "shots": ("data/player_ajax.json", "shots", Shot),
+    "players": ("data/league_ajax.json", "players", Player),
+    "dates": ("data/league_ajax.json", "dates", Fixture),
+}
+
+
+class TypedRecords:
+    """
+    Memory held by a decoded payload as dictionaries and as typed records,
+    and the time taken to build the records
+    """
+
+    params = (list(ROWS), [False, True])
+    param_names = ["rows", "typed"]
+
+    def setup(self, rows: str, typed: bool) -> None:
+        """Read the payload"""
+        payload, self.key, self.record_type = ROWS[rows]
+        self.content = read_resource(payload)
+
+    def build(self, typed: bool) -> Any:
+        """Decode the payload, converting the rows to records if ``typed``"""
+        data = json.loads(self.content)[self.key]
+        if typed:
+            return to_records(self.record_type, data)
+        return data
+
+    def track_memory(self, rows: str, typed: bool) -> int:
+        """Bytes held by the decoded rows"""
+        return traced_size(lambda: self.build(typed))
+
+    track_memory.unit = "bytes"  # type: ignore[attr-defined]
+
+    def track_memory_cached(self, rows: str, typed: bool) -> int:
+        """
+        Bytes held by the decoded rows while the client's cache also holds
+        the dictionaries the records were built from
+        """
+
+        def build() -> Any:
+            data = json.loads(self.content)[self.key]
+            if typed:
+                return data, to_records(self.record_type, data)
+            return data
+
+        return traced_size(build)
+
+    track_memory_cached.unit = "bytes"  # type: ignore[attr-defined]
+
+    def time_build(self, rows: str, typed: bool) -> None:
+        """Time to decode the payload and build the rows"""
+        self.build(typed)
+
+
+class ShotColumns:
+    """
+    Memory held by a player's shots, and the time taken to build them, for
+    each result format
+    """
+
+    params = ["dicts", "records", "columns", "arrow"]
+    param_names = ["format"]
+
+    def setup(self, format_: str) -> None:
+        """Read the payload"""
+        if format_ == "arrow" and pa is None:
+            raise NotImplementedError("pyarrow is not installed")
+        if format_ == "columns" and np is None:
+            raise NotImplementedError("numpy is not installed")
+        self.content = read_resource("data/player_ajax.json")
+
+    def build(self, format_: str) -> Any:
+        """Decode the payload and build the shots in the given format"""
+        shots = json.loads(self.content)["shots"]
+        if format_ == "records":
+            return to_records(Shot, shots)
+        if format_ in ("columns", "arrow"):
+            return to_columns(Shot, shots, format_)
+        return shots
+
+    def track_memory(self, format_: str) -> int:
+        """Bytes held by the shots"""
+        return traced_size(lambda: self.build(format_))
+
+    track_memory.unit = "bytes"  # type: ignore[attr-defined]
+
+    def time_build(self, format_: str) -> None:
+        """Time to decode the payload and build the shots"""
+        self.build(format_)
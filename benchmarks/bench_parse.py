@@ -0,0 +1,73 @@
+# pylint: disable=unused-argument
+# pylint: disable=attribute-defined-outside-init
+"""Benchmarks for extracting data from understat's html pages"""
+
+from understatapi.parsers import BaseParser
+from understatapi.parsers.base import extract
+from .common import peak_size, read_resource
+
+# The datasets embedded in each page, as ``<page>:<query>``
+DATASETS = [
+    "league_epl.html:datesData",
+    "league_epl.html:teamsData",
+    "league_epl.html:playersData",
+    "player.html:matchesData",
+    "player.html:shotsData",
+    "match.html:shotsData",
+    "match.html:rostersData",
+    "team.html:playersData",
+]
+
+PAGES = {
+    "league_epl.html": ["datesData", "teamsData", "playersData"],
+    "player.html": [
+        "groupsData",
+        "minMaxPlayerStats",
+        "shotsData",
+        "matchesData",
+    ],
+    "match.html": ["shotsData", "rostersData"],
+    "team.html": ["datesData", "statisticsData", "playersData"],
+}
+
+
+class ParseDataset:
+    """Extract one dataset from a page with ``BaseParser.parse``"""
+
+    params = DATASETS
+    param_names = ["dataset"]
+
+    def setup(self, dataset: str) -> None:
+        """Read the page"""
+        page, self.query = dataset.split(":")
+        self.html = read_resource(page).decode("utf-8")
+
+    def time_parse(self, dataset: str) -> None:
+        """Time to extract the dataset from a page"""
+        BaseParser.parse(self.html, self.query)
+
+    def track_peak_memory(self, dataset: str) -> int:
+        """Peak bytes allocated while extracting the dataset"""
+        return peak_size(lambda: BaseParser.parse(self.html, self.query))
+
+    track_peak_memory.unit = "bytes"  # type: ignore[attr-defined]
+
+
+class ParsePage:
+    """Extract every dataset from a page, as a caller needing all of it does"""
+
+    params = list(PAGES)
+    param_names = ["page"]
+
+    def setup(self, page: str) -> None:
+        """Read the page"""
+        self.html = read_resource(page).decode("utf-8")
+
+    def time_parse(self, page: str) -> None:
+        """Time to extract every dataset, one at a time"""
+        for query in PAGES[page]:
+            BaseParser.parse(self.html, query)
+
+    def time_extract(self, page: str) -> None:
+        """Time to extract every dataset, scanning the page once"""
+        extract(self.html)
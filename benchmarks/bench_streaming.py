@@ -0,0 +1,46 @@
+# pylint: disable=unused-argument
+# pylint: disable=attribute-defined-outside-init
+"""Benchmarks for streaming one section of a league payload"""
+
+import json
+from typing import Any, Iterator
+from understatapi.streaming import ijson, iter_section
+from .common import peak_size, read_resource
+
+CHUNK_SIZE = 1 << 16
+
+
+class StreamLeaguePlayers:
+    """
+    Read the players from a league payload which arrives in chunks, by
+    decoding the whole document or by streaming the ``players`` section
+    """
+
+    params = ["json", "python", "ijson"]
+    param_names = ["method"]
+
+    def setup(self, method: str) -> None:
+        """Split the payload into chunks"""
+        if method == "ijson" and ijson is None:
+            raise NotImplementedError("ijson is not installed")
+        data = read_resource("data/league_ajax.json")
+        self.chunks = [
+            data[i : i + CHUNK_SIZE] for i in range(0, len(data), CHUNK_SIZE)
+        ]
+
+    def players(self, method: str) -> Iterator[Any]:
+        """Yield the players"""
+        if method == "json":
+            return iter(json.loads(b"".join(self.chunks))["players"])
+        return iter_section(self.chunks, "players", backend=method)
+
+    def time_players(self, method: str) -> None:
+        """Time to read every player"""
+        for _ in self.players(method):
+            pass
+
+    def track_peak_memory(self, method: str) -> int:
+        """Peak bytes allocated while reading every player"""
+        return peak_size(lambda: self.time_players(method))
+
+    track_peak_memory.unit = "bytes"  # type: ignore[attr-defined]
@@ -0,0 +1,134 @@
+# pylint: disable=unused-argument
+# pylint: disable=attribute-defined-outside-init
+"""Benchmarks for transferring large ``getLeagueData`` payloads"""
+
+import gzip
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from understatapi import UnderstatClient
+from .common import read_resource
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+LEAGUE_PAYLOAD = "data/league_ajax.json"
+
+
+def compress(data: bytes, encoding: str) -> bytes:
+    """Compress data with a HTTP content encoding"""
+    if encoding == "gzip":
+        return gzip.compress(data)
+    if encoding == "br":
+        if brotli is None:
+            raise NotImplementedError("brotli is not installed")
+        return brotli.compress(data)
+    return data
+
+
+def decompress(data: bytes, encoding: str) -> bytes:
+    """Decompress data with a HTTP content encoding"""
+    if encoding == "gzip":
+        return gzip.decompress(data)
+    if encoding == "br":
+        return brotli.decompress(data)
+    return data
+
+
+class TransferSize:
+    """Bytes on the wire, and the cost of decoding them, per encoding"""
+
+    params = ["identity", "gzip", "br"]
+    param_names = ["encoding"]
+
+    def setup(self, encoding: str) -> None:
+        """Compress the league payload"""
+        self.compressed = compress(read_resource(LEAGUE_PAYLOAD), encoding)
+
+    def track_size(self, encoding: str) -> int:
+        """Size of the payload on the wire"""
+        return len(self.compressed)
+
+    track_size.unit = "bytes"  # type: ignore[attr-defined]
+
+    def time_decompress(self, encoding: str) -> None:
+        """Time to decompress the payload"""
+        decompress(self.compressed, encoding)
+
+
+class _PayloadHandler(BaseHTTPRequestHandler):
+    """Serve the league payload, compressed if the client asks for it"""
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    bodies: dict = {}
+
+    def do_GET(self) -> None:  # pylint: disable=invalid-name
+        """Handle a GET request"""
+        accepted = self.headers.get("Accept-Encoding", "")
+        encoding = "identity"
+        for candidate in ("br", "gzip"):
+            if candidate in accepted and candidate in self.bodies:
+                encoding = candidate
+                break
+        body = self.bodies[encoding]
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        if encoding != "identity":
+            self.send_header("Content-Encoding", encoding)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args) -> None:  # pylint: disable=arguments-differ
+        """Do not log requests"""
+
+
+class SessionTransfer:
+    """
+    Time ten sequential requests for the league payload from a local
+    server, with and without connection reuse and compression
+
+    The client's ``base_url`` points at the local server, so the requests
+    go through the league endpoint and the adapter mounted for it, and
+    its payload cache is disabled so that every call reaches the server
+    """
+
+    params = ([True, False], [True, False])
+    param_names = ["keep_alive", "compress"]
+    number = 1
+    repeat = 5
+
+    def setup(self, keep_alive: bool, compress_: bool) -> None:
+        """Start a local server and create a client"""
+        data = read_resource(LEAGUE_PAYLOAD)
+        _PayloadHandler.bodies = {
+            "identity": data,
+            "gzip": gzip.compress(data),
+        }
+        if brotli is not None:
+            _PayloadHandler.bodies["br"] = brotli.compress(data)
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _PayloadHandler)
+        self.thread = threading.Thread(
+            target=self.server.serve_forever, daemon=True
+        )
+        self.thread.start()
+        self.url = f"http://127.0.0.1:{self.server.server_port}/"
+        self.understat = UnderstatClient(
+            keep_alive=keep_alive,
+            compress=compress_,
+            cache_maxsize=0,
+            base_url=self.url,
+        )
+
+    def teardown(self, keep_alive: bool, compress_: bool) -> None:
+        """Stop the server and close the client"""
+        self.understat.__exit__(None, None, None)
+        self.server.shutdown()
+        self.server.server_close()
+
+    def time_requests(self, keep_alive: bool, compress_: bool) -> None:
+        """Time ten sequential requests"""
+        for _ in range(10):
+            self.understat.league(league="EPL").get_player_data(season="2019")
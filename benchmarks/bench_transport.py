@@ -0,0 +1,93 @@
+# pylint: disable=unused-argument
+# pylint: disable=attribute-defined-outside-init
+"""
+Benchmarks for each transport on its own, and for an endpoint call over
+each of them, with every payload read from the fixtures. Comparing the
+transports shows what each layer between an endpoint and the network
+costs
+"""
+
+import os
+import tempfile
+from typing import Callable, Dict
+from understatapi import UnderstatClient
+from understatapi.replay import RecordingStore, StandInServer
+from understatapi.transport import (
+    BASE_URL,
+    CachedTransport,
+    MemoryTransport,
+    ReplayTransport,
+    RequestsTransport,
+    Transport,
+)
+from .bench_endpoints import ROUTES, FixtureAdapter
+from .common import read_resource
+
+PATH = "getPlayerData/647"
+
+TRANSPORTS: Dict[str, Callable[[str, StandInServer], Transport]] = {
+    # Payloads held in memory, with no HTTP stack at all
+    "memory": lambda tmpdir, server: MemoryTransport(
+        {PATH: read_resource(ROUTES["getPlayerData"])}
+    ),
+    # A ``requests`` session whose adapter answers from the fixtures
+    "requests": lambda tmpdir, server: RequestsTransport(
+        adapter=FixtureAdapter()
+    ),
+    # Recordings read from disk for every request
+    "replay": lambda tmpdir, server: ReplayTransport(tmpdir),
+    # Requests over a local socket to a server answering from the recordings
+    "http": lambda tmpdir, server: RequestsTransport(base_url=server.url),
+    # The persistent cache, which never revalidates once it has a response
+    "cached": lambda tmpdir, server: CachedTransport(
+        os.path.join(tmpdir, "cache.sqlite"),
+        max_age=float("inf"),
+        base_url=server.url,
+    ),
+}
+
+
+class TransportGet:
+    """
+    Time of a request for a player's data through each transport, and of
+    the same request made by an endpoint, including decoding the payload
+    """
+
+    params = list(TRANSPORTS)
+    param_names = ["transport"]
+
+    def setup(self, transport: str) -> None:
+        """Record the payload, start the server and build the transport"""
+        # pylint: disable=consider-using-with
+        self.tmpdir = tempfile.TemporaryDirectory()
+        RecordingStore(self.tmpdir.name).set(
+            PATH, read_resource(ROUTES["getPlayerData"])
+        )
+        self.server = StandInServer(self.tmpdir.name)
+        self.server.start()
+        self.transport = TRANSPORTS[transport](self.tmpdir.name, self.server)
+        base_url = (
+            BASE_URL if transport in ("memory", "requests", "replay") else None
+        )
+        self.url = (base_url or self.server.url) + PATH
+        self.understat = UnderstatClient(
+            cache_maxsize=0,
+            transport=self.transport,
+            base_url=base_url or self.server.url,
+        )
+        self.transport.get(self.url).raise_for_status()
+
+    def teardown(self, transport: str) -> None:
+        """Stop the server and release the transport"""
+        self.understat.session.close()
+        self.transport.close()
+        self.server.stop()
+        self.tmpdir.cleanup()
+
+    def time_get(self, transport: str) -> None:
+        """Time to get the response"""
+        self.transport.get(self.url).raise_for_status()
+
+    def time_endpoint(self, transport: str) -> None:
+        """Time for an endpoint to get and decode the response"""
+        self.understat.player("647").get_shot_data()
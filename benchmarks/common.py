@@ -0,0 +1,50 @@
+"""Helpers shared by the benchmarks"""
+
+import os
+import tracemalloc
+from typing import Any, Callable
+from understatapi.columns import pa
+
+RESOURCES = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "test", "resources"
+)
+
+
+def read_resource(name: str) -> bytes:
+    """
+    Read one of the test fixtures
+
+    :param name: Path to the fixture, relative to ``test/resources``
+    """
+    with open(os.path.join(RESOURCES, name), "rb") as fh:
+        return fh.read()
+
+
+def arrow_allocated() -> int:
+    """Bytes currently allocated by Arrow, which ``tracemalloc`` cannot see"""
+    return pa.total_allocated_bytes() if pa is not None else 0
+
+
+def traced_size(build: Callable[[], Any]) -> int:
+    """Bytes still allocated by ``build()`` once it has returned"""
+    arrow_before = arrow_allocated()
+    tracemalloc.start()
+    try:
+        result = build()
+        size, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    size += arrow_allocated() - arrow_before
+    del result
+    return size
+
+
+def peak_size(run: Callable[[], Any]) -> int:
+    """The most bytes allocated at once while ``run()`` was running"""
+    tracemalloc.start()
+    try:
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak
@@ -1,3 +1,4 @@
+# pylint: disable=unused-argument
 """Mock the requests library"""
 
 import json
@@ -8,47 +9,59 @@ class MockResponse:
     """Mock response from requests.get()"""
 
     def __init__(self, url=None, status_code=200, reason="OK", **kwargs):
-        # Accept and ignore extra kwargs like 'headers' that requests.get() accepts
+        # Accept and ignore extra kwargs like 'headers' that requests.get()
+        # accepts
         self.url = url
         self.status_code = status_code
         self.reason = reason
+        self.headers = {}
 
     @property
     def content(self):
         """Response.content"""
-        with open(self.url) as file:
+        with open(self.url, encoding="utf-8") as file:
             content = file.read()
         return content
 
     @property
     def text(self):
         """Response.content"""
-        with open(self.url) as file:
+        with open(self.url, encoding="utf-8") as file:
             text = file.read()
         return text
 
     def json(self):
         """Response.json()"""
-        with open(self.url) as file:
+        with open(self.url, encoding="utf-8") as file:
             return json.load(file)
 
+    def iter_content(self, chunk_size=1):
+        """Response.iter_content()"""
+        with open(self.url, "rb") as file:
+            while True:
+                chunk = file.read(chunk_size)
+                if not chunk:
+                    return
+                yield chunk
+
+    def close(self):
+        """Response.close()"""
+
     def raise_for_status(self):
         """Raises ``HTTPError``, if one occurred."""
 
         http_error_msg = ""
         reason = self.reason
         if 400 <= self.status_code < 500:
-            http_error_msg = "%s Client Error: %s for url: %s" % (
-                self.status_code,
-                reason,
-                self.url,
+            http_error_msg = (
+                f"{self.status_code} Client Error: {reason} "
+                f"for url: {self.url}"
             )
 
         elif 500 <= self.status_code < 600:
-            http_error_msg = "%s Server Error: %s for url: %s" % (
-                self.status_code,
-                reason,
-                self.url,
+            http_error_msg = (
+                f"{self.status_code} Server Error: {reason} "
+                f"for url: {self.url}"
             )
 
         if http_error_msg:
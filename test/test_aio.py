@@ -0,0 +1,253 @@
+# pylint: disable=unused-argument
+"""Test the asynchronous client"""
+
+import asyncio
+import json
+import time
+import unittest
+from unittest.mock import patch
+import httpx
+from understatapi import AsyncUnderstatClient
+from understatapi.endpoints import BaseEndpoint
+from understatapi.exceptions import InvalidMatch, InvalidLeague
+from understatapi.throttle import RateLimiter, RetryPolicy
+
+URL = "https://understat.com/getMatchData/1"
+
+
+def mocked_httpx_get(path, status_code=200):
+    """Return a coroutine function which mocks ``httpx.AsyncClient.get()``"""
+
+    async def get(url, **kwargs):
+        with open(path, "rb") as fh:
+            content = fh.read()
+        return httpx.Response(
+            status_code, content=content, request=httpx.Request("GET", url)
+        )
+
+    return get
+
+
+def slow(get):
+    """Make a mocked ``httpx.AsyncClient.get()`` yield to the event loop"""
+
+    async def slow_get(url, **kwargs):
+        await asyncio.sleep(0.01)
+        return await get(url, **kwargs)
+
+    return slow_get
+
+
+def read_json(path):
+    """Read json data"""
+    with open(path, "r", encoding="utf-8") as fh:
+        return json.load(fh)
+
+
+class TestAsyncEndpoints(unittest.IsolatedAsyncioTestCase):
+    """Test that async endpoints return the expected output"""
+
+    async def asyncSetUp(self):
+        # pylint: disable=attribute-defined-outside-init
+        self.understat = AsyncUnderstatClient()
+
+    async def asyncTearDown(self):
+        await self.understat.aclose()
+
+    async def test_match_get_shot_data(self):
+        """test ``match.get_shot_data()``"""
+        get = mocked_httpx_get("test/resources/data/match_ajax.json")
+        with patch.object(httpx.AsyncClient, "get", side_effect=get):
+            data = await self.understat.match("1").get_shot_data()
+        expected = read_json("test/resources/data/match_shotsdata.json")
+        self.assertDictEqual(data, expected)
+
+    async def test_league_accessors_share_request(self):
+        """test that league accessors share one request through the cache"""
+        get = mocked_httpx_get("test/resources/data/league_ajax.json")
+        with patch.object(httpx.AsyncClient, "get", side_effect=get) as mock:
+            league = self.understat.league("EPL")
+            teams = await league.get_team_data(season="2019")
+            players = await league.get_player_data(season="2019")
+            dates = await league.get_match_data(season="2019")
+        self.assertEqual(mock.call_count, 1)
+        self.assertDictEqual(
+            teams, read_json("test/resources/data/league_teamsdata.json")
+        )
+        self.assertEqual(
+            len(players),
+            len(read_json("test/resources/data/league_playersdata.json")),
+        )
+        self.assertEqual(
+            len(dates),
+            len(read_json("test/resources/data/league_datesdata.json")),
+        )
+
+    async def test_concurrent_requests(self):
+        """test gathering requests for several players at once"""
+        get = mocked_httpx_get("test/resources/data/player_ajax.json")
+        with patch.object(httpx.AsyncClient, "get", side_effect=get) as mock:
+            results = await asyncio.gather(
+                *(
+                    player.get_season_data()
+                    for player in self.understat.player(["1", "2", "3"])
+                )
+            )
+        self.assertEqual(mock.call_count, 3)
+        expected = read_json("test/resources/data/player_groupsdata.json")
+        for result in results:
+            self.assertDictEqual(result, expected)
+
+    async def test_identical_requests_shared(self):
+        """test that coroutines asking for the same payload share a request"""
+        get = slow(mocked_httpx_get("test/resources/data/match_ajax.json"))
+        understat = AsyncUnderstatClient(cache_maxsize=0)
+        with patch.object(httpx.AsyncClient, "get", side_effect=get) as mock:
+            results = await asyncio.gather(
+                *(understat.match("1").get_shot_data() for _ in range(5))
+            )
+        await understat.aclose()
+        self.assertEqual(mock.call_count, 1)
+        self.assertEqual(understat.cache.shared, 4)
+        for result in results:
+            self.assertIs(result, results[0])
+
+    async def test_failed_identical_requests(self):
+        """test that an error is raised for every waiting coroutine"""
+        get = slow(
+            mocked_httpx_get("test/resources/data/match_ajax.json", 500)
+        )
+        with patch.object(httpx.AsyncClient, "get", side_effect=get) as mock:
+            results = await asyncio.gather(
+                *(self.understat.match("1").get_shot_data() for _ in range(3)),
+                return_exceptions=True,
+            )
+        self.assertEqual(mock.call_count, 1)
+        for result in results:
+            self.assertIsInstance(result, InvalidMatch)
+
+    async def test_team_get_context_data(self):
+        """test ``team.get_context_data()``"""
+        get = mocked_httpx_get("test/resources/data/team_ajax.json")
+        with patch.object(httpx.AsyncClient, "get", side_effect=get):
+            data = await self.understat.team("team").get_context_data("2019")
+        expected = read_json("test/resources/data/team_statisticsdata.json")
+        self.assertDictEqual(data, expected)
+
+    async def test_invalid_match(self):
+        """test that a 404 raises an InvalidMatch error"""
+        get = mocked_httpx_get("test/resources/data/match_ajax.json", 404)
+        with patch.object(httpx.AsyncClient, "get", side_effect=get):
+            with self.assertRaises(InvalidMatch):
+                await self.understat.match("1").get_roster_data()
+
+    async def test_invalid_league(self):
+        """test that an invalid league raises an InvalidLeague error"""
+        with self.assertRaises(InvalidLeague):
+            await self.understat.league("dummy").get_team_data("2019")
+
+    async def test_type_error(self):
+        """test that a non-string primary attribute raises a TypeError"""
+        with self.assertRaises(TypeError):
+            await self.understat.player(None).get_shot_data()
+
+    async def test_standalone(self):
+        """test that async endpoints do not inherit the blocking endpoint"""
+        self.assertNotIsInstance(self.understat.match("1"), BaseEndpoint)
+        self.assertEqual(len(self.understat.match(["1", "2"])), 2)
+
+    async def test_headers_not_mutated(self):
+        """test that the caller's headers are not changed"""
+        get = mocked_httpx_get("test/resources/data/match_ajax.json")
+        headers = {"User-Agent": "test"}
+        with patch.object(httpx.AsyncClient, "get", side_effect=get) as mock:
+            await self.understat.match("1").get_shot_data(headers=headers)
+        self.assertEqual(headers, {"User-Agent": "test"})
+        sent = mock.call_args.kwargs["headers"]
+        self.assertEqual(sent["X-Requested-With"], "XMLHttpRequest")
+
+    async def test_context_manager(self):
+        """test that the context manager closes the connection pool"""
+        async with AsyncUnderstatClient() as understat:
+            pass
+        self.assertTrue(understat.client.is_closed)
+
+
+@patch("understatapi.aio.endpoints.asyncio.sleep")
+class TestAsyncThrottling(unittest.IsolatedAsyncioTestCase):
+    """Tests for rate limits, retries and metrics of the asynchronous client"""
+
+    async def test_retry_until_success(self, mock_sleep):
+        """test that failed requests are retried and reported"""
+        failed = mocked_httpx_get("test/resources/data/match_ajax.json", 503)
+        get = mocked_httpx_get("test/resources/data/match_ajax.json")
+        async with AsyncUnderstatClient(
+            retry_policy=RetryPolicy(max_retries=2, jitter=False), metrics=True
+        ) as understat:
+            retries = []
+            understat.hooks.register("retry", retries.append)
+            with patch.object(
+                httpx.AsyncClient,
+                "get",
+                side_effect=[await failed(URL), await get(URL)],
+            ) as mock:
+                data = await understat.match("1").get_shot_data()
+        self.assertEqual(mock.call_count, 2)
+        self.assertEqual(
+            data, read_json("test/resources/data/match_shotsdata.json")
+        )
+        self.assertEqual([event.status_code for event in retries], [503])
+        mock_sleep.assert_awaited_once_with(0.5)
+        lines = understat.metrics.render().splitlines()
+        self.assertIn(
+            'understat_requests_total{endpoint="getMatchData",status="200"} 1',
+            lines,
+        )
+        self.assertIn(
+            "understat_cache_lookups_total"
+            '{endpoint="getMatchData",result="miss"} 1',
+            lines,
+        )
+
+    async def test_retries_exhausted(self, mock_sleep):
+        """test that the error of the last attempt is raised"""
+        get = mocked_httpx_get("test/resources/data/match_ajax.json", 503)
+        async with AsyncUnderstatClient(
+            retry_policy=RetryPolicy(max_retries=2)
+        ) as understat:
+            with patch.object(
+                httpx.AsyncClient, "get", side_effect=get
+            ) as mock:
+                with self.assertRaises(InvalidMatch):
+                    await understat.match("1").get_shot_data()
+        self.assertEqual(mock.call_count, 3)
+
+    async def test_connection_error(self, mock_sleep):
+        """test that connection errors are retried"""
+        get = mocked_httpx_get("test/resources/data/match_ajax.json")
+        error = httpx.ConnectError("refused")
+        async with AsyncUnderstatClient(
+            retry_policy=RetryPolicy()
+        ) as understat:
+            with patch.object(
+                httpx.AsyncClient, "get", side_effect=[error, await get(URL)]
+            ):
+                await understat.match("1").get_shot_data()
+        mock_sleep.assert_awaited_once()
+
+    async def test_rate_limit(self, mock_sleep):
+        """test that requests wait for the rate limiter"""
+        get = mocked_httpx_get("test/resources/data/match_ajax.json")
+        async with AsyncUnderstatClient(
+            rate_limit=10, cache_maxsize=0
+        ) as understat:
+            understat.rate_limiter = RateLimiter(rate=10, burst=1)
+            mock_sleep.side_effect = time.sleep
+            with patch.object(httpx.AsyncClient, "get", side_effect=get):
+                await understat.match("1").get_shot_data()
+                await understat.match("2").get_shot_data()
+        self.assertGreater(mock_sleep.await_args.args[0], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+# pylint: disable=unused-argument
+"""Test calling accessors on endpoints with several primary attributes"""
+
+from concurrent.futures import ThreadPoolExecutor
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+from test import mocked_requests_get
+import requests
+from understatapi import UnderstatClient
+from understatapi.endpoints import BatchResult
+from understatapi.exceptions import InvalidMatch
+
+
+def mocked_match_get(url, **kwargs):
+    """Mock ``requests.Session.get()``, failing for the match ``bad``"""
+    status_code = 404 if url.endswith("/bad") else 200
+    return mocked_requests_get(
+        "test/resources/data/match_ajax.json", status_code=status_code
+    )
+
+
+@patch.object(requests.Session, "get", side_effect=mocked_match_get)
+class TestFanOut(unittest.TestCase):
+    """Tests for concurrent batch requests"""
+
+    def setUp(self):
+        self.understat = UnderstatClient()
+
+    def tearDown(self):
+        self.understat.session.close()
+
+    def test_batch_result(self, mock_get):
+        """test that a batch call returns data keyed by match id"""
+        match_ids = ["3", "1", "2"]
+        data = self.understat.match(match_ids).get_shot_data()
+        single = self.understat.match("1").get_shot_data()
+        self.assertIsInstance(data, BatchResult)
+        self.assertEqual(list(data), match_ids)
+        for match_id in match_ids:
+            with self.subTest(match=match_id):
+                self.assertDictEqual(data[match_id], single)
+        self.assertEqual(data.errors, {})
+
+    def test_batch_errors(self, mock_get):
+        """test that errors are reported per item"""
+        data = self.understat.match(["1", "bad", "2"]).get_roster_data()
+        self.assertEqual(list(data), ["1", "2"])
+        self.assertEqual(list(data.errors), ["bad"])
+        self.assertIsInstance(data.errors["bad"], InvalidMatch)
+
+    def test_batch_decode_error(self, mock_get):
+        """test that a payload which cannot be decoded is reported per item"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            malformed = os.path.join(tmpdir, "malformed.json")
+            with open(malformed, "w", encoding="utf-8") as file:
+                file.write('{"shots": [')
+
+            def mocked_malformed_get(url, **kwargs):
+                if url.endswith("/malformed"):
+                    return mocked_requests_get(malformed)
+                return mocked_match_get(url, **kwargs)
+
+            mock_get.side_effect = mocked_malformed_get
+            data = self.understat.match(["1", "malformed"]).get_shot_data()
+        self.assertEqual(list(data), ["1"])
+        self.assertIsInstance(data.errors["malformed"], ValueError)
+
+    def test_max_workers(self, mock_get):
+        """test that ``max_workers`` bounds the thread pool"""
+        with patch(
+            "understatapi.endpoints.base.ThreadPoolExecutor",
+            wraps=ThreadPoolExecutor,
+        ) as executor:
+            self.understat.match(["1", "2", "3"]).get_match_info(max_workers=2)
+            executor.assert_called_once_with(max_workers=2)
+
+    def test_max_workers_single(self, mock_get):
+        """test that ``max_workers`` is not passed on to requests"""
+        self.understat.match("1").get_match_info(max_workers=2)
+        self.assertNotIn("max_workers", mock_get.call_args.kwargs)
+
+    def test_empty_batch(self, mock_get):
+        """test a batch call with no primary attributes"""
+        data = self.understat.match([]).get_shot_data()
+        self.assertEqual(data, {})
+        mock_get.assert_not_called()
+
+    def test_batch_invalid_season(self, mock_get):
+        """test that validation errors are reported per item"""
+        data = self.understat.league(["EPL", "La_Liga"]).get_team_data("2013")
+        self.assertEqual(data, {})
+        self.assertEqual(list(data.errors), ["EPL", "La_Liga"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,328 @@
+# pylint: disable=unused-argument
+"""Test the payload cache"""
+
+import asyncio
+import datetime
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+from test import mocked_requests_get
+import requests
+from understatapi import UnderstatClient
+from understatapi.cache import CachePolicy, PayloadCache, season_of
+
+
+class TestPayloadCache(unittest.TestCase):
+    """Tests for ``PayloadCache``"""
+
+    def test_get_set(self):
+        """test that a stored payload is returned and counted as a hit"""
+        cache = PayloadCache()
+        self.assertIsNone(cache.get("key"))
+        cache.set("key", {"a": 1})
+        self.assertEqual(cache.get("key"), {"a": 1})
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_lru_eviction(self):
+        """test that the least recently used payload is evicted"""
+        cache = PayloadCache(maxsize=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        self.assertIn("a", cache)
+        self.assertNotIn("b", cache)
+        self.assertIn("c", cache)
+
+    def test_ttl_expiry(self):
+        """test that payloads expire after ``ttl`` seconds"""
+        cache = PayloadCache(ttl=10)
+        with patch("understatapi.cache.time.monotonic", return_value=0):
+            cache.set("a", 1)
+        with patch("understatapi.cache.time.monotonic", return_value=11):
+            self.assertIsNone(cache.get("a"))
+        self.assertEqual(len(cache), 0)
+
+    def test_disabled(self):
+        """test that ``maxsize=0`` disables the cache"""
+        cache = PayloadCache(maxsize=0)
+        cache.set("a", 1)
+        self.assertIsNone(cache.get("a"))
+
+    def test_invalid_maxsize(self):
+        """test that a negative ``maxsize`` raises a ValueError"""
+        with self.assertRaises(ValueError):
+            PayloadCache(maxsize=-1)
+
+    def test_invalidate_and_clear(self):
+        """test explicit invalidation"""
+        cache = PayloadCache()
+        cache.set("a", 1)
+        cache.set("b", 2)
+        self.assertTrue(cache.invalidate("a"))
+        self.assertFalse(cache.invalidate("a"))
+        cache.clear()
+        self.assertEqual(
+            cache.stats(),
+            {
+                "hits": 0,
+                "misses": 0,
+                "shared": 0,
+                "size": 0,
+                "maxsize": 128,
+                "ttl": 300.0,
+            },
+        )
+
+
+def wait_for_shared(cache, count):
+    """Wait until ``count`` loads are waiting for one in progress"""
+    deadline = time.monotonic() + 5
+    while cache.shared < count and time.monotonic() < deadline:
+        time.sleep(0.001)
+
+
+class TestCachePolicy(unittest.TestCase):
+    """Tests for ``CachePolicy``"""
+
+    def setUp(self):
+        self.policy = CachePolicy(current_season=2021)
+
+    def test_season(self):
+        """test that the season is read from league and team keys"""
+        self.assertEqual(self.policy.season("getLeagueData/EPL/2016"), 2016)
+        self.assertEqual(self.policy.season("/team/Arsenal/2019"), 2019)
+        self.assertIsNone(self.policy.season("getPlayerData/647"))
+        self.assertIsNone(self.policy.season("getTeamData/Arsenal/latest"))
+
+    def test_seasons(self):
+        """test that only finished seasons are immutable"""
+        self.assertTrue(self.policy.is_immutable("getLeagueData/EPL/2016"))
+        self.assertTrue(self.policy.is_immutable("getTeamData/Arsenal/2020"))
+        self.assertFalse(self.policy.is_immutable("getLeagueData/EPL/2021"))
+        self.assertFalse(self.policy.is_immutable("getPlayerData/647"))
+
+    def test_matches(self):
+        """test that played matches are immutable"""
+        self.assertFalse(self.policy.is_immutable("getMatchData/1"))
+        self.policy.observe(
+            "getLeagueData/EPL/2021",
+            {
+                "dates": [
+                    {"id": "1", "isResult": True},
+                    {"id": "2", "isResult": False},
+                ]
+            },
+        )
+        self.assertTrue(self.policy.is_immutable("getMatchData/1"))
+        self.assertFalse(self.policy.is_immutable("getMatchData/2"))
+        self.assertTrue(
+            self.policy.is_immutable(
+                "getMatchData/3", {"tmpl": {"season": "2019"}}
+            )
+        )
+
+    def test_current_season(self):
+        """test that the current season starts in the summer"""
+        self.assertEqual(season_of(datetime.date(2022, 3, 1)), 2021)
+        self.assertEqual(season_of(datetime.date(2022, 8, 1)), 2022)
+        self.assertEqual(
+            CachePolicy().current_season, season_of(datetime.date.today())
+        )
+
+    def test_payload_cache(self):
+        """test that immutable payloads do not expire"""
+        cache = PayloadCache(ttl=10, policy=self.policy)
+        with patch("understatapi.cache.time.monotonic", return_value=0):
+            cache.set("getLeagueData/EPL/2016", 1)
+            cache.set("getLeagueData/EPL/2021", 2)
+        with patch("understatapi.cache.time.monotonic", return_value=1e6):
+            self.assertEqual(cache.get("getLeagueData/EPL/2016"), 1)
+            self.assertIsNone(cache.get("getLeagueData/EPL/2021"))
+
+
+class TestSingleFlight(unittest.TestCase):
+    """Tests for ``PayloadCache.get_or_load()``"""
+
+    def setUp(self):
+        self.cache = PayloadCache(maxsize=0)
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.calls = 0
+
+    def load(self, error=None):
+        """Block until released, then return a payload or raise"""
+        self.calls += 1
+        self.started.set()
+        self.release.wait(5)
+        if error is not None:
+            raise error
+        return {"a": 1}
+
+    def run_concurrently(self, load, count=8):
+        """Call ``get_or_load()`` from several threads at once"""
+        with ThreadPoolExecutor(max_workers=count) as executor:
+            futures = [executor.submit(self.cache.get_or_load, "key", load)]
+            self.started.wait(5)
+            futures += [
+                executor.submit(self.cache.get_or_load, "key", load)
+                for _ in range(count - 1)
+            ]
+            wait_for_shared(self.cache, count - 1)
+            self.release.set()
+        return futures
+
+    def test_concurrent_loads_shared(self):
+        """test that concurrent loads of one key make a single call"""
+        futures = self.run_concurrently(self.load)
+        results = [future.result() for future in futures]
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(self.cache.shared, 7)
+        self.assertTrue(all(result is results[0] for result in results))
+
+    def test_errors_shared(self):
+        """test that every waiting caller sees the error, and it is not kept"""
+        futures = self.run_concurrently(
+            lambda: self.load(ValueError("failed"))
+        )
+        for future in futures:
+            with self.assertRaises(ValueError):
+                future.result()
+        self.assertEqual(self.cache.get_or_load("key", self.load), {"a": 1})
+        self.assertEqual(self.calls, 2)
+
+    def test_cached(self):
+        """test that a cached payload is returned without loading"""
+        cache = PayloadCache()
+        cache.set("key", {"b": 2})
+        self.assertEqual(cache.get_or_load("key", self.load), {"b": 2})
+        self.assertEqual(self.calls, 0)
+
+
+class TestSingleFlightAsync(unittest.TestCase):
+    """Tests for ``PayloadCache.get_or_load_async()``"""
+
+    def setUp(self):
+        self.cache = PayloadCache(maxsize=0)
+        self.calls = 0
+
+    async def load(self):
+        """Yield to the event loop, then return a payload"""
+        self.calls += 1
+        await asyncio.sleep(0.05)
+        return {"a": 1}
+
+    def test_leader_cancelled(self):
+        """test that cancelling the first caller does not cancel the others"""
+
+        async def main():
+            leader = asyncio.ensure_future(
+                self.cache.get_or_load_async("key", self.load)
+            )
+            await asyncio.sleep(0)
+            waiter = asyncio.ensure_future(
+                self.cache.get_or_load_async("key", self.load)
+            )
+            await asyncio.sleep(0)
+            leader.cancel()
+            return await waiter
+
+        self.assertEqual(asyncio.run(main()), {"a": 1})
+        self.assertEqual((self.calls, self.cache.shared), (1, 1))
+
+    def test_event_loops(self):
+        """test that loads in separate event loops do not share futures"""
+
+        def run():
+            return asyncio.run(
+                asyncio.wait_for(
+                    self.cache.get_or_load_async("key", self.load), 5
+                )
+            )
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            results = list(executor.map(lambda _: run(), range(2)))
+        self.assertEqual(results, [{"a": 1}, {"a": 1}])
+        self.assertEqual(self.calls, 2)
+
+
+@patch.object(requests.Session, "get", side_effect=mocked_requests_get)
+class TestEndpointCaching(unittest.TestCase):
+    """Test that endpoints share payloads through the client cache"""
+
+    def setUp(self):
+        self.understat = UnderstatClient()
+        self.url = "test/resources/data/league_ajax.json"
+
+    def tearDown(self):
+        self.understat.session.close()
+
+    def test_accessors_share_request(self, mock_get):
+        """test that every league accessor uses a single request"""
+        mock_get.side_effect = lambda *args, **kwargs: mocked_requests_get(
+            self.url
+        )
+        league = self.understat.league("EPL")
+        league.get_team_data(season="2019")
+        league.get_match_data(season="2019")
+        self.understat.league("EPL").get_player_data(season="2019")
+        self.assertEqual(mock_get.call_count, 1)
+        self.assertEqual(self.understat.cache.hits, 2)
+        self.assertEqual(self.understat.cache.misses, 1)
+
+    def test_iterated_endpoints_share_cache(self, mock_get):
+        """test that endpoints created by iteration share the cache"""
+        for league in self.understat.league(["EPL", "La_Liga"]):
+            self.assertIs(league.cache, self.understat.cache)
+
+    def test_errors_not_cached(self, mock_get):
+        """test that failed requests are not cached"""
+        with self.assertRaises(requests.HTTPError):
+            self.understat.league("EPL").get_team_data(
+                season="2019", status_code=500
+            )
+        self.assertEqual(len(self.understat.cache), 0)
+
+    def test_cache_disabled(self, mock_get):
+        """test that ``cache_maxsize=0`` makes a request every time"""
+        mock_get.side_effect = lambda *args, **kwargs: mocked_requests_get(
+            self.url
+        )
+        understat = UnderstatClient(cache_maxsize=0)
+        league = understat.league("EPL")
+        league.get_team_data(season="2019")
+        league.get_player_data(season="2019")
+        self.assertEqual(mock_get.call_count, 2)
+
+    def test_concurrent_requests_shared(self, mock_get):
+        """test that threads asking for the same payload share a request"""
+        release = threading.Event()
+
+        def get(*args, **kwargs):
+            release.wait(5)
+            return mocked_requests_get("test/resources/data/match_ajax.json")
+
+        mock_get.side_effect = get
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            futures = [
+                executor.submit(self.understat.match("1").get_shot_data)
+                for _ in range(8)
+            ]
+            wait_for_shared(self.understat.cache, 7)
+            release.set()
+        shots = [future.result() for future in futures]
+        self.assertEqual(mock_get.call_count, 1)
+        self.assertTrue(all(shot is shots[0] for shot in shots))
+
+    def test_cache_key_params(self, mock_get):
+        """test that query parameters are part of the cache key"""
+        self.assertEqual(
+            self.understat.league("EPL")._cache_key("path", {"b": 2, "a": 1}),
+            "path?a=1&b=2",
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+"""Test the configuration of the client's session"""
+
+import unittest
+from requests.utils import DEFAULT_ACCEPT_ENCODING
+from understatapi import UnderstatClient
+from understatapi.throttle import ThrottledHTTPAdapter
+
+URL = "https://understat.com/getLeagueData/EPL/2019"
+
+
+class TestSessionConfiguration(unittest.TestCase):
+    """Test the connection pool and compression options"""
+
+    def test_pool_size(self):
+        """test that the pool options are passed to the adapter"""
+        with UnderstatClient(pool_connections=4, pool_maxsize=32) as understat:
+            adapter = understat.session.get_adapter(URL)
+            self.assertIsInstance(adapter, ThrottledHTTPAdapter)
+            self.assertEqual(
+                adapter.poolmanager.connection_pool_kw["maxsize"], 32
+            )
+            self.assertEqual(adapter.poolmanager.pools._maxsize, 4)
+
+    def test_pool_block(self):
+        """test that ``pool_block`` is passed to the adapter"""
+        with UnderstatClient(pool_block=True) as understat:
+            adapter = understat.session.get_adapter(URL)
+            self.assertTrue(adapter.poolmanager.connection_pool_kw["block"])
+
+    def test_keep_alive(self):
+        """test disabling connection reuse"""
+        with UnderstatClient(keep_alive=False) as understat:
+            self.assertEqual(understat.session.headers["Connection"], "close")
+        with UnderstatClient() as understat:
+            self.assertEqual(
+                understat.session.headers["Connection"], "keep-alive"
+            )
+
+    def test_compression(self):
+        """test negotiating compressed responses"""
+        with UnderstatClient() as understat:
+            self.assertEqual(
+                understat.session.headers["Accept-Encoding"],
+                DEFAULT_ACCEPT_ENCODING,
+            )
+            self.assertIn("gzip", understat.session.headers["Accept-Encoding"])
+        with UnderstatClient(compress=False) as understat:
+            self.assertEqual(
+                understat.session.headers["Accept-Encoding"], "identity"
+            )
+
+    def test_keyword_only(self):
+        """test that the options cannot be passed positionally"""
+        with self.assertRaises(TypeError):
+            UnderstatClient(0)  # pylint: disable=too-many-function-args
+
+
+if __name__ == "__main__":
+    unittest.main()
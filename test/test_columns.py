@@ -0,0 +1,146 @@
+# pylint: disable=unused-argument
+"""Test the columnar result formats"""
+
+import json
+import unittest
+from unittest.mock import patch
+from test import mocked_requests_get
+import requests
+from understatapi import UnderstatClient
+from understatapi.columns import Categorical, np, pa, to_columns
+from understatapi.models import Player, Shot
+
+
+def read_rows(name):
+    """Read the rows of one of the fixtures"""
+    with open(f"test/resources/data/{name}", encoding="utf-8") as file:
+        return json.load(file)
+
+
+@unittest.skipIf(np is None, "numpy is not installed")
+class TestNumpyColumns(unittest.TestCase):
+    """Tests for ``format="columns"``"""
+
+    def setUp(self):
+        self.rows = read_rows("player_shotsdata.json")
+        self.columns = to_columns(Shot, self.rows, "columns")
+
+    def test_dtypes(self):
+        """test that each column has the type of its field"""
+        self.assertEqual(list(self.columns), list(Shot._fields))
+        self.assertEqual(self.columns["xG"].dtype, np.float32)
+        self.assertEqual(self.columns["X"].dtype, np.float32)
+        self.assertEqual(self.columns["match_id"].dtype, np.int32)
+        self.assertEqual(self.columns["date"].dtype, object)
+
+    def test_values(self):
+        """test that values match the rows they were built from"""
+        for index in (0, len(self.rows) - 1):
+            row = self.rows[index]
+            self.assertAlmostEqual(
+                float(self.columns["xG"][index]), float(row["xG"]), places=6
+            )
+            self.assertEqual(self.columns["minute"][index], int(row["minute"]))
+            self.assertEqual(self.columns["date"][index], row["date"])
+
+    def test_categorical(self):
+        """test that categorical columns decode to the original values"""
+        result = self.columns["result"]
+        self.assertIsInstance(result, Categorical)
+        self.assertEqual(result.codes.dtype, np.int32)
+        decoded = [result.categories[code] for code in result.codes]
+        self.assertEqual(decoded, [row["result"] for row in self.rows])
+
+    def test_missing(self):
+        """test how missing values are represented"""
+        columns = to_columns(
+            Shot, [{"id": "1", "player_assisted": None}], "columns"
+        )
+        self.assertEqual(columns["player_assisted"].codes[0], -1)
+        self.assertTrue(np.isnan(columns["xG"][0]))
+        self.assertEqual(columns["minute"][0], -1)
+
+    def test_empty(self):
+        """test building columns from no rows"""
+        columns = to_columns(Player, [], "columns")
+        self.assertEqual(len(columns["xG"]), 0)
+        self.assertEqual(columns["position"].categories, [])
+
+
+@unittest.skipIf(pa is None, "pyarrow is not installed")
+class TestArrowColumns(unittest.TestCase):
+    """Tests for ``format="arrow"``"""
+
+    def test_table(self):
+        """test the schema and contents of the table"""
+        rows = read_rows("league_playersdata.json")
+        table = to_columns(Player, rows, "arrow")
+        self.assertEqual(table.num_rows, len(rows))
+        self.assertEqual(table.schema.field("npxG").type, pa.float32())
+        self.assertEqual(table.schema.field("games").type, pa.int32())
+        self.assertTrue(
+            pa.types.is_dictionary(table.schema.field("position").type)
+        )
+        self.assertEqual(
+            table.column("team_title").to_pylist(),
+            [row["team_title"] for row in rows],
+        )
+
+    def test_missing(self):
+        """test that missing values are null"""
+        table = to_columns(Shot, [{"id": "1"}], "arrow")
+        self.assertIsNone(table.column("xG")[0].as_py())
+        self.assertIsNone(table.column("result")[0].as_py())
+
+
+class TestInvalidFormat(unittest.TestCase):
+    """Test an unknown format"""
+
+    def test_invalid_format(self):
+        """test that an unknown format raises a ValueError"""
+        with self.assertRaises(ValueError):
+            to_columns(Shot, [], "pandas")
+
+
+@unittest.skipIf(np is None or pa is None, "numpy or pyarrow is not installed")
+@patch.object(requests.Session, "get")
+class TestEndpointFormat(unittest.TestCase):
+    """Tests for passing ``format`` to the endpoints"""
+
+    def setUp(self):
+        self.understat = UnderstatClient()
+
+    def tearDown(self):
+        self.understat.session.close()
+
+    def test_player_shot_data(self, mock_get):
+        """test ``format`` for a player's shots"""
+        mock_get.return_value = mocked_requests_get(
+            "test/resources/data/player_ajax.json"
+        )
+        shots = self.understat.player("647").get_shot_data(format="columns")
+        self.assertEqual(shots["xG"].dtype, np.float32)
+        table = self.understat.player("647").get_shot_data(format="arrow")
+        self.assertEqual(table.num_rows, len(shots["id"]))
+
+    def test_league_player_data(self, mock_get):
+        """test ``format`` for a league's players"""
+        mock_get.return_value = mocked_requests_get(
+            "test/resources/data/league_ajax.json"
+        )
+        league = self.understat.league("EPL")
+        table = league.get_player_data(season="2020", format="arrow")
+        self.assertEqual(table.column_names, list(Player._fields))
+
+    def test_team_player_data(self, mock_get):
+        """test ``format`` for a team's players"""
+        mock_get.return_value = mocked_requests_get(
+            "test/resources/data/team_ajax.json"
+        )
+        team = self.understat.team("Arsenal")
+        columns = team.get_player_data(season="2020", format="columns")
+        self.assertEqual(columns["time"].dtype, np.int32)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,204 @@
+# pylint: disable=unused-argument
+"""Test crawling leagues into a Parquet dataset"""
+
+import datetime
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+from test import mocked_requests_get
+import requests
+from understatapi import UnderstatClient
+from understatapi.cache import season_of
+from understatapi.columns import pa
+from understatapi.crawler import (
+    ENTITIES,
+    MATCHES_KEY,
+    PART_NAME,
+    SUCCESS_MARKER,
+    partition_path,
+    read_entity,
+)
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover
+    pq = None
+
+with open("test/resources/data/league_ajax.json", encoding="utf-8") as fh:
+    PLAYED = [
+        fixture["id"]
+        for fixture in json.load(fh)["dates"]
+        if fixture["isResult"]
+    ]
+
+
+def mocked_crawl_get(url, **kwargs):
+    """Mock ``requests.Session.get()`` for leagues and matches"""
+    if "getLeagueData" in url:
+        return mocked_requests_get("test/resources/data/league_ajax.json")
+    return mocked_requests_get("test/resources/data/match_ajax.json")
+
+
+def mocked_failing_get(url, **kwargs):
+    """Mock ``requests.Session.get()``, failing for one match"""
+    if url.endswith(f"/{PLAYED[1]}"):
+        return mocked_requests_get(url, status_code=404)
+    return mocked_crawl_get(url, **kwargs)
+
+
+@unittest.skipIf(pa is None, "pyarrow is not installed")
+@patch.object(requests.Session, "get", side_effect=mocked_crawl_get)
+class TestCrawl(unittest.TestCase):
+    """Tests for ``crawl()``"""
+
+    def setUp(self):
+        self.understat = UnderstatClient(cache_maxsize=1000)
+        # pylint: disable=consider-using-with
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = self.tmpdir.name
+
+    def tearDown(self):
+        self.understat.session.close()
+        self.tmpdir.cleanup()
+
+    def entity_file(self, entity, season="2020"):
+        """Path of the file for an entity"""
+        return os.path.join(
+            partition_path(self.path, "EPL", season, entity), PART_NAME
+        )
+
+    def test_crawl(self, mock_get):
+        """test that every entity is written to a hive partitioned dataset"""
+        result = self.understat.crawl("EPL", ["2019", "2020"], self.path)
+        self.assertEqual(result.errors, {})
+        self.assertEqual(len(result.written), 2 * len(ENTITIES))
+        for season in ("2019", "2020"):
+            marker = os.path.join(
+                partition_path(self.path, "EPL", season), SUCCESS_MARKER
+            )
+            self.assertTrue(os.path.exists(marker))
+        # one request per league season, and one per match, which the
+        # fixture repeats in both seasons
+        self.assertEqual(mock_get.call_count, 2 + len(PLAYED))
+        shots = read_entity(self.path, "shots")
+        self.assertEqual(set(shots.column("season").to_pylist()), {2019, 2020})
+        self.assertEqual(set(shots.column("league").to_pylist()), {"EPL"})
+
+    def test_tables(self, mock_get):
+        """test the contents of the tables"""
+        self.understat.crawl("EPL", "2020", self.path)
+        fixtures = pq.read_table(self.entity_file("fixtures"))
+        self.assertEqual(fixtures.schema.field("h_xG").type, pa.float32())
+        rosters = pq.read_table(self.entity_file("rosters"))
+        self.assertIn("match_id", rosters.column_names)
+        teams = pq.read_table(self.entity_file("teams"))
+        self.assertIn("team_id", teams.column_names)
+
+    def test_match_errors(self, mock_get):
+        """test that failed matches are reported and retried on resume"""
+        mock_get.side_effect = mocked_failing_get
+        result = self.understat.crawl("EPL", "2020", self.path)
+        self.assertEqual(len(result.errors), 1)
+        self.assertTrue(list(result.errors)[0].endswith(f"match={PLAYED[1]}"))
+        self.assertTrue(os.path.exists(self.entity_file("fixtures")))
+        shots_per_match = pq.read_table(
+            self.entity_file("shots")
+        ).num_rows // (len(PLAYED) - 1)
+        matches = pq.read_schema(self.entity_file("shots")).metadata[
+            MATCHES_KEY
+        ]
+        self.assertNotIn(str(PLAYED[1]), matches.decode("utf-8").split(","))
+        marker = os.path.join(
+            partition_path(self.path, "EPL", "2020"), SUCCESS_MARKER
+        )
+        self.assertFalse(os.path.exists(marker))
+        mock_get.side_effect = mocked_crawl_get
+        calls = mock_get.call_count
+        result = self.understat.crawl("EPL", "2020", self.path)
+        self.assertEqual(
+            sorted(result.written),
+            sorted([self.entity_file("shots"), self.entity_file("rosters")]),
+        )
+        # only the failed match is fetched again
+        self.assertEqual(mock_get.call_count, calls + 1)
+        shots = pq.read_table(self.entity_file("shots"))
+        self.assertEqual(shots.num_rows, shots_per_match * len(PLAYED))
+        self.assertTrue(os.path.exists(marker))
+
+    def test_resume_null_categories(self, mock_get):
+        """test resuming with a match whose categorical column is all null"""
+        with open(
+            "test/resources/data/match_ajax.json", encoding="utf-8"
+        ) as file:
+            match = json.load(file)
+        for side in ("h", "a"):
+            for shot in match["shots"][side]:
+                shot["player_assisted"] = None
+        with tempfile.TemporaryDirectory() as tmpdir:
+            null_match = os.path.join(tmpdir, "match_ajax.json")
+            with open(null_match, "w", encoding="utf-8") as file:
+                json.dump(match, file)
+            mock_get.side_effect = mocked_failing_get
+            self.understat.crawl("EPL", "2020", self.path, entities=["shots"])
+
+            def mocked_null_get(url, **kwargs):
+                if "getMatchData" in url:
+                    return mocked_requests_get(null_match)
+                return mocked_crawl_get(url, **kwargs)
+
+            mock_get.side_effect = mocked_null_get
+            result = self.understat.crawl(
+                "EPL", "2020", self.path, entities=["shots"]
+            )
+        self.assertEqual(result.errors, {})
+        shots = pq.read_table(self.entity_file("shots"))
+        field = shots.schema.field("player_assisted")
+        self.assertEqual(field.type, pa.dictionary(pa.int32(), pa.string()))
+        self.assertEqual(
+            shots.num_rows,
+            len(PLAYED) * len(match["shots"]["h"] + match["shots"]["a"]),
+        )
+
+    def test_resume(self, mock_get):
+        """test that complete seasons are skipped"""
+        self.understat.crawl("EPL", "2020", self.path, entities=["fixtures"])
+        calls = mock_get.call_count
+        result = self.understat.crawl(
+            "EPL", "2020", self.path, entities=["fixtures"]
+        )
+        self.assertEqual(result.written, [])
+        self.assertEqual(
+            result.skipped, [partition_path(self.path, "EPL", "2020")]
+        )
+        self.assertEqual(mock_get.call_count, calls)
+        result = self.understat.crawl(
+            "EPL", "2020", self.path, entities=["fixtures"], overwrite=True
+        )
+        self.assertEqual(result.written, [self.entity_file("fixtures")])
+
+    def test_current_season(self, mock_get):
+        """test that the season being played is never marked complete"""
+        season = str(season_of(datetime.date.today()))
+        self.understat.crawl("EPL", season, self.path)
+        marker = os.path.join(
+            partition_path(self.path, "EPL", season), SUCCESS_MARKER
+        )
+        self.assertFalse(os.path.exists(marker))
+        calls = mock_get.call_count
+        result = self.understat.crawl("EPL", season, self.path)
+        self.assertEqual(result.skipped, [])
+        self.assertIn(self.entity_file("fixtures", season), result.written)
+        self.assertNotIn(self.entity_file("shots", season), result.written)
+        # the league is served by the payload cache, no match is fetched again
+        self.assertEqual(mock_get.call_count, calls)
+
+    def test_invalid_entity(self, mock_get):
+        """test that an unknown entity raises a ValueError"""
+        with self.assertRaises(ValueError):
+            self.understat.crawl("EPL", "2020", self.path, entities=["goals"])
+
+
+if __name__ == "__main__":
+    unittest.main()
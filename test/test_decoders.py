@@ -0,0 +1,78 @@
+# pylint: disable=unused-argument
+"""Test the JSON decoding backends"""
+
+import json
+import unittest
+from unittest.mock import patch, MagicMock
+from test import mocked_requests_get
+import requests
+from understatapi import UnderstatClient
+from understatapi.decoders import available_decoders, get_decoder
+
+LEAGUE_PAYLOAD = "test/resources/data/league_ajax.json"
+
+
+class TestDecoders(unittest.TestCase):
+    """Tests for ``get_decoder``"""
+
+    def setUp(self):
+        with open(LEAGUE_PAYLOAD, "rb") as fh:
+            self.content = fh.read()
+        self.expected = json.loads(self.content)
+
+    def test_backends_agree(self):
+        """test that every installed backend decodes the same object"""
+        for name in available_decoders():
+            with self.subTest(decoder=name):
+                decoder = get_decoder(name)
+                self.assertEqual(decoder(self.content), self.expected)
+                self.assertEqual(decoder(self.content.decode()), self.expected)
+
+    def test_auto(self):
+        """test that ``auto`` picks the fastest installed backend"""
+        self.assertIs(
+            type(get_decoder("auto")),
+            type(get_decoder(available_decoders()[0])),
+        )
+        self.assertEqual(available_decoders()[-1], "json")
+
+    def test_invalid_decoder(self):
+        """test that an unknown backend raises a ValueError"""
+        with self.assertRaises(ValueError):
+            get_decoder("yaml")
+
+    def test_missing_backend(self):
+        """test that a missing backend raises an ImportError"""
+        with patch("understatapi.decoders.orjson", None):
+            with self.assertRaises(ImportError):
+                get_decoder("orjson")
+            self.assertNotIn("orjson", available_decoders())
+        with patch("understatapi.decoders.msgspec", None):
+            with self.assertRaises(ImportError):
+                get_decoder("msgspec")
+
+
+@patch.object(requests.Session, "get", side_effect=mocked_requests_get)
+class TestClientDecoder(unittest.TestCase):
+    """Test the ``json_decoder`` option of the client"""
+
+    def test_custom_decoder(self, mock_get):
+        """test that endpoints decode responses with the client's decoder"""
+        mock_get.side_effect = lambda *args, **kwargs: mocked_requests_get(
+            LEAGUE_PAYLOAD
+        )
+        decoder = MagicMock(side_effect=json.loads)
+        with UnderstatClient(json_decoder=decoder) as understat:
+            league = understat.league(["EPL"])[0]
+            self.assertIs(league.decoder, decoder)
+            league.get_team_data(season="2019")
+        decoder.assert_called_once()
+
+    def test_named_decoder(self, mock_get):
+        """test choosing a decoder by name"""
+        with UnderstatClient(json_decoder="json") as understat:
+            self.assertIs(understat.player("1").decoder, json.loads)
+
+
+if __name__ == "__main__":
+    unittest.main()
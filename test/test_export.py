@@ -0,0 +1,202 @@
+# pylint: disable=unused-argument
+"""Test exporting records and the ``understatapi`` command"""
+
+import contextlib
+import io
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+from test import mocked_requests_get
+import requests
+from understatapi import UnderstatClient
+from understatapi.cli import main
+from understatapi.columns import pa
+from understatapi.exceptions import InvalidMatch
+from understatapi.export import iter_export, parse_seasons, write_parquet
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover
+    pq = None
+
+with open("test/resources/data/league_ajax.json", encoding="utf-8") as fh:
+    LEAGUE = json.load(fh)
+with open("test/resources/data/match_ajax.json", encoding="utf-8") as fh:
+    MATCH = json.load(fh)
+PLAYED = [fixture["id"] for fixture in LEAGUE["dates"] if fixture["isResult"]]
+MATCH_SHOTS = len(MATCH["shots"]["h"]) + len(MATCH["shots"]["a"])
+
+
+def mocked_export_get(url, **kwargs):
+    """Mock ``requests.Session.get()`` for leagues and matches"""
+    if "getLeagueData" in url:
+        return mocked_requests_get("test/resources/data/league_ajax.json")
+    if url.endswith(f"/{PLAYED[1]}"):
+        return mocked_requests_get(url, status_code=404)
+    return mocked_requests_get("test/resources/data/match_ajax.json")
+
+
+class TestParseSeasons(unittest.TestCase):
+    """Tests for ``parse_seasons()``"""
+
+    def test_parse_seasons(self):
+        """test that ranges and lists of seasons are expanded"""
+        self.assertEqual(parse_seasons("2021"), ["2021"])
+        self.assertEqual(parse_seasons("2014-2016"), ["2014", "2015", "2016"])
+        self.assertEqual(
+            parse_seasons("2014,2019-2020"), ["2014", "2019", "2020"]
+        )
+
+    def test_invalid_seasons(self):
+        """test that invalid seasons raise a ValueError"""
+        for seasons in ["20x1", "2020-2019", ""]:
+            with self.subTest(seasons=seasons):
+                with self.assertRaises(ValueError):
+                    parse_seasons(seasons)
+
+
+@patch.object(requests.Session, "get", side_effect=mocked_export_get)
+class TestIterExport(unittest.TestCase):
+    """Tests for ``iter_export()``"""
+
+    def setUp(self):
+        self.understat = UnderstatClient()
+
+    def tearDown(self):
+        self.understat.session.close()
+
+    def test_players(self, mock_get):
+        """test that league-wide records are labelled with their season"""
+        records = list(
+            iter_export(self.understat, "EPL", ["2020", "2021"], "players")
+        )
+        self.assertEqual(len(records), 2 * len(LEAGUE["players"]))
+        self.assertEqual(
+            {(record["league"], record["season"]) for record in records},
+            {("EPL", "2020"), ("EPL", "2021")},
+        )
+
+    def test_shots(self, mock_get):
+        """test that the shots of every played match are exported"""
+        errors = {}
+        records = list(
+            iter_export(
+                self.understat, "EPL", "2020", "shots", 4, errors=errors
+            )
+        )
+        self.assertEqual(len(records), (len(PLAYED) - 1) * MATCH_SHOTS)
+        self.assertEqual(
+            list(errors), [f"league=EPL/season=2020/match={PLAYED[1]}"]
+        )
+
+    def test_raises(self, mock_get):
+        """test that errors are raised when they are not collected"""
+        with self.assertRaises(InvalidMatch):
+            list(iter_export(self.understat, "EPL", "2020", "rosters"))
+
+    def test_invalid_entity(self, mock_get):
+        """test that an unknown entity raises a ValueError"""
+        with self.assertRaises(ValueError):
+            list(iter_export(self.understat, "EPL", "2020", "goals"))
+
+
+@patch.object(requests.Session, "get", side_effect=mocked_export_get)
+class TestCli(unittest.TestCase):
+    """Tests for ``understatapi export``"""
+
+    def setUp(self):
+        # pylint: disable=consider-using-with
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def run_main(self, *args):
+        """Run the command, capturing stdout and stderr"""
+        stdout, stderr = io.StringIO(), io.StringIO()
+        with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(
+            stderr
+        ):
+            status = main(["export", "--league", "EPL", *args])
+        return status, stdout.getvalue(), stderr.getvalue()
+
+    def test_ndjson_stdout(self, mock_get):
+        """test that records are written to stdout, one per line"""
+        status, stdout, stderr = self.run_main(
+            "--seasons", "2020", "--entity", "players"
+        )
+        self.assertEqual(status, 0)
+        self.assertEqual(stderr, "")
+        lines = stdout.splitlines()
+        self.assertEqual(len(lines), len(LEAGUE["players"]))
+        self.assertEqual(json.loads(lines[0])["season"], "2020")
+
+    def test_errors(self, mock_get):
+        """test that errors are reported and set the exit status"""
+        path = os.path.join(self.tmpdir.name, "shots.ndjson")
+        status, _, stderr = self.run_main(
+            "--seasons",
+            "2020",
+            "--entity",
+            "shots",
+            "--workers",
+            "4",
+            "-o",
+            path,
+        )
+        self.assertEqual(status, 1)
+        self.assertIn(f"match={PLAYED[1]}", stderr)
+        with open(path, encoding="utf-8") as out:
+            self.assertEqual(
+                len(out.readlines()), (len(PLAYED) - 1) * MATCH_SHOTS
+            )
+
+    @unittest.skipIf(pa is None, "pyarrow is not installed")
+    def test_parquet(self, mock_get):
+        """test that records are written to a Parquet file in row groups"""
+        path = os.path.join(self.tmpdir.name, "fixtures.parquet")
+        status, _, _ = self.run_main(
+            "--seasons",
+            "2019-2020",
+            "--entity",
+            "fixtures",
+            "--format",
+            "parquet",
+            "-o",
+            path,
+        )
+        self.assertEqual(status, 0)
+        table = pq.read_table(path)
+        self.assertEqual(table.num_rows, 2 * len(LEAGUE["dates"]))
+        self.assertEqual(set(table.column("season").to_pylist()), {2019, 2020})
+        self.assertEqual(set(table.column("league").to_pylist()), {"EPL"})
+
+    @unittest.skipIf(pa is None, "pyarrow is not installed")
+    def test_parquet_row_groups(self, mock_get):
+        """test that records are written in batches"""
+        path = os.path.join(self.tmpdir.name, "rosters.parquet")
+        errors = {}
+        with UnderstatClient() as understat:
+            records = iter_export(
+                understat, "EPL", "2020", "rosters", errors=errors
+            )
+            count = write_parquet(records, "rosters", path, batch_size=100)
+        parquet = pq.ParquetFile(path)
+        self.assertEqual(parquet.metadata.num_rows, count)
+        self.assertEqual(parquet.num_row_groups, -(-count // 100))
+        self.assertEqual(
+            parquet.schema_arrow.field("match_id").type, pa.int32()
+        )
+
+    def test_parquet_stdout(self, mock_get):
+        """test that parquet cannot be written to stdout"""
+        with self.assertRaises(SystemExit):
+            self.run_main(
+                "--seasons", "2020", "--entity", "teams", "--format", "parquet"
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
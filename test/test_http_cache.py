@@ -0,0 +1,162 @@
+# pylint: disable=unused-argument
+"""Test the persistent HTTP cache"""
+
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+import requests
+from requests.adapters import HTTPAdapter
+from understatapi import UnderstatClient
+from understatapi.cache import CachePolicy
+from understatapi.http_cache import CachingHTTPAdapter, SQLiteCacheStore
+
+URL = "https://understat.com/getMatchData/1"
+
+
+def make_response(status_code=200, content=b'{"a": 1}', headers=None):
+    """Build a ``requests.Response``"""
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = content  # pylint: disable=protected-access
+    response._content_consumed = True  # pylint: disable=protected-access
+    response.headers.update(headers or {})
+    response.url = URL
+    return response
+
+
+class HTTPCacheTestCase(unittest.TestCase):
+    """Base class for tests which need a cache store"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()  # pylint: disable=R1732
+        self.path = os.path.join(self.tmpdir.name, "cache.sqlite")
+        self.store = SQLiteCacheStore(self.path)
+
+    def tearDown(self):
+        self.store.close()
+        self.tmpdir.cleanup()
+
+
+class TestSQLiteCacheStore(HTTPCacheTestCase):
+    """Tests for ``SQLiteCacheStore``"""
+
+    def test_set_get(self):
+        """test that a stored response can be read back"""
+        self.store.set(URL, b"body", etag='"abc"')
+        entry = self.store.get(URL)
+        self.assertEqual(entry.content, b"body")
+        self.assertEqual(entry.etag, '"abc"')
+        self.assertIsNone(entry.last_modified)
+
+    def test_persistence(self):
+        """test that responses survive reopening the database"""
+        self.store.set(URL, b"body")
+        self.store.close()
+        self.store = SQLiteCacheStore(self.path)
+        self.assertEqual(self.store.get(URL).content, b"body")
+
+    def test_delete_clear(self):
+        """test removing responses"""
+        self.store.set(URL, b"body")
+        self.store.set(URL + "0", b"body")
+        self.store.delete(URL)
+        self.assertIsNone(self.store.get(URL))
+        self.store.clear()
+        self.assertIsNone(self.store.get(URL + "0"))
+
+
+@patch.object(HTTPAdapter, "send")
+class TestCachingHTTPAdapter(HTTPCacheTestCase):
+    """Tests for ``CachingHTTPAdapter``"""
+
+    def setUp(self):
+        super().setUp()
+        self.session = requests.Session()
+        self.adapter = CachingHTTPAdapter(self.store)
+        self.session.mount("https://understat.com/", self.adapter)
+
+    def tearDown(self):
+        self.session.close()
+        self.tmpdir.cleanup()
+
+    def test_response_stored(self, mock_send):
+        """test that a successful response is stored"""
+        mock_send.return_value = make_response(headers={"ETag": '"v1"'})
+        self.session.get(URL)
+        self.assertEqual(self.store.get(URL).etag, '"v1"')
+
+    def test_revalidation(self, mock_send):
+        """test that a 304 response is answered from the store"""
+        self.store.set(URL, b'{"a": 1}', etag='"v1"', last_modified="Mon")
+        mock_send.return_value = make_response(status_code=304, content=b"")
+        res = self.session.get(URL)
+        request = mock_send.call_args[0][0]
+        self.assertEqual(request.headers["If-None-Match"], '"v1"')
+        self.assertEqual(request.headers["If-Modified-Since"], "Mon")
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.json(), {"a": 1})
+        self.assertTrue(res.from_cache)
+
+    def test_stream_bypass(self, mock_send):
+        """test that a streamed request bypasses the store"""
+        self.store.set(URL, b'{"a": 1}', etag='"v1"')
+        mock_send.return_value = make_response(
+            content=b'{"a": 2}', headers={"ETag": '"v2"'}
+        )
+        res = self.session.get(URL, stream=True)
+        request = mock_send.call_args[0][0]
+        self.assertNotIn("If-None-Match", request.headers)
+        self.assertEqual(res.json(), {"a": 2})
+        self.assertEqual(self.store.get(URL).etag, '"v1"')
+
+    def test_modified(self, mock_send):
+        """test that a changed response replaces the stored response"""
+        self.store.set(URL, b'{"a": 1}', etag='"v1"')
+        mock_send.return_value = make_response(
+            content=b'{"a": 2}', headers={"ETag": '"v2"'}
+        )
+        self.assertEqual(self.session.get(URL).json(), {"a": 2})
+        self.assertEqual(self.store.get(URL).content, b'{"a": 2}')
+
+    def test_max_age(self, mock_send):
+        """test that fresh responses are served without a request"""
+        self.adapter.max_age = 60
+        self.store.set(URL, b'{"a": 1}', content_type="application/json")
+        res = self.session.get(URL)
+        mock_send.assert_not_called()
+        self.assertEqual(res.json(), {"a": 1})
+        self.assertEqual(res.headers["Content-Type"], "application/json")
+
+    def test_immutable(self, mock_send):
+        """test that responses which cannot change are never revalidated"""
+        self.adapter.policy = CachePolicy(current_season=2021)
+        league = "https://understat.com/getLeagueData/EPL/2016"
+        self.store.set(league, b'{"a": 1}', etag='"v1"')
+        self.assertEqual(self.session.get(league).json(), {"a": 1})
+        mock_send.assert_not_called()
+        mock_send.return_value = make_response(status_code=304, content=b"")
+        self.store.set(URL, b'{"a": 1}', etag='"v1"')
+        self.session.get(URL)
+        mock_send.assert_called_once()
+
+    def test_errors_not_stored(self, mock_send):
+        """test that error responses are not stored"""
+        mock_send.return_value = make_response(status_code=500)
+        self.session.get(URL)
+        self.assertIsNone(self.store.get(URL))
+
+
+class TestClientHTTPCache(HTTPCacheTestCase):
+    """Test the ``http_cache`` option of the client"""
+
+    def test_adapter_mounted(self):
+        """test that the caching adapter is mounted for understat.com"""
+        with UnderstatClient(http_cache=self.path) as understat:
+            adapter = understat.session.get_adapter(URL)
+            self.assertIsInstance(adapter, CachingHTTPAdapter)
+            self.assertEqual(adapter.store.path, self.path)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,261 @@
+# pylint: disable=unused-argument
+"""Test instrumentation hooks and metrics"""
+
+import json
+import unittest
+from unittest.mock import patch
+from test import mocked_requests_get
+import requests
+from requests.adapters import HTTPAdapter
+from understatapi import UnderstatClient
+from understatapi.metrics import (
+    CacheEvent,
+    Counter,
+    Histogram,
+    Hooks,
+    MetricsRegistry,
+    RequestEvent,
+    RequestTimer,
+    endpoint_name,
+)
+from understatapi.throttle import RetryPolicy
+
+URL = "https://understat.com/getMatchData/1"
+
+
+def make_response(status_code=200, content=b"{}"):
+    """Build a ``requests.Response``"""
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = content  # pylint: disable=protected-access
+    response._content_consumed = True  # pylint: disable=protected-access
+    return response
+
+
+class TestHooks(unittest.TestCase):
+    """Tests for ``Hooks``"""
+
+    def test_register(self):
+        """test that registered functions are called in order"""
+        hooks = Hooks()
+        calls = []
+
+        def first(event):
+            calls.append(("first", event))
+
+        hooks.register("cache", first)
+        hooks.register("cache", lambda event: calls.append(("second", event)))
+        hooks.emit("cache", "event")
+        self.assertEqual(calls, [("first", "event"), ("second", "event")])
+        hooks.unregister("cache", first)
+        hooks.emit("cache", "other")
+        self.assertEqual(calls[-1], ("second", "other"))
+        self.assertEqual(len(calls), 3)
+
+    def test_invalid_event(self):
+        """test that unknown events raise a ValueError"""
+        with self.assertRaises(ValueError):
+            Hooks().register("response", print)
+
+    def test_request_timer(self):
+        """test that a timed request emits one event, even if it fails"""
+        hooks = Hooks()
+        events = []
+        hooks.register("request", events.append)
+        with RequestTimer(hooks, "getMatchData", URL) as timer:
+            res = timer.received(make_response(content=b'{"a": 1}'))
+            self.assertEqual(timer.decode(json.loads, res.content), {"a": 1})
+            timer.size = len(res.content)
+        with self.assertRaises(ValueError):
+            with RequestTimer(hooks, "getMatchData", URL) as timer:
+                timer.size = 8
+                raise ValueError("failed")
+        self.assertEqual(len(events), 2)
+        ok, failed = events[0], events[1]
+        self.assertEqual((ok.status_code, ok.size, ok.error), (200, 8, None))
+        self.assertGreaterEqual(ok.decode_time, 0)
+        self.assertIsNone(failed.status_code)
+        self.assertEqual(failed.size, 0)
+        self.assertIsInstance(failed.error, ValueError)
+
+    def test_endpoint_name(self):
+        """test the name used to label metrics"""
+        self.assertEqual(
+            endpoint_name("getLeagueData/EPL/2021"), "getLeagueData"
+        )
+        self.assertEqual(endpoint_name("getMatchData?id=1"), "getMatchData")
+
+
+class TestMetrics(unittest.TestCase):
+    """Tests for ``Counter``, ``Histogram`` and ``MetricsRegistry``"""
+
+    def test_counter(self):
+        """test counting by label"""
+        counter = Counter("requests_total", "Requests", ("status",))
+        counter.inc(status=200)
+        counter.inc(2, status="200")
+        self.assertEqual(counter.value(status=200), 3)
+        self.assertEqual(counter.value(status=404), 0)
+        with self.assertRaises(ValueError):
+            counter.inc(endpoint="getMatchData")
+
+    def test_histogram(self):
+        """test that observations are counted in every bucket they fit"""
+        histogram = Histogram("duration", "Duration", (), buckets=(0.1, 1))
+        histogram.observe(0.05)
+        histogram.observe(0.5)
+        self.assertEqual(histogram.count(), 2)
+        self.assertEqual(
+            list(histogram.samples()),
+            [
+                ("duration_bucket", (("le", "0.1"),), 1),
+                ("duration_bucket", (("le", "1"),), 2),
+                ("duration_bucket", (("le", "+Inf"),), 2),
+                ("duration_sum", (), 0.55),
+                ("duration_count", (), 2),
+            ],
+        )
+
+    def test_render(self):
+        """test the Prometheus text format"""
+        registry = MetricsRegistry()
+        registry.on_request(
+            RequestEvent(
+                'get"Data',
+                "url",
+                200,
+                0.2,
+                1024,
+                0.01,
+                from_cache=True,
+                error=None,
+            )
+        )
+        registry.on_cache(
+            CacheEvent("getMatchData", "getMatchData/1", hit=True)
+        )
+        lines = registry.render().splitlines()
+        self.assertIn("# TYPE understat_requests_total counter", lines)
+        self.assertIn(
+            'understat_requests_total{endpoint="get\\"Data",status="200"} 1',
+            lines,
+        )
+        self.assertIn(
+            'understat_request_duration_seconds_bucket{endpoint="get\\"Data",'
+            'le="0.25"} 1',
+            lines,
+        )
+        self.assertIn(
+            'understat_response_bytes_total{endpoint="get\\"Data"} 1024', lines
+        )
+        self.assertIn(
+            'understat_http_cache_hits_total{endpoint="get\\"Data"} 1', lines
+        )
+        self.assertIn(
+            "understat_cache_lookups_total"
+            '{endpoint="getMatchData",result="hit"} 1',
+            lines,
+        )
+
+    def test_detach(self):
+        """test that a detached registry stops recording events"""
+        hooks = Hooks()
+        registry = MetricsRegistry()
+        registry.attach(hooks)
+        event = CacheEvent("getMatchData", "getMatchData/1", hit=True)
+        hooks.emit("cache", event)
+        registry.detach(hooks)
+        hooks.emit("cache", event)
+        self.assertIn(
+            "understat_cache_lookups_total"
+            '{endpoint="getMatchData",result="hit"} 1',
+            registry.render().splitlines(),
+        )
+
+
+@patch("understatapi.throttle.time.sleep")
+@patch.object(HTTPAdapter, "send")
+class TestClientMetrics(unittest.TestCase):
+    """Tests for ``UnderstatClient(metrics=True)``"""
+
+    def setUp(self):
+        with open("test/resources/data/league_ajax.json", "rb") as file:
+            self.content = file.read()
+
+    def test_request_metrics(self, mock_send, mock_sleep):
+        """test the metrics recorded for requests, retries and the cache"""
+        mock_send.side_effect = [
+            make_response(503),
+            make_response(200, self.content),
+        ]
+        events = []
+        with UnderstatClient(
+            metrics=True, retry_policy=RetryPolicy(jitter=False)
+        ) as understat:
+            understat.hooks.register("request", events.append)
+            league = understat.league("EPL")
+            league.get_player_data(season="2020")
+            league.get_team_data(season="2020")
+        metrics = understat.metrics
+        labels = {"endpoint": "getLeagueData"}
+        self.assertEqual(metrics.requests.value(status=200, **labels), 1)
+        self.assertEqual(
+            metrics.response_bytes.value(**labels), len(self.content)
+        )
+        self.assertEqual(metrics.request_duration.count(**labels), 1)
+        self.assertEqual(metrics.decode_duration.count(**labels), 1)
+        self.assertEqual(metrics.retries.value(status=503), 1)
+        self.assertEqual(
+            metrics.cache_lookups.value(result="miss", **labels), 1
+        )
+        self.assertEqual(
+            metrics.cache_lookups.value(result="hit", **labels), 1
+        )
+        self.assertEqual(len(events), 1)
+        self.assertEqual(
+            events[0].url, "https://understat.com/getLeagueData/EPL/2020"
+        )
+        self.assertGreater(events[0].decode_time, 0)
+
+    def test_failed_request(self, mock_send, mock_sleep):
+        """test that failed requests are recorded with their status code"""
+        mock_send.return_value = make_response(404)
+        events = []
+        with UnderstatClient(metrics=True) as understat:
+            understat.hooks.register("request", events.append)
+            with self.assertRaises(requests.HTTPError):
+                understat.league("EPL").get_player_data(season="2020")
+        self.assertEqual(
+            understat.metrics.requests.value(
+                endpoint="getLeagueData", status=404
+            ),
+            1,
+        )
+        self.assertIsInstance(events[0].error, requests.HTTPError)
+
+    def test_metrics_disabled(self, mock_send, mock_sleep):
+        """test that metrics are only kept when asked for"""
+        with UnderstatClient() as understat:
+            self.assertIsNone(understat.metrics)
+
+
+@patch.object(requests.Session, "get", side_effect=mocked_requests_get)
+class TestRequestUrlHooks(unittest.TestCase):
+    """Test that ``_request_url`` emits events"""
+
+    def test_request_url(self, mock_get):
+        """test the event emitted for a page request"""
+        events = []
+        with UnderstatClient() as understat:
+            understat.hooks.register("request", events.append)
+            match = understat.match("1")
+            match._request_url(  # pylint: disable=protected-access
+                "test/resources/data/match_ajax.json"
+            )
+        self.assertEqual(len(events), 1)
+        self.assertEqual(events[0].endpoint, "page")
+        self.assertEqual(events[0].status_code, 200)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,174 @@
+# pylint: disable=unused-argument
+"""Test the typed records returned with ``typed=True``"""
+
+import json
+import unittest
+from unittest.mock import patch
+from test import mocked_requests_get
+import requests
+from understatapi import UnderstatClient
+from understatapi.models import (
+    Fixture,
+    Player,
+    PlayerMatch,
+    RosterEntry,
+    Shot,
+    from_dict,
+    to_records,
+)
+
+
+def mocked_ajax_get(url, **kwargs):
+    """Mock ``requests.Session.get()``, serving each endpoint's fixture"""
+    for endpoint, name in (
+        ("getLeagueData", "league"),
+        ("getPlayerData", "player"),
+        ("getTeamData", "team"),
+        ("getMatchData", "match"),
+    ):
+        if endpoint in url:
+            return mocked_requests_get(f"test/resources/data/{name}_ajax.json")
+    raise ValueError(url)
+
+
+class TestFromDict(unittest.TestCase):
+    """Tests for building records from dictionaries"""
+
+    def test_conversion(self):
+        """test that numeric strings are converted"""
+        shot = from_dict(
+            Shot,
+            {
+                "id": "10",
+                "minute": "45",
+                "xG": "0.25",
+                "X": "0.9",
+                "h_goals": "2",
+            },
+        )
+        self.assertEqual(shot.id, 10)
+        self.assertEqual(shot.minute, 45)
+        self.assertEqual(shot.xG, 0.25)
+        self.assertEqual(shot.h_goals, 2)
+
+    def test_missing_values(self):
+        """test that missing and empty values become ``None``"""
+        shot = from_dict(Shot, {"id": "1", "player_assisted": ""})
+        self.assertIsNone(shot.player_assisted)
+        self.assertIsNone(shot.lastAction)
+
+    def test_bool(self):
+        """test converting booleans sent as strings"""
+        self.assertTrue(from_dict(Fixture, {"isResult": "1"}).isResult)
+        self.assertFalse(from_dict(Fixture, {"isResult": "false"}).isResult)
+        self.assertTrue(from_dict(Fixture, {"isResult": True}).isResult)
+
+    def test_fixture(self):
+        """test that nested fixture data is flattened"""
+        fixture = to_records(
+            Fixture,
+            [
+                {
+                    "id": "1",
+                    "isResult": False,
+                    "h": {
+                        "id": "71",
+                        "title": "Aston Villa",
+                        "short_title": "AVL",
+                    },
+                    "a": {
+                        "id": "89",
+                        "title": "Man Utd",
+                        "short_title": "MUN",
+                    },
+                    "goals": {"h": None, "a": None},
+                    "xG": {"h": None, "a": None},
+                    "datetime": "2021-05-09 18:05:00",
+                    "forecast": {"w": "0.2", "d": "0.3", "l": "0.5"},
+                }
+            ],
+        )[0]
+        self.assertEqual(fixture.h_id, 71)
+        self.assertEqual(fixture.a_short_title, "MUN")
+        self.assertIsNone(fixture.h_goals)
+        self.assertEqual(fixture.forecast_l, 0.5)
+        self.assertIsNone(fixture.side)
+
+    def test_no_dict(self):
+        """test that records do not have a ``__dict__``"""
+        shot = from_dict(Shot, {})
+        self.assertFalse(hasattr(shot, "__dict__"))
+
+
+@patch.object(requests.Session, "get", side_effect=mocked_ajax_get)
+class TestTypedEndpoints(unittest.TestCase):
+    """Tests for passing ``typed=True`` to the endpoints"""
+
+    def setUp(self):
+        self.understat = UnderstatClient()
+
+    def tearDown(self):
+        self.understat.session.close()
+
+    def test_player_shot_data(self, mock_get):
+        """test ``get_shot_data()`` for a player"""
+        raw = self.understat.player("647").get_shot_data()
+        shots = self.understat.player("647").get_shot_data(typed=True)
+        self.assertEqual(len(shots), len(raw))
+        self.assertIsInstance(shots[0], Shot)
+        self.assertEqual(shots[0].xG, float(raw[0]["xG"]))
+        self.assertEqual(shots[0].match_id, int(raw[0]["match_id"]))
+
+    def test_player_match_data(self, mock_get):
+        """test ``get_match_data()`` for a player"""
+        matches = self.understat.player("647").get_match_data(typed=True)
+        self.assertIsInstance(matches[0], PlayerMatch)
+        self.assertIsInstance(matches[0].goals, int)
+
+    def test_league_data(self, mock_get):
+        """test ``get_player_data()`` and ``get_match_data()`` for a league"""
+        league = self.understat.league("EPL")
+        players = league.get_player_data(season="2020", typed=True)
+        self.assertIsInstance(players[0], Player)
+        self.assertIsInstance(players[0].npxG, float)
+        fixtures = league.get_match_data(season="2020", typed=True)
+        self.assertIsInstance(fixtures[0], Fixture)
+        self.assertIsInstance(fixtures[0].h_title, str)
+
+    def test_team_data(self, mock_get):
+        """test ``get_player_data()`` and ``get_match_data()`` for a team"""
+        team = self.understat.team("Arsenal")
+        self.assertIsInstance(
+            team.get_player_data(season="2020", typed=True)[0], Player
+        )
+        fixture = team.get_match_data(season="2020", typed=True)[0]
+        self.assertIn(fixture.side, ("h", "a"))
+
+    def test_match_data(self, mock_get):
+        """test ``get_shot_data()`` and ``get_roster_data()`` for a match"""
+        match = self.understat.match("14711")
+        shots = match.get_shot_data(typed=True)
+        self.assertEqual(set(shots), {"h", "a"})
+        self.assertIsInstance(shots["h"][0], Shot)
+        raw = match.get_roster_data()
+        rosters = match.get_roster_data(typed=True)
+        self.assertEqual(list(rosters["h"]), list(raw["h"]))
+        self.assertIsInstance(next(iter(rosters["a"].values())), RosterEntry)
+
+    def test_to_dict(self, mock_get):
+        """test that records convert back to dictionaries"""
+        shot = self.understat.player("647").get_shot_data(typed=True)[0]
+        with open(
+            "test/resources/data/player_shotsdata.json", encoding="utf-8"
+        ) as file:
+            raw = json.load(file)[0]
+        self.assertEqual(list(shot._asdict()), list(raw))
+
+    def test_batch(self, mock_get):
+        """test that ``typed`` is passed through batch calls"""
+        data = self.understat.player(["1", "2"]).get_shot_data(typed=True)
+        self.assertIsInstance(data["2"][0], Shot)
+
+
+if __name__ == "__main__":
+    unittest.main()
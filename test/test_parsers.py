@@ -0,0 +1,128 @@
+"""Test extracting data from html pages"""
+
+import json
+import unittest
+from unittest.mock import patch
+from understatapi.parsers import LeagueParser, MatchParser, BaseParser
+from understatapi.parsers.base import extract, find_dataset, unescape
+
+LEAGUE_PAGE = "test/resources/league_epl.html"
+MATCH_PAGE = "test/resources/match.html"
+
+
+def read_page(path):
+    """Read a html page"""
+    with open(path, encoding="utf-8") as fh:
+        return fh.read()
+
+
+def legacy_parse(html, query):
+    """Extract a dataset the way ``BaseParser.parse`` used to"""
+    query_index = html.find(query)
+    start = html.find("(", query_index) + 2
+    end = html.find(")", start) - 1
+    return json.loads(html[start:end].encode("utf8").decode("unicode_escape"))
+
+
+class TestExtract(unittest.TestCase):
+    """Tests for ``extract``"""
+
+    def test_datasets(self):
+        """test that every dataset is found in one pass"""
+        html = read_page(LEAGUE_PAGE)
+        datasets = extract(html)
+        self.assertEqual(
+            list(datasets)[:3], ["datesData", "teamsData", "playersData"]
+        )
+        for name in ["datesData", "teamsData", "playersData"]:
+            with self.subTest(dataset=name):
+                self.assertEqual(
+                    json.loads(datasets[name]), legacy_parse(html, name)
+                )
+
+    def test_escaped_quote(self):
+        """test that escaped quotes do not end a dataset"""
+        html = (
+            "var a = JSON.parse('[\\x22it\\'s\\')\\x22]'); b = JSON.parse('1')"
+        )
+        self.assertEqual(extract(html), {"a": "[\"it's')\"]", "b": "1"})
+
+    def test_unescape(self):
+        """test that escape sequences are decoded"""
+        self.assertEqual(unescape("\\x7B\\x22a\\x22\\x3A1\\x7D"), '{"a":1}')
+        self.assertEqual(unescape("\\u00d6zil\\n"), "Özil\n")
+        self.assertEqual(unescape("Özil \\x22\\\\"), 'Özil "\\')
+        self.assertEqual(unescape("no escapes"), "no escapes")
+
+
+class TestParsers(unittest.TestCase):
+    """Tests for the page parsers"""
+
+    def test_league(self):
+        """test that the league datasets match the previous parser"""
+        html = read_page(LEAGUE_PAGE)
+        parser = LeagueParser()
+        self.assertEqual(
+            parser.get_team_data(html), legacy_parse(html, "teamsData")
+        )
+        self.assertEqual(
+            parser.get_match_data(html), legacy_parse(html, "datesData")
+        )
+        self.assertEqual(
+            parser.get_player_data(html), legacy_parse(html, "playersData")
+        )
+
+    def test_match(self):
+        """test that the match datasets match the previous parser"""
+        html = read_page(MATCH_PAGE)
+        parser = MatchParser()
+        self.assertEqual(
+            parser.get_shot_data(html), legacy_parse(html, "shotsData")
+        )
+        self.assertEqual(
+            parser.get_match_info(html), legacy_parse(html, "match_info")
+        )
+
+    def test_non_ascii(self):
+        """test that characters outside of ascii are kept"""
+        html = "var teamsData = JSON.parse('\\x5B\\x22Müller\\x22\\x5D');"
+        self.assertEqual(LeagueParser().get_team_data(html), ["Müller"])
+
+    def test_one_scan(self):
+        """test that the league getters scan a page once between them"""
+        html = read_page(LEAGUE_PAGE)
+        parser = LeagueParser()
+        with patch(
+            "understatapi.parsers.base.extract", wraps=extract
+        ) as mock_extract:
+            parser.get_team_data(html)
+            parser.get_match_data(html)
+            parser.get_player_data(html)
+            self.assertEqual(mock_extract.call_count, 1)
+            parser.get_team_data(html + " ")
+            self.assertEqual(mock_extract.call_count, 2)
+
+    def test_substring_query(self):
+        """test that a query which is not a dataset name is still found"""
+        html = "var teamsData = JSON.parse('\\x5B1\\x5D');"
+        self.assertEqual(BaseParser().parse(html, "teams"), [1])
+
+    def test_exact_query(self):
+        """test that a dataset with the exact name is preferred"""
+        html = (
+            "a = JSON.parse('1'); teamsDataOld = JSON.parse('2'); "
+            "teamsData = JSON.parse('3')"
+        )
+        self.assertEqual(find_dataset(html, "teamsData"), "3")
+        self.assertEqual(find_dataset(html, "teams"), "2")
+
+    def test_missing_query(self):
+        """test that a query which is not embedded raises a ValueError"""
+        html = "var teamsData = JSON.parse('\\x5B1\\x5D');"
+        self.assertIsNone(find_dataset(html, "shotsData"))
+        with self.assertRaises(ValueError):
+            BaseParser().parse(html, "shotsData")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,132 @@
+"""Test describing requests and reading responses without sending them"""
+
+import json
+import unittest
+from understatapi.exceptions import (
+    InvalidLeague,
+    InvalidMatch,
+    InvalidPlayer,
+    InvalidSeason,
+    InvalidTeam,
+)
+from understatapi.models import Fixture, RosterEntry, Shot
+from understatapi.protocol import (
+    AJAX_HEADERS,
+    Query,
+    league_request,
+    match_request,
+    player_request,
+    team_request,
+)
+
+LEAGUE = "test/resources/data/league_ajax.json"
+MATCH = "test/resources/data/match_ajax.json"
+
+
+def read_content(path):
+    """Read the bytes of a fixture"""
+    with open(path, "rb") as fh:
+        return fh.read()
+
+
+class TestRequest(unittest.TestCase):
+    """Tests for building requests"""
+
+    def test_paths(self):
+        """test the path of each request"""
+        self.assertEqual(
+            league_request("EPL", "2021").path, "getLeagueData/EPL/2021"
+        )
+        self.assertEqual(player_request("647").path, "getPlayerData/647")
+        self.assertEqual(
+            team_request("Arsenal", "2021").path, "getTeamData/Arsenal/2021"
+        )
+        request = match_request("14711")
+        self.assertEqual(request.path, "getMatchData/14711")
+        self.assertEqual(
+            request.url(), "https://understat.com/getMatchData/14711"
+        )
+        self.assertEqual(
+            request.url("http://127.0.0.1:8000/"),
+            "http://127.0.0.1:8000/getMatchData/14711",
+        )
+        self.assertEqual(request.headers, AJAX_HEADERS)
+
+    def test_invalid_arguments(self):
+        """test that arguments are checked when a request is built"""
+        with self.assertRaises(InvalidLeague):
+            league_request("dummy", "2021")
+        with self.assertRaises(InvalidSeason):
+            league_request("EPL", "2010")
+        for build in (player_request, match_request):
+            with self.subTest(build=build.__name__):
+                with self.assertRaises(TypeError):
+                    build(None)
+        with self.assertRaises(TypeError):
+            team_request(["Arsenal"], "2021")
+
+    def test_error(self):
+        """test the error raised when the server answers with an error"""
+        errors = [
+            (player_request("1"), InvalidPlayer),
+            (team_request("dummy", "2021"), InvalidTeam),
+            (match_request("1"), InvalidMatch),
+        ]
+        for request, error in errors:
+            with self.subTest(entity=request.entity):
+                self.assertIsInstance(request.error(), error)
+        self.assertIsNone(league_request("EPL", "2021").error())
+
+
+class TestQuery(unittest.TestCase):
+    """Tests for reading a section of a payload"""
+
+    def setUp(self):
+        self.league = json.loads(read_content(LEAGUE))
+        self.match = json.loads(read_content(MATCH))
+
+    def test_rows(self):
+        """test reading rows as dictionaries or records"""
+        request = league_request("EPL", "2021")
+        rows = Query(request, "dates", Fixture).result(self.league)
+        self.assertEqual(rows, self.league["dates"])
+        records = Query(request, "dates", Fixture, typed=True).result(
+            self.league
+        )
+        self.assertIsInstance(records[0], Fixture)
+        self.assertEqual(Query(request, "missing").result(self.league), [])
+
+    def test_mapping(self):
+        """test that a mapping is returned as it is"""
+        query = Query(league_request("EPL", "2021"), "teams", shape="mapping")
+        self.assertIs(query.result(self.league), self.league["teams"])
+
+    def test_sides(self):
+        """test reading the shots of each side"""
+        query = Query(
+            match_request("14711"), "shots", Shot, True, shape="sides"
+        )
+        shots = query.result(self.match)
+        self.assertEqual(set(shots), {"h", "a"})
+        self.assertIsInstance(shots["h"][0], Shot)
+
+    def test_roster(self):
+        """test reading the roster of each side"""
+        query = Query(
+            match_request("14711"),
+            "rosters",
+            RosterEntry,
+            True,
+            shape="roster",
+        )
+        rosters = query.result(self.match)
+        for side, roster in rosters.items():
+            with self.subTest(side=side):
+                self.assertEqual(
+                    list(roster), list(self.match["rosters"][side])
+                )
+                self.assertIsInstance(next(iter(roster.values())), RosterEntry)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,203 @@
+# pylint: disable=unused-argument
+"""Test recording, replaying and serving AJAX responses"""
+
+import json
+import os
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+import requests
+from requests.adapters import HTTPAdapter
+from understatapi import UnderstatClient
+from understatapi.replay import (
+    MissingRecording,
+    RecordingAdapter,
+    RecordingStore,
+    StandInServer,
+)
+
+LEAGUE = "test/resources/data/league_ajax.json"
+
+
+def read_content(path):
+    """Read the bytes of a fixture"""
+    with open(path, "rb") as fh:
+        return fh.read()
+
+
+def make_response(status_code=200, content=b"{}"):
+    """Build a ``requests.Response``"""
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = content  # pylint: disable=protected-access
+    response._content_consumed = True  # pylint: disable=protected-access
+    return response
+
+
+class TestRecordingStore(unittest.TestCase):
+    """Tests for ``RecordingStore``"""
+
+    def setUp(self):
+        # pylint: disable=consider-using-with
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.store = RecordingStore(self.tmpdir.name)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_key(self):
+        """test that keys are the path and query of a url"""
+        self.assertEqual(
+            RecordingStore.key("https://understat.com/getLeagueData/EPL/2021"),
+            "getLeagueData/EPL/2021",
+        )
+        self.assertEqual(
+            RecordingStore.key("/getMatchData/1?a=1"), "getMatchData/1?a=1"
+        )
+
+    def test_get_set(self):
+        """test that recordings are read back"""
+        self.assertIsNone(self.store.get("getLeagueData/EPL/2021"))
+        self.store.set("getLeagueData/EPL/2021", b"{}")
+        self.store.set("getMatchData/1?a=1", b"[]")
+        self.assertEqual(self.store.get("getLeagueData/EPL/2021"), b"{}")
+        self.assertTrue(
+            os.path.exists(
+                os.path.join(
+                    self.tmpdir.name, "getLeagueData", "EPL", "2021.json"
+                )
+            )
+        )
+        self.assertEqual(
+            sorted(self.store.keys()),
+            ["getLeagueData/EPL/2021", "getMatchData/1%3Fa%3D1"],
+        )
+
+    def test_invalid_key(self):
+        """test that keys cannot escape the directory"""
+        with self.assertRaises(ValueError):
+            self.store.set("../outside", b"{}")
+        self.assertIsNone(self.store.get("getMatchData/.."))
+
+
+@patch.object(HTTPAdapter, "send")
+class TestRecordingAdapter(unittest.TestCase):
+    """Tests for ``UnderstatClient(recordings=...)``"""
+
+    def setUp(self):
+        # pylint: disable=consider-using-with
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.content = read_content(LEAGUE)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def get_players(self, mode):
+        """Get a league's players with a recording client"""
+        with UnderstatClient(
+            recordings=self.tmpdir.name, recording_mode=mode
+        ) as understat:
+            return understat.league("EPL").get_player_data(season="2020")
+
+    def test_record_and_replay(self, mock_send):
+        """test that recorded responses are replayed without requests"""
+        mock_send.return_value = make_response(200, self.content)
+        recorded = self.get_players("record")
+        mock_send.reset_mock()
+        replayed = self.get_players("replay")
+        mock_send.assert_not_called()
+        self.assertEqual(replayed, recorded)
+        self.assertEqual(replayed, json.loads(self.content)["players"])
+
+    def test_replayed_stream(self, mock_send):
+        """test that a replayed response can be streamed and closed"""
+        RecordingStore(self.tmpdir.name).set(
+            "getLeagueData/EPL/2020", self.content
+        )
+        with UnderstatClient(recordings=self.tmpdir.name) as understat:
+            res = understat.session.get(
+                "https://understat.com/getLeagueData/EPL/2020", stream=True
+            )
+            self.assertEqual(
+                b"".join(res.iter_content(chunk_size=1024)), self.content
+            )
+            res.close()
+        mock_send.assert_not_called()
+
+    def test_errors_not_recorded(self, mock_send):
+        """test that failed responses are not recorded"""
+        mock_send.return_value = make_response(500)
+        with self.assertRaises(requests.HTTPError):
+            self.get_players("record")
+        self.assertEqual(list(RecordingStore(self.tmpdir.name).keys()), [])
+
+    def test_missing_recording(self, mock_send):
+        """test that replaying an unrecorded request raises"""
+        with self.assertRaises(MissingRecording):
+            self.get_players("replay")
+        mock_send.assert_not_called()
+
+    def test_auto(self, mock_send):
+        """test that ``auto`` only requests what has not been recorded"""
+        mock_send.return_value = make_response(200, self.content)
+        self.get_players("auto")
+        self.get_players("auto")
+        self.assertEqual(mock_send.call_count, 1)
+
+    def test_invalid_mode(self, mock_send):
+        """test that an unknown mode raises a ValueError"""
+        with self.assertRaises(ValueError):
+            RecordingAdapter(RecordingStore(self.tmpdir.name), mode="rewind")
+
+    def test_http_cache(self, mock_send):
+        """test that recordings cannot be combined with the HTTP cache"""
+        with self.assertRaises(ValueError):
+            UnderstatClient(
+                recordings=self.tmpdir.name,
+                http_cache=os.path.join(self.tmpdir.name, "cache.sqlite"),
+            )
+
+
+class TestStandInServer(unittest.TestCase):
+    """Tests for ``StandInServer``"""
+
+    def setUp(self):
+        # pylint: disable=consider-using-with
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.content = read_content(LEAGUE)
+        RecordingStore(self.tmpdir.name).set(
+            "getLeagueData/EPL/2020", self.content
+        )
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_serve(self):
+        """test that a client pointed at the server gets the recordings"""
+        with StandInServer(self.tmpdir.name, latency=0.05) as server:
+            with UnderstatClient(base_url=server.url) as understat:
+                start = time.monotonic()
+                players = understat.league("EPL").get_player_data(
+                    season="2020"
+                )
+                elapsed = time.monotonic() - start
+        self.assertEqual(players, json.loads(self.content)["players"])
+        self.assertGreaterEqual(elapsed, 0.05)
+
+    def test_not_recorded(self):
+        """test that requests which were not recorded get a 404"""
+        with StandInServer(self.tmpdir.name) as server:
+            res = requests.get(
+                server.url + "getLeagueData/EPL/2021", timeout=5
+            )
+        self.assertEqual(res.status_code, 404)
+
+    def test_invalid_latency(self):
+        """test that a negative latency raises a ValueError"""
+        with self.assertRaises(ValueError):
+            StandInServer(self.tmpdir.name, latency=-1)
+
+
+if __name__ == "__main__":
+    unittest.main()
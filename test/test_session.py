@@ -0,0 +1,118 @@
+# pylint: disable=unused-argument
+"""Test sharing a client between threads"""
+
+import json
+import tempfile
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+import requests
+from requests.adapters import HTTPAdapter
+from understatapi import UnderstatClient
+from understatapi.replay import RecordingStore, StandInServer
+from understatapi.session import SessionPool
+
+MATCH = "test/resources/data/match_ajax.json"
+THREADS = 32
+MATCHES = 20
+ROUNDS = 10
+
+
+class TestSessionPool(unittest.TestCase):
+    """Tests for ``SessionPool``"""
+
+    def setUp(self):
+        self.pool = SessionPool()
+        self.pool.headers["X-Test"] = "1"
+
+    def tearDown(self):
+        self.pool.close()
+
+    def thread_session(self):
+        """Get the session of a new thread"""
+        sessions = []
+        thread = threading.Thread(
+            target=lambda: sessions.append(
+                self.pool._thread_session()  # pylint: disable=protected-access
+            )
+        )
+        thread.start()
+        thread.join()
+        return sessions[0]
+
+    def test_per_thread(self):
+        """test that each thread gets its own session"""
+        # pylint: disable=protected-access
+        session = self.pool._thread_session()
+        self.assertIs(self.pool._thread_session(), session)
+        other = self.thread_session()
+        self.assertIsNot(other, session)
+
+    def test_shared_state(self):
+        """test that adapters, cookies and headers are shared"""
+        session = self.thread_session()
+        self.assertIs(session.adapters, self.pool.adapters)
+        self.assertIs(session.cookies, self.pool.cookies)
+        self.assertIs(session.headers, self.pool.headers)
+
+    @patch.object(HTTPAdapter, "send")
+    def test_late_settings(self, mock_send):
+        """test that headers and settings changed after a request are used"""
+        mock_send.return_value = requests.Response()
+        self.pool.get("https://understat.com/")
+        self.pool.headers["X-Test"] = "2"
+        self.pool.params = {"a": "1"}
+        self.pool.get("https://understat.com/")
+        request = mock_send.call_args.args[0]
+        self.assertEqual(request.headers["X-Test"], "2")
+        self.assertEqual(request.url, "https://understat.com/?a=1")
+
+
+class TestThreadSafety(unittest.TestCase):
+    """Hammer one client from many threads"""
+
+    def setUp(self):
+        # pylint: disable=consider-using-with
+        self.tmpdir = tempfile.TemporaryDirectory()
+        with open(MATCH, "rb") as fh:
+            self.content = fh.read()
+        store = RecordingStore(self.tmpdir.name)
+        for match_id in range(MATCHES):
+            store.set(f"getMatchData/{match_id}", self.content)
+        self.server = StandInServer(self.tmpdir.name)
+        self.server.start()
+
+    def tearDown(self):
+        self.server.stop()
+        self.tmpdir.cleanup()
+
+    def test_stress(self):
+        """test that concurrent requests succeed and reuse connections"""
+        expected = json.loads(self.content)["shots"]
+        with UnderstatClient(
+            base_url=self.server.url, cache_maxsize=0, pool_maxsize=THREADS
+        ) as understat:
+
+            def get_shots(call):
+                return understat.match(str(call % MATCHES)).get_shot_data()
+
+            with ThreadPoolExecutor(max_workers=THREADS) as executor:
+                results = list(
+                    executor.map(get_shots, range(THREADS * ROUNDS))
+                )
+            manager = understat.session.get_adapter(
+                self.server.url
+            ).poolmanager
+            pools = [manager.pools[key] for key in manager.pools.keys()]
+        self.assertEqual(len(results), THREADS * ROUNDS)
+        for result in results:
+            self.assertEqual(result, expected)
+        # Connections are shared by every thread, not opened for each request
+        self.assertLessEqual(
+            sum(pool.num_connections for pool in pools), THREADS
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
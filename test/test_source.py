@@ -0,0 +1,161 @@
+# pylint: disable=unused-argument
+"""Test reading data from understat's html pages"""
+
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+from test import mocked_requests_get
+import requests
+from understatapi import UnderstatClient
+from understatapi.parsers import LeagueParser, MatchParser
+
+PAGES = {
+    "league/": "test/resources/league_epl.html",
+    "match/": "test/resources/match.html",
+    "getLeagueData/": "test/resources/data/league_ajax.json",
+}
+
+
+def read_page(path):
+    """Read a html page"""
+    with open(path, encoding="utf-8") as fh:
+        return fh.read()
+
+
+def route(url, *args, **kwargs):
+    """Answer a request with the fixture for its path"""
+    path = url[len("https://understat.com/") :]
+    for prefix, fixture in PAGES.items():
+        if path.startswith(prefix):
+            return mocked_requests_get(fixture)
+    return mocked_requests_get(url, status_code=404)
+
+
+@patch.object(requests.Session, "get", side_effect=route)
+class TestHtmlSource(unittest.TestCase):
+    """Tests for ``UnderstatClient(source="html")``"""
+
+    def setUp(self):
+        self.league_page = read_page(PAGES["league/"])
+
+    def test_league(self, mock_get):
+        """test that every accessor is served from one download of the page"""
+        with UnderstatClient(source="html") as understat:
+            league = understat.league("EPL")
+            teams = league.get_team_data(season="2020")
+            players = league.get_player_data(season="2020")
+            dates = league.get_match_data(season="2020")
+        mock_get.assert_called_once()
+        self.assertEqual(
+            mock_get.call_args[0][0], "https://understat.com/league/EPL/2020"
+        )
+        parser = LeagueParser()
+        self.assertEqual(teams, parser.get_team_data(self.league_page))
+        self.assertEqual(players, parser.get_player_data(self.league_page))
+        self.assertEqual(dates, parser.get_match_data(self.league_page))
+
+    def test_without_cache(self, mock_get):
+        """test that an endpoint keeps its page when the cache is disabled"""
+        with UnderstatClient(source="html", cache_maxsize=0) as understat:
+            league = understat.league("EPL")
+            league.get_team_data(season="2020")
+            league.get_player_data(season="2020")
+        mock_get.assert_called_once()
+
+    def test_threads(self, mock_get):
+        """test that threads using one endpoint share one page download"""
+
+        def slow_route(url, *args, **kwargs):
+            time.sleep(0.05)
+            return route(url, *args, **kwargs)
+
+        mock_get.side_effect = slow_route
+        with UnderstatClient(source="html", cache_maxsize=0) as understat:
+            league = understat.league("EPL")
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                # pylint: disable=protected-access
+                futures = [
+                    executor.submit(
+                        league._fetch_page, "getLeagueData/EPL/2020"
+                    )
+                    for _ in range(4)
+                ]
+                results = [future.result() for future in futures]
+        mock_get.assert_called_once()
+        self.assertTrue(all(result is results[0] for result in results))
+
+    def test_match(self, mock_get):
+        """test that ``match_info`` is served as ``tmpl``"""
+        with UnderstatClient(source="html") as understat:
+            info = understat.match("14717").get_match_info()
+        self.assertEqual(
+            info, MatchParser().get_match_info(read_page(PAGES["match/"]))
+        )
+
+    def test_no_data(self, mock_get):
+        """test that a page without any datasets raises a ValueError"""
+        mock_get.side_effect = None
+        mock_get.return_value = mocked_requests_get(
+            "test/resources/minimal.html"
+        )
+        with UnderstatClient(source="html") as understat:
+            with self.assertRaises(ValueError):
+                understat.league("EPL").get_team_data(season="2020")
+
+    def test_auto(self, mock_get):
+        """test that ``auto`` falls back to the page when AJAX fails"""
+        mock_get.side_effect = [
+            mocked_requests_get("test/resources/data/league_ajax.json", 429),
+            route("https://understat.com/league/EPL/2020"),
+        ]
+        with UnderstatClient(source="auto") as understat:
+            teams = understat.league("EPL").get_team_data(season="2020")
+        self.assertEqual(teams, LeagueParser().get_team_data(self.league_page))
+        self.assertEqual(mock_get.call_count, 2)
+
+    def test_auto_ajax(self, mock_get):
+        """test that ``auto`` uses AJAX while it works"""
+        with UnderstatClient(source="auto") as understat:
+            understat.league("EPL").get_team_data(season="2020")
+        self.assertEqual(
+            mock_get.call_args[0][0],
+            "https://understat.com/getLeagueData/EPL/2020",
+        )
+
+    def test_stream(self, mock_get):
+        """test that streaming accessors read the page"""
+        with UnderstatClient(source="html", cache_maxsize=0) as understat:
+            players = list(
+                understat.league("EPL").iter_player_data(season="2020")
+            )
+        self.assertEqual(
+            players, LeagueParser().get_player_data(self.league_page)
+        )
+        self.assertEqual(
+            mock_get.call_args[0][0], "https://understat.com/league/EPL/2020"
+        )
+
+    def test_stream_auto(self, mock_get):
+        """test that ``auto`` streaming falls back to the page on failure"""
+        mock_get.side_effect = [
+            mocked_requests_get("test/resources/data/league_ajax.json", 429),
+            route("https://understat.com/league/EPL/2020"),
+        ]
+        with UnderstatClient(source="auto", cache_maxsize=0) as understat:
+            players = list(
+                understat.league("EPL").iter_player_data(season="2020")
+            )
+        self.assertEqual(
+            players, LeagueParser().get_player_data(self.league_page)
+        )
+        self.assertEqual(mock_get.call_count, 2)
+
+    def test_invalid_source(self, mock_get):
+        """test that an unknown source raises a ValueError"""
+        with self.assertRaises(ValueError):
+            UnderstatClient(source="xml")
+
+
+if __name__ == "__main__":
+    unittest.main()
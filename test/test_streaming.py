@@ -0,0 +1,230 @@
+# pylint: disable=unused-argument
+"""Test streaming sections of AJAX responses"""
+
+import io
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+from test import mocked_requests_get
+import requests
+from requests.adapters import HTTPAdapter
+from understatapi import UnderstatClient
+from understatapi.models import Fixture, Player
+from understatapi.replay import RecordingStore
+from understatapi.streaming import ijson, iter_section
+
+LEAGUE_PAYLOAD = "test/resources/data/league_ajax.json"
+
+
+def chunked(data, size):
+    """Split bytes into chunks of ``size``"""
+    return [data[i : i + size] for i in range(0, len(data), size)]
+
+
+class TestIterSection(unittest.TestCase):
+    """Tests for ``iter_section()``"""
+
+    backend = "python"
+
+    def setUp(self):
+        with open(LEAGUE_PAYLOAD, "rb") as file:
+            self.raw = file.read()
+        self.data = json.loads(self.raw)
+
+    def test_sections(self):
+        """test that each section matches the decoded document"""
+        for size in (100, 1 << 16):
+            for section in ("players", "dates"):
+                with self.subTest(size=size, section=section):
+                    items = iter_section(
+                        chunked(self.raw, size), section, backend=self.backend
+                    )
+                    self.assertEqual(list(items), self.data[section])
+
+    def test_awkward_values(self):
+        """test values which are split or look like structure"""
+        document = {
+            "skipped": {"a": 'q\\"}]\\\\', "b": [1, {"c": "]"}]},
+            "number": 12345,
+            "players": [1.5, "é", {"k": []}, 123456789, 1e-07, True, None],
+        }
+        raw = json.dumps(document, ensure_ascii=False).encode("utf-8")
+        for size in range(1, 8):
+            with self.subTest(size=size):
+                items = iter_section(
+                    chunked(raw, size), "players", self.backend
+                )
+                self.assertEqual(list(items), document["players"])
+
+    def test_missing_section(self):
+        """test that a missing section yields nothing"""
+        items = iter_section([b'{"teams": {}}'], "players", self.backend)
+        self.assertEqual(list(items), [])
+
+    def test_truncated(self):
+        """test that a truncated document raises an error"""
+        with self.assertRaises(ValueError):
+            list(iter_section([self.raw[:5000]], "players", self.backend))
+
+
+@unittest.skipIf(ijson is None, "ijson is not installed")
+class TestIterSectionIjson(TestIterSection):
+    """Tests for ``iter_section()`` with ijson"""
+
+    backend = "ijson"
+
+    def test_truncated(self):
+        """test that a truncated document raises an error"""
+        with self.assertRaises(ijson.JSONError):
+            list(iter_section([self.raw[:5000]], "dates", self.backend))
+
+
+@unittest.skipIf(ijson is None, "ijson is not installed")
+class TestBackendsAgree(unittest.TestCase):
+    """Tests that both backends decode numbers like ``json.loads()``"""
+
+    def test_numbers(self):
+        """test that each backend returns the same values and types"""
+        raw = (
+            b'{"players": [1, -0, 1.5, 1e5, 1E-2, -0.0, 2e0, 1e400, '
+            b'12345678901234567890123, {"xG": 0.05, "n": [7, 0.5]}]}'
+        )
+        expected = json.loads(raw)["players"]
+        for backend in ("python", "ijson"):
+            with self.subTest(backend=backend):
+                items = list(iter_section(chunked(raw, 7), "players", backend))
+                self.assertEqual(items, expected)
+                self.assertEqual(
+                    [type(item) for item in items],
+                    [type(item) for item in expected],
+                )
+                self.assertEqual(
+                    [type(value) for value in items[-1]["n"]], [int, float]
+                )
+
+
+class TestInvalidBackend(unittest.TestCase):
+    """Test an unknown backend"""
+
+    def test_invalid_backend(self):
+        """test that an unknown backend raises a ValueError"""
+        with self.assertRaises(ValueError):
+            iter_section([], "players", backend="yajl")
+
+
+@patch.object(requests.Session, "get")
+class TestLeagueStreaming(unittest.TestCase):
+    """Tests for the streaming accessors of ``LeagueEndpoint``"""
+
+    def setUp(self):
+        self.understat = UnderstatClient()
+
+    def tearDown(self):
+        self.understat.session.close()
+
+    def test_iter_player_data(self, mock_get):
+        """test ``iter_player_data()``"""
+        mock_get.return_value = mocked_requests_get(LEAGUE_PAYLOAD)
+        league = self.understat.league("EPL")
+        players = list(league.iter_player_data(season="2020"))
+        self.assertEqual(players, league.get_player_data(season="2020"))
+        self.assertTrue(mock_get.call_args_list[0].kwargs["stream"])
+
+    def test_iter_match_data_typed(self, mock_get):
+        """test ``iter_match_data()`` with ``typed=True``"""
+        mock_get.return_value = mocked_requests_get(LEAGUE_PAYLOAD)
+        fixtures = self.understat.league("EPL").iter_match_data(
+            "2020", typed=True
+        )
+        self.assertIsInstance(next(fixtures), Fixture)
+
+    def test_cached_payload(self, mock_get):
+        """test that a cached payload is streamed without a request"""
+        mock_get.return_value = mocked_requests_get(LEAGUE_PAYLOAD)
+        league = self.understat.league("EPL")
+        league.get_team_data(season="2020")
+        players = list(league.iter_player_data(season="2020", typed=True))
+        self.assertIsInstance(players[0], Player)
+        self.assertEqual(mock_get.call_count, 1)
+
+    def test_http_error(self, mock_get):
+        """test that HTTP errors are raised when iteration starts"""
+        mock_get.return_value = mocked_requests_get(
+            LEAGUE_PAYLOAD, status_code=500
+        )
+        players = self.understat.league("EPL").iter_player_data(season="2020")
+        with self.assertRaises(requests.HTTPError):
+            next(players)
+
+    def test_hooks(self, mock_get):
+        """test that streamed requests emit a ``request`` event"""
+        mock_get.return_value = mocked_requests_get(LEAGUE_PAYLOAD)
+        events = []
+        self.understat.hooks.register("request", events.append)
+        list(self.understat.league("EPL").iter_player_data(season="2020"))
+        self.assertEqual(len(events), 1)
+        self.assertEqual(events[0].endpoint, "getLeagueData")
+        self.assertIsNone(events[0].error)
+
+    def test_headers_not_mutated(self, mock_get):
+        """test that the caller's headers are not changed"""
+        mock_get.return_value = mocked_requests_get(LEAGUE_PAYLOAD)
+        headers = {"User-Agent": "test"}
+        players = self.understat.league("EPL").iter_player_data(
+            season="2020", headers=headers
+        )
+        list(players)
+        self.assertEqual(headers, {"User-Agent": "test"})
+        sent = mock_get.call_args_list[0].kwargs["headers"]
+        self.assertEqual(sent["X-Requested-With"], "XMLHttpRequest")
+
+
+class TestStreamingStores(unittest.TestCase):
+    """Tests for streaming responses served by the HTTP cache or recordings"""
+
+    def setUp(self):
+        # pylint: disable=consider-using-with
+        self.tmpdir = tempfile.TemporaryDirectory()
+        with open(LEAGUE_PAYLOAD, "rb") as file:
+            self.raw = file.read()
+        self.players = json.loads(self.raw)["players"]
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    @patch.object(HTTPAdapter, "send")
+    def test_http_cache(self, mock_send):
+        """test that streaming bypasses the HTTP cache"""
+        url = "https://understat.com/getLeagueData/EPL/2016"
+        raw = io.BytesIO(self.raw)
+        response = requests.Response()
+        response.status_code = 200
+        response.raw = raw
+        mock_send.return_value = response
+        path = os.path.join(self.tmpdir.name, "cache.sqlite")
+        with UnderstatClient(
+            http_cache=path, http_cache_max_age=3600, cache_maxsize=0
+        ) as understat:
+            players = understat.league("EPL").iter_player_data("2016")
+            self.assertEqual(next(players), self.players[0])
+            # the body is read as it is parsed, not buffered to be stored
+            self.assertLess(raw.tell(), len(self.raw))
+            self.assertEqual(list(players), self.players[1:])
+            self.assertTrue(mock_send.call_args.kwargs["stream"])
+            adapter = understat.transport.session.get_adapter(url)
+            self.assertIsNone(adapter.store.get(url))
+
+    def test_recordings(self):
+        """test streaming a recorded response"""
+        RecordingStore(self.tmpdir.name).set(
+            "getLeagueData/EPL/2016", self.raw
+        )
+        with UnderstatClient(recordings=self.tmpdir.name) as understat:
+            players = list(understat.league("EPL").iter_player_data("2016"))
+        self.assertEqual(players, self.players)
+
+
+if __name__ == "__main__":
+    unittest.main()
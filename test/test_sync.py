@@ -0,0 +1,159 @@
+# pylint: disable=unused-argument
+"""Test incremental syncing of league seasons"""
+
+import copy
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+from test import mocked_requests_get
+import requests
+from understatapi import UnderstatClient
+from understatapi.sync import SyncState, new_results
+
+with open("test/resources/data/league_ajax.json", encoding="utf-8") as fh:
+    LEAGUE = json.load(fh)
+PLAYED = [fixture for fixture in LEAGUE["dates"] if fixture["isResult"]]
+
+
+class MockLeagueResponse:
+    """A response with a league payload which can be changed between syncs"""
+
+    def __init__(self, data):
+        self.data = data
+        self.status_code = 200
+
+    @property
+    def content(self):
+        """Response.content"""
+        return json.dumps(self.data)
+
+    def raise_for_status(self):
+        """Response.raise_for_status()"""
+
+
+class TestSyncState(unittest.TestCase):
+    """Tests for ``SyncState``"""
+
+    def setUp(self):
+        # pylint: disable=consider-using-with
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "state.json")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_update(self):
+        """test that synced matches are added to the state"""
+        state = SyncState(self.path)
+        self.assertEqual(state.synced("EPL", "2020"), set())
+        state.update("EPL", "2020", PLAYED[1:3])
+        state.update("EPL", "2020", PLAYED[:1])
+        self.assertEqual(
+            state.synced("EPL", "2020"),
+            {fixture["id"] for fixture in PLAYED[:3]},
+        )
+        self.assertFalse(state.is_complete("EPL", "2020"))
+
+    def test_save(self):
+        """test that the state is persisted"""
+        state = SyncState(self.path)
+        state.update("EPL", "2020", PLAYED[:2], complete=True)
+        state.save()
+        loaded = SyncState(self.path)
+        self.assertEqual(
+            loaded.synced("EPL", "2020"), state.synced("EPL", "2020")
+        )
+        self.assertTrue(loaded.is_complete("EPL", "2020"))
+
+    def test_new_results(self):
+        """test that only unsynced results are new"""
+        synced = {fixture["id"] for fixture in PLAYED[:10]}
+        new = new_results(LEAGUE["dates"], synced)
+        self.assertEqual(new, PLAYED[10:])
+
+
+@patch.object(requests.Session, "get")
+class TestSync(unittest.TestCase):
+    """Tests for ``sync()``"""
+
+    def setUp(self):
+        # pylint: disable=consider-using-with
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "state.json")
+        self.league = copy.deepcopy(LEAGUE)
+        self.understat = UnderstatClient(cache_maxsize=0)
+
+    def tearDown(self):
+        self.understat.session.close()
+        self.tmpdir.cleanup()
+
+    def mocked_get(self, url, **kwargs):
+        """Mock ``requests.Session.get()`` for leagues and matches"""
+        if "getLeagueData" in url:
+            return MockLeagueResponse(self.league)
+        if url.endswith("/bad"):
+            return mocked_requests_get(url, status_code=404)
+        return mocked_requests_get("test/resources/data/match_ajax.json")
+
+    def test_first_sync(self, mock_get):
+        """test that the first sync fetches every finished match"""
+        mock_get.side_effect = self.mocked_get
+        result = self.understat.sync("EPL", "2020", state=self.path)
+        ids = [fixture["id"] for fixture in PLAYED]
+        self.assertEqual(result.new, {"EPL/2020": ids})
+        self.assertEqual(sorted(result.matches), sorted(ids))
+        self.assertEqual(
+            set(result.matches[ids[0]]), {"tmpl", "shots", "rosters"}
+        )
+        self.assertEqual(
+            SyncState(self.path).synced("EPL", "2020"),
+            {str(match) for match in ids},
+        )
+
+    def test_incremental_sync(self, mock_get):
+        """test that later syncs only fetch newly finished matches"""
+        mock_get.side_effect = self.mocked_get
+        self.understat.sync("EPL", "2020", state=self.path)
+        upcoming = [
+            fixture
+            for fixture in self.league["dates"]
+            if not fixture["isResult"]
+        ]
+        for fixture in upcoming[:3]:
+            fixture["isResult"] = True
+        mock_get.reset_mock()
+        result = self.understat.sync("EPL", "2020", state=self.path)
+        self.assertEqual(
+            result.new["EPL/2020"], [fixture["id"] for fixture in upcoming[:3]]
+        )
+        # one league request and three match requests per accessor
+        self.assertEqual(mock_get.call_count, 1 + 3 * 3)
+
+    def test_complete_season(self, mock_get):
+        """test that a complete season is skipped without requests"""
+        mock_get.side_effect = self.mocked_get
+        for fixture in self.league["dates"]:
+            fixture["isResult"] = True
+        self.understat.sync("EPL", "2020", state=self.path)
+        mock_get.reset_mock()
+        result = self.understat.sync("EPL", "2020", state=self.path)
+        self.assertEqual(result.skipped, ["EPL/2020"])
+        mock_get.assert_not_called()
+
+    def test_failed_match(self, mock_get):
+        """test that a failed match is tried again on the next sync"""
+        mock_get.side_effect = self.mocked_get
+        self.league["dates"] = copy.deepcopy(PLAYED[:2])
+        self.league["dates"][1]["id"] = "bad"
+        result = self.understat.sync("EPL", "2020", state=self.path)
+        self.assertEqual(list(result.errors), ["EPL/2020/bad"])
+        self.assertEqual(result.new["EPL/2020"], [PLAYED[0]["id"]])
+        result = self.understat.sync("EPL", "2020", state=self.path)
+        self.assertEqual(list(result.errors), ["EPL/2020/bad"])
+        self.assertEqual(result.new["EPL/2020"], [])
+
+
+if __name__ == "__main__":
+    unittest.main()
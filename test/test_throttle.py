@@ -0,0 +1,228 @@
+# pylint: disable=unused-argument
+"""Test rate limiting and retries"""
+
+import email.utils
+import time
+import unittest
+from unittest.mock import patch
+import requests
+from requests.adapters import HTTPAdapter
+from understatapi import UnderstatClient
+from understatapi.throttle import (
+    RateLimiter,
+    RetryPolicy,
+    RetryState,
+    ThrottledHTTPAdapter,
+    parse_retry_after,
+)
+
+URL = "https://understat.com/getMatchData/1"
+
+
+def make_response(status_code=200, headers=None):
+    """Build a ``requests.Response``"""
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = b"{}"  # pylint: disable=protected-access
+    response._content_consumed = True  # pylint: disable=protected-access
+    response.headers.update(headers or {})
+    return response
+
+
+class TestRateLimiter(unittest.TestCase):
+    """Tests for ``RateLimiter``"""
+
+    def test_burst(self):
+        """test that requests within the burst do not wait"""
+        limiter = RateLimiter(rate=10, burst=2)
+        self.assertEqual(limiter.acquire(), 0)
+        self.assertEqual(limiter.acquire(), 0)
+        start = time.monotonic()
+        self.assertGreater(limiter.acquire(), 0)
+        self.assertGreaterEqual(time.monotonic() - start, 0.09)
+
+    def test_try_acquire(self):
+        """test that ``try_acquire()`` returns the wait instead of sleeping"""
+        limiter = RateLimiter(rate=10, burst=1)
+        self.assertEqual(limiter.try_acquire(), 0)
+        self.assertAlmostEqual(limiter.try_acquire(), 0.1, places=2)
+
+    def test_adaptive(self):
+        """test that an adaptive limiter backs off and recovers"""
+        limiter = RateLimiter(rate=10, adaptive=True)
+        limiter.backoff()
+        self.assertEqual(limiter.rate, 5)
+        for _ in range(200):
+            limiter.recover()
+        self.assertEqual(limiter.rate, 10)
+
+    def test_not_adaptive(self):
+        """test that a non-adaptive limiter keeps its rate"""
+        limiter = RateLimiter(rate=10)
+        limiter.backoff()
+        self.assertEqual(limiter.rate, 10)
+
+    def test_invalid_rate(self):
+        """test that a non-positive rate raises a ValueError"""
+        with self.assertRaises(ValueError):
+            RateLimiter(rate=0)
+
+
+class TestRetryPolicy(unittest.TestCase):
+    """Tests for ``RetryPolicy``"""
+
+    def test_should_retry(self):
+        """test which failures are retried"""
+        policy = RetryPolicy(max_retries=2)
+        self.assertTrue(policy.should_retry(0, 503))
+        self.assertTrue(policy.should_retry(1, None))
+        self.assertFalse(policy.should_retry(0, 404))
+        self.assertFalse(policy.should_retry(2, 503))
+
+    def test_exponential_backoff(self):
+        """test that waits double with each attempt"""
+        policy = RetryPolicy(backoff_factor=1, max_backoff=5, jitter=False)
+        delays = [policy.get_backoff(attempt) for attempt in range(4)]
+        self.assertEqual(delays, [1, 2, 4, 5])
+
+    def test_jitter(self):
+        """test that jittered waits are no longer than the backoff"""
+        policy = RetryPolicy(backoff_factor=1)
+        for _ in range(20):
+            self.assertLessEqual(policy.get_backoff(2), 4)
+
+    def test_retry_after(self):
+        """test that ``Retry-After`` sets the minimum wait"""
+        policy = RetryPolicy(backoff_factor=1, jitter=False)
+        response = make_response(429, {"Retry-After": "7"})
+        self.assertEqual(policy.get_backoff(0, response), 7)
+
+    def test_parse_retry_after(self):
+        """test parsing ``Retry-After`` headers"""
+        self.assertEqual(parse_retry_after("3"), 3)
+        self.assertIsNone(parse_retry_after(None))
+        self.assertIsNone(parse_retry_after("soon"))
+        date = email.utils.formatdate(time.time() + 30, usegmt=True)
+        self.assertAlmostEqual(parse_retry_after(date), 30, delta=2)
+
+
+class TestRetryState(unittest.TestCase):
+    """Tests for ``RetryState``"""
+
+    def test_backoff(self):
+        """test which attempts are retried, and after how long"""
+        retry = RetryState(RetryPolicy(max_retries=1, jitter=False))
+        self.assertEqual(retry.backoff(make_response(503)), 0.5)
+        self.assertIsNone(retry.backoff(make_response(404)))
+        retry.attempt += 1
+        self.assertIsNone(retry.backoff())
+        self.assertIsNone(RetryState(None).backoff())
+
+    def test_deadline(self):
+        """test that attempts and waits end by the deadline"""
+        retry = RetryState(
+            RetryPolicy(backoff_factor=5, jitter=False, deadline=1)
+        )
+        self.assertIsNone(retry.backoff())
+        self.assertLessEqual(retry.timeout(30), 1)
+        self.assertEqual(retry.timeout(0.5), 0.5)
+        self.assertEqual(RetryState(RetryPolicy()).timeout(30), 30)
+
+
+@patch("understatapi.throttle.time.sleep")
+@patch.object(HTTPAdapter, "send")
+class TestThrottledHTTPAdapter(unittest.TestCase):
+    """Tests for ``ThrottledHTTPAdapter``"""
+
+    def setUp(self):
+        self.session = requests.Session()
+
+    def tearDown(self):
+        self.session.close()
+
+    def mount(self, **kwargs):
+        """Mount a ``ThrottledHTTPAdapter`` on the session"""
+        adapter = ThrottledHTTPAdapter(**kwargs)
+        self.session.mount("https://understat.com/", adapter)
+        return adapter
+
+    def test_retry_until_success(self, mock_send, mock_sleep):
+        """test that failed requests are retried"""
+        self.mount(retry_policy=RetryPolicy(jitter=False))
+        mock_send.side_effect = [
+            make_response(503),
+            make_response(429, {"Retry-After": "2"}),
+            make_response(200),
+        ]
+        res = self.session.get(URL)
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(mock_send.call_count, 3)
+        self.assertEqual(
+            [c.args[0] for c in mock_sleep.call_args_list], [0.5, 2]
+        )
+
+    def test_retries_exhausted(self, mock_send, mock_sleep):
+        """test that the last response is returned when retries run out"""
+        self.mount(retry_policy=RetryPolicy(max_retries=2))
+        mock_send.return_value = make_response(500)
+        res = self.session.get(URL)
+        self.assertEqual(res.status_code, 500)
+        self.assertEqual(mock_send.call_count, 3)
+
+    def test_no_retry_on_client_error(self, mock_send, mock_sleep):
+        """test that 404 responses are not retried"""
+        self.mount(retry_policy=RetryPolicy())
+        mock_send.return_value = make_response(404)
+        self.assertEqual(self.session.get(URL).status_code, 404)
+        self.assertEqual(mock_send.call_count, 1)
+
+    def test_connection_error(self, mock_send, mock_sleep):
+        """test that connection errors are retried and then raised"""
+        self.mount(retry_policy=RetryPolicy(max_retries=1))
+        mock_send.side_effect = requests.ConnectionError
+        with self.assertRaises(requests.ConnectionError):
+            self.session.get(URL)
+        self.assertEqual(mock_send.call_count, 2)
+
+    def test_deadline(self, mock_send, mock_sleep):
+        """test that no wait goes past the deadline"""
+        policy = RetryPolicy(jitter=False, backoff_factor=10, deadline=5)
+        self.mount(retry_policy=policy)
+        mock_send.return_value = make_response(503)
+        self.assertEqual(self.session.get(URL).status_code, 503)
+        self.assertEqual(mock_send.call_count, 1)
+        self.assertLessEqual(mock_send.call_args.kwargs["timeout"], 5)
+        mock_sleep.assert_not_called()
+
+    def test_rate_limiter_backoff(self, mock_send, mock_sleep):
+        """test that 429 responses slow down an adaptive rate limiter"""
+        limiter = RateLimiter(rate=100, adaptive=True)
+        self.mount(rate_limiter=limiter)
+        mock_send.return_value = make_response(429)
+        self.session.get(URL)
+        self.assertEqual(limiter.rate, 50)
+
+    def test_no_policy(self, mock_send, mock_sleep):
+        """test that without a policy requests are sent once"""
+        self.mount()
+        mock_send.return_value = make_response(503)
+        self.assertEqual(self.session.get(URL).status_code, 503)
+        self.assertEqual(mock_send.call_count, 1)
+
+
+class TestClientThrottling(unittest.TestCase):
+    """Test the throttling options of the client"""
+
+    def test_adapter_mounted(self):
+        """test that a throttled adapter is mounted for understat.com"""
+        policy = RetryPolicy()
+        with UnderstatClient(rate_limit=5, retry_policy=policy) as understat:
+            adapter = understat.session.get_adapter(URL)
+            self.assertIsInstance(adapter, ThrottledHTTPAdapter)
+            self.assertIs(adapter.retry_policy, policy)
+            self.assertIs(adapter.rate_limiter, understat.rate_limiter)
+            self.assertEqual(understat.rate_limiter.rate, 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
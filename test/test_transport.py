@@ -0,0 +1,202 @@
+# pylint: disable=unused-argument
+"""Test the transports which send the endpoints' requests"""
+
+import json
+import os
+import tempfile
+import unittest
+import httpx
+import requests
+from understatapi import UnderstatClient
+from understatapi.endpoints import PlayerEndpoint
+from understatapi.exceptions import InvalidMatch
+from understatapi.http_cache import CachingHTTPAdapter
+from understatapi.replay import RecordingAdapter, RecordingStore, StandInServer
+from understatapi.session import SessionPool
+from understatapi.throttle import ThrottledHTTPAdapter
+from understatapi.transport import (
+    BASE_URL,
+    CachedTransport,
+    HTTP2Transport,
+    MemoryTransport,
+    ReplayTransport,
+    RequestsTransport,
+    Transport,
+)
+
+PLAYER = "test/resources/data/player_ajax.json"
+LEAGUE = "test/resources/data/league_ajax.json"
+MATCH = "test/resources/data/match_ajax.json"
+
+
+def read_content(path):
+    """Read the bytes of a fixture"""
+    with open(path, "rb") as fh:
+        return fh.read()
+
+
+class TestTransports(unittest.TestCase):
+    """Tests for the built-in transports"""
+
+    def setUp(self):
+        # pylint: disable=consider-using-with
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_base(self):
+        """test that the base transport has no ``get``"""
+        with Transport() as transport:
+            with self.assertRaises(NotImplementedError):
+                transport.get(BASE_URL)
+
+    def test_requests(self):
+        """test that an adapter is mounted on the transport's session"""
+        adapter = ThrottledHTTPAdapter()
+        with RequestsTransport(adapter=adapter) as transport:
+            self.assertIsInstance(transport.session, SessionPool)
+            self.assertIs(transport.session.get_adapter(BASE_URL), adapter)
+
+    def test_cached(self):
+        """test that the cached transport mounts a caching adapter"""
+        path = os.path.join(self.tmpdir.name, "cache.sqlite")
+        with CachedTransport(path, max_age=60) as transport:
+            adapter = transport.session.get_adapter(BASE_URL)
+            self.assertIsInstance(adapter, CachingHTTPAdapter)
+            self.assertEqual(adapter.max_age, 60)
+            adapter.store.close()
+
+    def test_replay(self):
+        """test that the replay transport answers from the recordings"""
+        RecordingStore(self.tmpdir.name).set("getPlayerData/2371", b'{"a": 1}')
+        with ReplayTransport(self.tmpdir.name) as transport:
+            self.assertIsInstance(
+                transport.session.get_adapter(BASE_URL), RecordingAdapter
+            )
+            res = transport.get(BASE_URL + "getPlayerData/2371")
+        self.assertEqual(res.json(), {"a": 1})
+
+    def test_memory(self):
+        """test that the memory transport answers by path"""
+        transport = MemoryTransport({"getPlayerData/2371": b'{"a": 1}'})
+        res = transport.get(BASE_URL + "getPlayerData/2371")
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.json(), {"a": 1})
+        missing = transport.get(BASE_URL + "getPlayerData/1")
+        self.assertEqual(missing.status_code, 404)
+        with self.assertRaises(requests.HTTPError):
+            missing.raise_for_status()
+        query = MemoryTransport({"page?a=1": b"{}"})
+        self.assertEqual(
+            query.get(BASE_URL + "page", params={"a": 1}).status_code, 200
+        )
+        self.assertEqual(transport.requests, 2)
+
+
+class TestEndpointTransport(unittest.TestCase):
+    """Tests for endpoints which send requests with a transport"""
+
+    def setUp(self):
+        self.transport = MemoryTransport(
+            {
+                "getPlayerData/2371": read_content(PLAYER),
+                "getLeagueData/EPL/2019": read_content(LEAGUE),
+            }
+        )
+
+    def test_endpoint(self):
+        """test that an endpoint uses the transport it is given"""
+        player = PlayerEndpoint("2371", transport=self.transport)
+        data = player.get_shot_data()
+        self.assertEqual(data, json.loads(read_content(PLAYER))["shots"])
+        self.assertEqual(self.transport.requests, 1)
+
+    def test_default(self):
+        """test that an endpoint without a transport uses its session"""
+        session = requests.Session()
+        player = PlayerEndpoint("2371", session=session)
+        self.assertIsInstance(player.transport, RequestsTransport)
+        self.assertIs(player.transport.session, session)
+
+    def test_client(self):
+        """test that every endpoint of a client shares its transport"""
+        with UnderstatClient(
+            transport=self.transport, cache_maxsize=0
+        ) as understat:
+            understat.player("2371").get_shot_data()
+            understat.league("EPL").get_player_data(season="2019")
+            list(understat.league("EPL").iter_player_data(season="2019"))
+            batch = understat.player(["2371", "1"]).get_shot_data()
+        self.assertEqual(list(batch.errors), ["1"])
+        self.assertEqual(self.transport.requests, 5)
+
+    def test_client_default(self):
+        """test that the client builds a transport from its options"""
+        with UnderstatClient() as understat:
+            self.assertIsInstance(understat.transport, RequestsTransport)
+            self.assertIs(understat.transport.session, understat.session)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            with UnderstatClient(recordings=tmpdir) as understat:
+                self.assertIsInstance(understat.transport, ReplayTransport)
+
+
+class TestHTTP2Transport(unittest.TestCase):
+    """Tests for sending requests over HTTP/2"""
+
+    def setUp(self):
+        # pylint: disable=consider-using-with
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.content = read_content(MATCH)
+        store = RecordingStore(self.tmpdir.name)
+        self.match_ids = [str(14700 + i) for i in range(20)]
+        for match_id in self.match_ids:
+            store.set(f"getMatchData/{match_id}", self.content)
+        self.server = StandInServer(self.tmpdir.name, latency=0.05, http2=True)
+        self.server.start()
+        self.transport = HTTP2Transport(prior_knowledge=True)
+
+    def tearDown(self):
+        self.transport.close()
+        self.server.stop()
+        self.tmpdir.cleanup()
+
+    def test_get(self):
+        """test that a response is converted to a ``requests.Response``"""
+        res = self.transport.get(self.server.url + "getMatchData/14700")
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(getattr(res, "http_version"), "HTTP/2")
+        self.assertEqual(res.headers["Content-Type"], "application/json")
+        self.assertEqual(res.content, self.content)
+        missing = self.transport.get(self.server.url + "getMatchData/1")
+        with self.assertRaises(requests.HTTPError):
+            missing.raise_for_status()
+
+    def test_multiplexed(self):
+        """test that concurrent requests share one connection"""
+        with UnderstatClient(
+            transport=self.transport, base_url=self.server.url, cache_maxsize=0
+        ) as understat:
+            shots = understat.match(self.match_ids + ["1"]).get_shot_data(
+                max_workers=len(self.match_ids)
+            )
+            # pylint: disable=protected-access
+            connections = self.transport.client._transport._pool.connections
+            self.assertEqual(len(connections), 1)
+        self.assertEqual(list(shots), self.match_ids)
+        self.assertIsInstance(shots.errors["1"], InvalidMatch)
+
+    def test_client(self):
+        """test that a client of your own can be used"""
+        client = httpx.Client(
+            transport=httpx.MockTransport(lambda request: httpx.Response(200))
+        )
+        with HTTP2Transport(client=client) as transport:
+            self.assertEqual(
+                transport.get("https://understat.com/").status_code, 200
+            )
+        self.assertTrue(client.is_closed)
+
+
+if __name__ == "__main__":
+    unittest.main()
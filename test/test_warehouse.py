@@ -0,0 +1,162 @@
+# pylint: disable=unused-argument
+"""Test the local SQLite warehouse"""
+
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+from test import mocked_requests_get
+import requests
+from understatapi import UnderstatClient
+from understatapi.warehouse import Warehouse
+
+
+def read_payload(name):
+    """Read one of the AJAX fixtures"""
+    with open(f"test/resources/data/{name}", encoding="utf-8") as file:
+        return json.load(file)
+
+
+class TestWarehouse(unittest.TestCase):
+    """Tests for ``Warehouse``"""
+
+    def setUp(self):
+        self.warehouse = Warehouse(":memory:")
+
+    def tearDown(self):
+        self.warehouse.close()
+
+    def test_player(self):
+        """test querying the shots and matches of a player"""
+        data = read_payload("player_ajax.json")
+        self.assertTrue(self.warehouse.ingest("getPlayerData/647", data))
+        shots = self.warehouse.query("shots", player_id=647, season=2019)
+        expected = [shot for shot in data["shots"] if shot["season"] == "2019"]
+        self.assertEqual(
+            [shot["shot_id"] for shot in shots],
+            sorted(int(shot["id"]) for shot in expected),
+        )
+        self.assertIsInstance(shots[0]["xG"], float)
+        matches = self.warehouse.query("player_matches", player_id="647")
+        self.assertEqual(len(matches), len(data["matches"]))
+
+    def test_league(self):
+        """test querying the fixtures and players of a league"""
+        data = read_payload("league_ajax.json")
+        self.warehouse.ingest("getLeagueData/EPL/2020", data)
+        fixtures = self.warehouse.query("fixtures", team="Manchester_United")
+        self.assertEqual(len(fixtures), 38)
+        self.assertEqual({fixture["league"] for fixture in fixtures}, {"EPL"})
+        self.assertEqual({fixture["season"] for fixture in fixtures}, {2020})
+        players = self.warehouse.query("players", league="EPL", season="2020")
+        self.assertEqual(len(players), len(data["players"]))
+
+    def test_match(self):
+        """test querying the fixture, shots and rosters of a match"""
+        data = read_payload("match_ajax.json")
+        self.warehouse.ingest("getMatchData/14717", data)
+        (fixture,) = self.warehouse.query("fixtures", match_id=14717)
+        self.assertEqual(fixture["h_title"], data["tmpl"]["team_h"])
+        self.assertEqual(fixture["season"], 2020)
+        shots = self.warehouse.query("shots", match_id=14717)
+        self.assertEqual(
+            len(shots), len(data["shots"]["h"] + data["shots"]["a"])
+        )
+        rosters = self.warehouse.query(
+            "rosters", match_id=14717, team_id=[78, 89]
+        )
+        self.assertEqual(
+            len(rosters), len(data["rosters"]["h"]) + len(data["rosters"]["a"])
+        )
+
+    def test_merge(self):
+        """test that ingesting a row again fills in missing values"""
+        team = read_payload("team_ajax.json")
+        league = read_payload("league_ajax.json")
+        self.warehouse.ingest("getLeagueData/EPL/2020", league)
+        self.warehouse.ingest("getTeamData/Manchester_United/2020", team)
+        players = self.warehouse.query(
+            "players", player_id=int(team["players"][0]["id"]), season=2020
+        )
+        self.assertEqual([player["league"] for player in players], ["EPL"])
+
+    def test_indexes(self):
+        """test that lookups by player and season use an index"""
+        plan = (
+            self.warehouse._conn.execute(  # pylint: disable=protected-access
+                "EXPLAIN QUERY PLAN SELECT * FROM shots "
+                "WHERE player_id = 647 AND season = 2021"
+            ).fetchall()
+        )
+        self.assertIn("shots_player_id_season", str(plan))
+
+    def test_unknown_endpoint(self):
+        """test that payloads from unknown endpoints are not stored"""
+        self.assertFalse(self.warehouse.ingest("getSomethingElse/1", {}))
+
+    def test_invalid_query(self):
+        """test that invalid tables and columns raise a ValueError"""
+        with self.assertRaises(ValueError):
+            self.warehouse.query("goals")
+        with self.assertRaises(ValueError):
+            self.warehouse.query("shots", colour="red")
+        with self.assertRaises(ValueError):
+            self.warehouse.query("rosters", team="Arsenal")
+        with self.assertRaises(ValueError):
+            self.warehouse.query("shots", order_by=["colour"])
+
+
+@patch.object(requests.Session, "get")
+class TestClientWarehouse(unittest.TestCase):
+    """Tests for ``UnderstatClient(warehouse=...)``"""
+
+    def setUp(self):
+        # pylint: disable=consider-using-with
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "understat.db")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_query_offline(self, mock_get):
+        """test that downloaded payloads are queried without requests"""
+        mock_get.return_value = mocked_requests_get(
+            "test/resources/data/player_ajax.json"
+        )
+        with UnderstatClient(warehouse=self.path) as understat:
+            understat.player("647").get_shot_data()
+        mock_get.reset_mock()
+        with UnderstatClient(warehouse=self.path) as understat:
+            shots = understat.query("shots", player_id=647, season=2020)
+        mock_get.assert_not_called()
+        self.assertTrue(shots)
+        self.assertEqual({shot["season"] for shot in shots}, {2020})
+
+    def test_ingest_error(self, mock_get):
+        """test that a failed ingest is reported and the data returned"""
+        mock_get.return_value = mocked_requests_get(
+            "test/resources/data/player_ajax.json"
+        )
+        events = []
+        with UnderstatClient(warehouse=self.path) as understat:
+            understat.hooks.register("ingest", events.append)
+            with patch.object(
+                Warehouse, "ingest", side_effect=ValueError("full")
+            ):
+                with self.assertLogs("understatapi", level="WARNING"):
+                    shots = understat.player("647").get_shot_data()
+        self.assertTrue(shots)
+        self.assertEqual(len(events), 1)
+        self.assertEqual(events[0].path, "getPlayerData/647")
+        self.assertIsInstance(events[0].error, ValueError)
+
+    def test_no_warehouse(self, mock_get):
+        """test querying a client without a warehouse"""
+        with UnderstatClient() as understat:
+            with self.assertRaises(ValueError):
+                understat.query("shots")
+
+
+if __name__ == "__main__":
+    unittest.main()
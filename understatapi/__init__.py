@@ -1,5 +1,6 @@
 """An API for scraping data from understat.com"""
 
 from .api import UnderstatClient
+from .aio import AsyncUnderstatClient
 
 __version__ = "0.7.0"
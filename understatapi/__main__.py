@@ -0,0 +1,6 @@
+"""Run the ``understatapi`` command with ``python -m understatapi``"""
+
+import sys
+from .cli import main
+
+sys.exit(main())
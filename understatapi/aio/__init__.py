@@ -0,0 +1,10 @@
+"""Asyncio support, requires the optional ``httpx`` dependency"""
+
+from .api import AsyncUnderstatClient
+from .endpoints import (
+    AsyncBaseEndpoint,
+    AsyncLeagueEndpoint,
+    AsyncPlayerEndpoint,
+    AsyncTeamEndpoint,
+    AsyncMatchEndpoint,
+)
@@ -0,0 +1,195 @@
+"""Asynchronous understatAPI client"""
+
+from types import TracebackType
+from typing import Any, Dict, Optional, Union
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover
+    httpx = None  # type: ignore[assignment]
+from ..cache import CachePolicy, PayloadCache
+from ..decoders import Decoder, get_decoder
+from ..exceptions import PrimaryAttribute
+from ..metrics import Hooks, MetricsRegistry
+from ..throttle import RateLimiter, RetryPolicy
+from .endpoints import (
+    AsyncBaseEndpoint,
+    AsyncLeagueEndpoint,
+    AsyncPlayerEndpoint,
+    AsyncTeamEndpoint,
+    AsyncMatchEndpoint,
+)
+
+
+class AsyncUnderstatClient:  # pylint: disable=too-many-instance-attributes
+    """#pylint: disable=line-too-long
+    Asynchronous API client for understat
+
+    Mirrors :class:`~understatapi.api.UnderstatClient`, but every accessor
+    is a coroutine. All endpoints share one ``httpx.AsyncClient``, and so
+    one connection pool. Requires ``httpx``, which can be installed with
+    ``pip install understatapi[async]``
+
+    :Example:
+
+    .. code-block::
+
+        import asyncio
+        from understatapi.aio import AsyncUnderstatClient
+
+        async def main():
+            async with AsyncUnderstatClient() as understat:
+                shots = await asyncio.gather(
+                    *(understat.match(match=match_id).get_shot_data() for match_id in ["14711", "14712"])
+                )
+
+        asyncio.run(main())
+
+    Requests are limited, retried and reported to :attr:`hooks` and
+    :attr:`metrics` as they are by the blocking client. Unlike it, data
+    is only read from understat's AJAX endpoints, and payloads are not
+    persisted by an HTTP cache, recordings or a warehouse
+
+    .. code-block::
+
+        async with AsyncUnderstatClient(
+            rate_limit=5, retry_policy=RetryPolicy(max_retries=5), metrics=True
+        ) as understat:
+            shots = await understat.match(match="14711").get_shot_data()
+            print(understat.metrics.render())
+
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments,too-many-locals
+        self,
+        *,
+        cache_maxsize: int = 128,
+        cache_ttl: Optional[float] = 300.0,
+        season_aware_cache: bool = True,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        json_decoder: Union[str, Decoder] = "auto",
+        rate_limit: Optional[float] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        metrics: bool = False,
+        base_url: Optional[str] = None,
+    ) -> None:
+        """
+        :param cache_maxsize: Maximum number of decoded payloads to cache,
+            ``0`` disables the cache
+        :param cache_ttl: Number of seconds for which a cached payload is
+            valid, ``None`` means payloads never expire
+        :param season_aware_cache: Cache the data of finished seasons and
+            matches without it expiring, as it can never change, see
+            :class:`~understatapi.cache.CachePolicy`
+        :param max_connections: Maximum number of concurrent connections
+        :param max_keepalive_connections: Maximum number of idle
+            connections to keep open
+        :param json_decoder: The name of the library used to decode AJAX
+            responses, see :func:`~understatapi.decoders.get_decoder`, or a
+            function which takes the raw bytes of a response
+        :param rate_limit: Maximum number of requests per second, which
+            is halved whenever understat answers with ``429 Too Many
+            Requests``. ``None`` for no limit
+        :param retry_policy: How to retry failed requests, ``None`` to
+            never retry
+        :param metrics: Whether to record metrics of the requests which
+            are made in :attr:`metrics`, see
+            :class:`~understatapi.metrics.MetricsRegistry`
+        :param base_url: The url to send requests to instead of
+            ``https://understat.com/``
+        """
+        if httpx is None:  # pragma: no cover
+            raise ImportError(
+                "AsyncUnderstatClient requires httpx, install it with "
+                "``pip install understatapi[async]``"
+            )
+        self.client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+            )
+        )
+        self.cache_policy = CachePolicy() if season_aware_cache else None
+        self.cache = PayloadCache(
+            maxsize=cache_maxsize, ttl=cache_ttl, policy=self.cache_policy
+        )
+        self.decoder = (
+            get_decoder(json_decoder)
+            if isinstance(json_decoder, str)
+            else json_decoder
+        )
+        self.hooks = Hooks()
+        self.metrics = MetricsRegistry() if metrics else None
+        if self.metrics is not None:
+            self.metrics.attach(self.hooks)
+        self.rate_limiter = (
+            RateLimiter(rate=rate_limit, adaptive=True)
+            if rate_limit is not None
+            else None
+        )
+        self.retry_policy = retry_policy
+        self.base_url = base_url
+
+    async def __aenter__(self) -> "AsyncUnderstatClient":
+        return self
+
+    async def __aexit__(
+        self,
+        exception_type: type,
+        exception_value: BaseException,
+        traceback: TracebackType,
+    ) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """Close the underlying connection pool"""
+        await self.client.aclose()
+
+    def _endpoint_kwargs(self) -> Dict[str, Any]:
+        """Keyword arguments used to create an endpoint"""
+        return {
+            name: getattr(self, name)
+            for name in AsyncBaseEndpoint.shared_attrs
+        }
+
+    def league(self, league: PrimaryAttribute) -> AsyncLeagueEndpoint:
+        """
+        Endpoint for league data. Use this function to get data from a
+        url of the form ``https://understat.com/league/<league>/<season>``
+
+        :param league: Name of the league(s) to get data for,
+            one of {EPL, La_Liga, Bundesliga, Serie_A, Ligue_1, RFPL}
+        :rtype: :py:class:`~understatapi.aio.endpoints.AsyncLeagueEndpoint`
+        """
+        return AsyncLeagueEndpoint(league=league, **self._endpoint_kwargs())
+
+    def player(self, player: PrimaryAttribute) -> AsyncPlayerEndpoint:
+        """
+        Endpoint for player data. Use this function to get data from a
+        url of the form ``https://understat.com/player/<player_id>/``
+
+        :param player: Id of the player(s) to get data for
+        :rtype: :py:class:`~understatapi.aio.endpoints.AsyncPlayerEndpoint`
+        """
+        return AsyncPlayerEndpoint(player=player, **self._endpoint_kwargs())
+
+    def team(self, team: PrimaryAttribute) -> AsyncTeamEndpoint:
+        """
+        Endpoint for team data. Use this function to get data from a
+        url of the form ``https://understat.com/team/<team>/<season>``
+
+        :param team: Name of the team(s) to get data for
+        :rtype: :py:class:`~understatapi.aio.endpoints.AsyncTeamEndpoint`
+        """
+        return AsyncTeamEndpoint(team=team, **self._endpoint_kwargs())
+
+    def match(self, match: PrimaryAttribute) -> AsyncMatchEndpoint:
+        """
+        Endpoint for match data. Use this function to get data from a
+        url of the form ``https://understat.com/match/<match_id>``
+
+        :param match: Id of match(es) to get data for
+        :rtype: :py:class:`~understatapi.aio.endpoints.AsyncMatchEndpoint`
+        """
+        return AsyncMatchEndpoint(match=match, **self._endpoint_kwargs())
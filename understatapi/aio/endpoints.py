@@ -0,0 +1,593 @@
+"""Asynchronous endpoints"""
+
+import asyncio
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover
+    httpx = None  # type: ignore[assignment]
+from ..cache import PayloadCache
+from ..decoders import Decoder, get_decoder
+from ..exceptions import PrimaryAttribute
+from ..metrics import (
+    CacheEvent,
+    Hooks,
+    RequestTimer,
+    RetryEvent,
+    endpoint_name,
+)
+from ..models import Fixture, Player, PlayerMatch, RosterEntry, Shot
+from ..protocol import (
+    AJAX_HEADERS,
+    BASE_URL,
+    Endpoint,
+    Query,
+    Request,
+    cache_key,
+    league_request,
+    match_request,
+    player_request,
+    team_request,
+)
+from ..throttle import RateLimiter, RetryPolicy, RetryState
+
+
+class AsyncBaseEndpoint(
+    Endpoint
+):  # pylint: disable=too-many-instance-attributes
+    """
+    Base endpoint for the asynchronous understat API. Requests are
+    described by :mod:`~understatapi.protocol`, as they are for
+    :class:`~understatapi.endpoints.base.BaseEndpoint`, but are sent with
+    a shared ``httpx.AsyncClient`` and must be awaited. Payloads are only
+    read from the AJAX endpoints, there is no html source, warehouse or
+    persistent cache
+
+    :attr base_url: str: The base url to use for requests,
+        ``https://understat.com/``
+    """
+
+    base_url = BASE_URL
+    shared_attrs = (
+        "client",
+        "cache",
+        "decoder",
+        "hooks",
+        "rate_limiter",
+        "retry_policy",
+        "base_url",
+    )
+
+    def __init__(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+        self,
+        primary_attr: PrimaryAttribute,
+        client: "httpx.AsyncClient",
+        cache: Optional[PayloadCache] = None,
+        decoder: Optional[Decoder] = None,
+        hooks: Optional[Hooks] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        base_url: Optional[str] = None,
+    ) -> None:
+        """
+        :param primary_attr: The primary attribute of the endpoint
+        :param client: The ``httpx.AsyncClient`` used to make requests
+        :param cache: Cache shared between endpoints for decoded AJAX
+            payloads, ``None`` to always make a request
+        :param decoder: Function which decodes the raw bytes of an AJAX
+            response, ``None`` to use the fastest installed JSON library
+        :param hooks: Functions to call when requests are made, see
+            :mod:`~understatapi.metrics`
+        :param rate_limiter: Limits the rate of requests, ``None`` for
+            no limit
+        :param retry_policy: Decides which requests to retry, ``None``
+            to never retry
+        :param base_url: The url to send requests to instead of
+            :attr:`base_url`, e.g. a
+            :class:`~understatapi.replay.StandInServer`
+        """
+        self.client = client
+        self.cache = cache
+        self.decoder = decoder if decoder is not None else get_decoder()
+        self.hooks = hooks
+        self.rate_limiter = rate_limiter
+        self.retry_policy = retry_policy
+        if base_url is not None:
+            self.base_url = base_url
+        super().__init__(primary_attr)
+
+    async def _run(self, query: Query, **kwargs: Any) -> Any:
+        """
+        Send the request of a query and read its section of the payload
+
+        :param query: The request, and what to return from its payload
+        :param kwargs: Keyword arguments to pass to :meth:`_load`
+        """
+        return query.result(await self._load(query.request, **kwargs))
+
+    async def _load(self, request: Request, **kwargs: Any) -> Dict[str, Any]:
+        """
+        Get the payload of a request, raising the error of the request's
+        entity if the server answers with an error
+
+        :param request: The request to send
+        :param kwargs: Keyword arguments to pass to :meth:`_request_ajax`
+        """
+        try:
+            return await self._request_ajax(request.path, **kwargs)
+        except httpx.HTTPStatusError as err:
+            error = request.error()
+            if error is None:
+                raise
+            raise error from err
+
+    async def _request_url(self, url: str, **kwargs: Any) -> "httpx.Response":
+        """
+        Send a HTTP request to a url, and check that this request worked.
+
+        :param url: The url to request
+        :param kwargs: Keyword arguments to pass to
+            ``httpx.AsyncClient.get()``
+        """
+        res, _ = await self._timed_get("page", url, **kwargs)
+        return res
+
+    async def _timed_get(
+        self,
+        name: str,
+        url: str,
+        decoder: Optional[Decoder] = None,
+        **kwargs: Any,
+    ) -> Tuple["httpx.Response", Any]:
+        """
+        Send a HTTP request, check that it worked and optionally decode the
+        response, emitting a ``request`` event if the endpoint has hooks
+
+        :param name: The name used to label the request, see
+            :class:`~understatapi.metrics.RequestEvent`
+        :param url: The url to request
+        :param decoder: Function which decodes the body of the response
+        :param kwargs: Keyword arguments to pass to
+            ``httpx.AsyncClient.get()``
+        :return: The response, and the decoded body or ``None``
+        """
+        with RequestTimer(self.hooks, name, url) as timer:
+            res = timer.received(await self._send(url, **kwargs))
+            res.raise_for_status()
+            data = None
+            if decoder is not None:
+                data = timer.decode(decoder, res.content)
+            timer.size = len(res.content)
+            return res, data
+
+    async def _acquire(self) -> None:
+        """Wait until the rate limiter allows a request to be sent"""
+        if self.rate_limiter is None:
+            return
+        delay = self.rate_limiter.try_acquire()
+        while delay:
+            await asyncio.sleep(delay)
+            delay = self.rate_limiter.try_acquire()
+
+    async def _send(self, url: str, **kwargs: Any) -> "httpx.Response":
+        """
+        Send a request once the rate limiter allows it, retrying failed
+        attempts according to the retry policy, like
+        :class:`~understatapi.throttle.ThrottledHTTPAdapter`. If every
+        attempt fails, the last response is returned, or the last
+        connection error is raised
+
+        :param url: The url to request
+        :param kwargs: Keyword arguments to pass to
+            ``httpx.AsyncClient.get()``
+        """
+        retry = RetryState(self.retry_policy)
+        timeout = kwargs.get("timeout")
+        while True:
+            await self._acquire()
+            if retry.deadline is not None:
+                kwargs["timeout"] = retry.timeout(timeout)
+            try:
+                response = await self.client.get(url, **kwargs)
+            except httpx.TransportError:
+                delay = retry.backoff()
+                if delay is None:
+                    raise
+                status_code = None
+            else:
+                if self.rate_limiter is not None:
+                    self.rate_limiter.observe(response.status_code)
+                delay = retry.backoff(response)
+                if delay is None:
+                    return response
+                await response.aclose()
+                status_code = response.status_code
+            if self.hooks is not None:
+                self.hooks.emit(
+                    "retry",
+                    RetryEvent(url, retry.attempt, status_code, delay),
+                )
+            await asyncio.sleep(delay)
+            retry.attempt += 1
+
+    async def _request_ajax(
+        self, endpoint: str, **kwargs: Any
+    ) -> Dict[str, Any]:
+        """
+        Make an AJAX request to Understat's internal API endpoints.
+        Coroutines asking for a payload which is already being fetched
+        wait for that request instead of making their own.
+
+        :param endpoint: The AJAX endpoint path
+            (e.g., 'getLeagueData/EPL/2024')
+        :param kwargs: Additional keyword arguments to pass to
+            ``httpx.AsyncClient.get()``
+        :return: Parsed JSON response as a dictionary
+        """
+        if self.cache is None:
+            return await self._fetch_ajax(endpoint, **kwargs)
+        key = cache_key(endpoint, kwargs.get("params"))
+        loaded = []
+
+        async def load() -> Dict[str, Any]:
+            loaded.append(True)
+            return await self._fetch_ajax(endpoint, **kwargs)
+
+        data = await self.cache.get_or_load_async(key, load)
+        if self.hooks is not None:
+            self.hooks.emit(
+                "cache",
+                CacheEvent(endpoint_name(endpoint), key, hit=not loaded),
+            )
+        return data
+
+    async def _fetch_ajax(
+        self, endpoint: str, **kwargs: Any
+    ) -> Dict[str, Any]:
+        """
+        Request and decode an AJAX payload, bypassing the cache
+
+        :param endpoint: The AJAX endpoint path
+            (e.g., 'getLeagueData/EPL/2024')
+        :param kwargs: Additional keyword arguments to pass to
+            ``httpx.AsyncClient.get()``
+        """
+        headers = dict(kwargs.pop("headers", {}))
+        headers.update(AJAX_HEADERS)
+        _, data = await self._timed_get(
+            endpoint_name(endpoint),
+            self.base_url + endpoint,
+            headers=headers,
+            decoder=self.decoder,
+            **kwargs,
+        )
+        return data
+
+
+class AsyncLeagueEndpoint(AsyncBaseEndpoint):
+    """
+    Asynchronous version of
+    :class:`~understatapi.endpoints.league.LeagueEndpoint`
+    """
+
+    def __init__(
+        self,
+        league: PrimaryAttribute,
+        client: "httpx.AsyncClient",
+        **kwargs: Any,
+    ) -> None:
+        """
+        :param league: Name of the league(s) to get data for,
+            one of {EPL, La_Liga, Bundesliga, Serie_A, Ligue_1, RFPL}
+        :param client: The ``httpx.AsyncClient`` used to make requests
+        :param kwargs: Keyword arguments to pass to
+            :class:`~understatapi.aio.endpoints.AsyncBaseEndpoint`
+        """
+        super().__init__(primary_attr=league, client=client, **kwargs)
+
+    @property
+    def league(self) -> PrimaryAttribute:
+        """league name"""
+        return self._primary_attr
+
+    def _request(self, season: str) -> Request:
+        """
+        The AJAX request for the league's data
+
+        :param season: Season to get data for
+        """
+        return league_request(self.league, season)
+
+    async def get_team_data(
+        self, season: str, **kwargs: Any
+    ) -> Dict[str, Any]:
+        """
+        Get data for all teams in a given league and season
+
+        :param season: Season to get data for
+        :param kwargs: Keyword argument to pass to
+            :meth:`understatapi.aio.endpoints.AsyncBaseEndpoint._request_ajax`
+        """
+        return await self._run(
+            Query(self._request(season), "teams", shape="mapping"), **kwargs
+        )
+
+    async def get_match_data(
+        self, season: str, typed: bool = False, **kwargs: Any
+    ) -> Union[List[Dict[str, Any]], List[Fixture]]:
+        """
+        Get data for all fixtures in a given league and season.
+
+        :param season: Season to get data for
+        :param typed: Return :class:`~understatapi.models.Fixture` records,
+            with numbers already converted, instead of dictionaries
+        :param kwargs: Keyword argument to pass to
+            :meth:`understatapi.aio.endpoints.AsyncBaseEndpoint._request_ajax`
+        """
+        return await self._run(
+            Query(self._request(season), "dates", Fixture, typed), **kwargs
+        )
+
+    async def get_player_data(
+        self,
+        season: str,
+        typed: bool = False,
+        format: Optional[str] = None,  # pylint: disable=redefined-builtin
+        **kwargs: Any,
+    ) -> Any:
+        """
+        Get data for all players in a given league and season
+
+        :param season: Season to get data for
+        :param typed: Return :class:`~understatapi.models.Player` records,
+            with numbers already converted, instead of dictionaries
+        :param format: ``columns`` to return a dictionary of NumPy arrays,
+            or ``arrow`` to return a ``pyarrow.Table``, see
+            :func:`~understatapi.columns.to_columns`
+        :param kwargs: Keyword argument to pass to
+            :meth:`understatapi.aio.endpoints.AsyncBaseEndpoint._request_ajax`
+        """
+        return await self._run(
+            Query(self._request(season), "players", Player, typed, format),
+            **kwargs,
+        )
+
+
+class AsyncPlayerEndpoint(AsyncBaseEndpoint):
+    """
+    Asynchronous version of
+    :class:`~understatapi.endpoints.player.PlayerEndpoint`
+    """
+
+    def __init__(
+        self,
+        player: PrimaryAttribute,
+        client: "httpx.AsyncClient",
+        **kwargs: Any,
+    ) -> None:
+        """
+        :param player: Id of the player(s) to get data for
+        :param client: The ``httpx.AsyncClient`` used to make requests
+        :param kwargs: Keyword arguments to pass to
+            :class:`~understatapi.aio.endpoints.AsyncBaseEndpoint`
+        """
+        super().__init__(primary_attr=player, client=client, **kwargs)
+
+    @property
+    def player(self) -> PrimaryAttribute:
+        """player id"""
+        return self._primary_attr
+
+    def _request(self) -> Request:
+        """The AJAX request for the player's data"""
+        return player_request(self.player)
+
+    async def get_match_data(
+        self, typed: bool = False, **kwargs: Any
+    ) -> Union[List[Dict[str, Any]], List[PlayerMatch]]:
+        """
+        Get match level data for a player
+
+        :param typed: Return :class:`~understatapi.models.PlayerMatch` records,
+            with numbers already converted, instead of dictionaries
+        :param kwargs: Keyword argument to pass to
+            :meth:`understatapi.aio.endpoints.AsyncBaseEndpoint._request_ajax`
+        """
+        return await self._run(
+            Query(self._request(), "matches", PlayerMatch, typed), **kwargs
+        )
+
+    async def get_shot_data(
+        self,
+        typed: bool = False,
+        format: Optional[str] = None,  # pylint: disable=redefined-builtin
+        **kwargs: Any,
+    ) -> Any:
+        """
+        Get shot level data for a player
+
+        :param typed: Return :class:`~understatapi.models.Shot` records,
+            with numbers already converted, instead of dictionaries
+        :param format: ``columns`` to return a dictionary of NumPy arrays,
+            or ``arrow`` to return a ``pyarrow.Table``, see
+            :func:`~understatapi.columns.to_columns`
+        :param kwargs: Keyword argument to pass to
+            :meth:`understatapi.aio.endpoints.AsyncBaseEndpoint._request_ajax`
+        """
+        return await self._run(
+            Query(self._request(), "shots", Shot, typed, format), **kwargs
+        )
+
+    async def get_season_data(self, **kwargs: Any) -> List[Dict[str, Any]]:
+        """
+        Get season level data for a player
+
+        :param kwargs: Keyword argument to pass to
+            :meth:`understatapi.aio.endpoints.AsyncBaseEndpoint._request_ajax`
+        """
+        return await self._run(Query(self._request(), "groups"), **kwargs)
+
+
+class AsyncTeamEndpoint(AsyncBaseEndpoint):
+    """
+    Asynchronous version of
+    :class:`~understatapi.endpoints.team.TeamEndpoint`
+    """
+
+    def __init__(
+        self,
+        team: PrimaryAttribute,
+        client: "httpx.AsyncClient",
+        **kwargs: Any,
+    ) -> None:
+        """
+        :param team: Name of the team(s) to get data for
+        :param client: The ``httpx.AsyncClient`` used to make requests
+        :param kwargs: Keyword arguments to pass to
+            :class:`~understatapi.aio.endpoints.AsyncBaseEndpoint`
+        """
+        super().__init__(primary_attr=team, client=client, **kwargs)
+
+    @property
+    def team(self) -> PrimaryAttribute:
+        """team name"""
+        return self._primary_attr
+
+    def _request(self, season: str) -> Request:
+        """
+        The AJAX request for the team's data
+
+        :param season: Season to get data for
+        """
+        return team_request(self.team, season)
+
+    async def get_player_data(
+        self,
+        season: str,
+        typed: bool = False,
+        format: Optional[str] = None,  # pylint: disable=redefined-builtin
+        **kwargs: Any,
+    ) -> Any:
+        """
+        Get data for all players on a given team in a given season
+
+        :param season: Season to get data for
+        :param typed: Return :class:`~understatapi.models.Player` records,
+            with numbers already converted, instead of dictionaries
+        :param format: ``columns`` to return a dictionary of NumPy arrays,
+            or ``arrow`` to return a ``pyarrow.Table``, see
+            :func:`~understatapi.columns.to_columns`
+        :param kwargs: Keyword argument to pass to
+            :meth:`understatapi.aio.endpoints.AsyncBaseEndpoint._request_ajax`
+        """
+        return await self._run(
+            Query(self._request(season), "players", Player, typed, format),
+            **kwargs,
+        )
+
+    async def get_match_data(
+        self, season: str, typed: bool = False, **kwargs: Any
+    ) -> Union[List[Dict[str, Any]], List[Fixture]]:
+        """
+        Get data on a per match level for a given team in a given season
+
+        :param season: Season to get data for
+        :param typed: Return :class:`~understatapi.models.Fixture` records,
+            with numbers already converted, instead of dictionaries
+        :param kwargs: Keyword argument to pass to
+            :meth:`understatapi.aio.endpoints.AsyncBaseEndpoint._request_ajax`
+        """
+        return await self._run(
+            Query(self._request(season), "dates", Fixture, typed), **kwargs
+        )
+
+    async def get_context_data(
+        self, season: str, **kwargs: Any
+    ) -> Dict[str, Any]:
+        """
+        Get data based on different contexts in the game
+
+        :param season: Season to get data for
+        :param kwargs: Keyword argument to pass to
+            :meth:`understatapi.aio.endpoints.AsyncBaseEndpoint._request_ajax`
+        """
+        return await self._run(
+            Query(self._request(season), "statistics", shape="mapping"),
+            **kwargs,
+        )
+
+
+class AsyncMatchEndpoint(AsyncBaseEndpoint):
+    """
+    Asynchronous version of
+    :class:`~understatapi.endpoints.match.MatchEndpoint`
+    """
+
+    def __init__(
+        self,
+        match: PrimaryAttribute,
+        client: "httpx.AsyncClient",
+        **kwargs: Any,
+    ) -> None:
+        """
+        :param match: Id of match(es) to get data for
+        :param client: The ``httpx.AsyncClient`` used to make requests
+        :param kwargs: Keyword arguments to pass to
+            :class:`~understatapi.aio.endpoints.AsyncBaseEndpoint`
+        """
+        super().__init__(primary_attr=match, client=client, **kwargs)
+
+    @property
+    def match(self) -> PrimaryAttribute:
+        """match id"""
+        return self._primary_attr
+
+    def _request(self) -> Request:
+        """The AJAX request for the match's data"""
+        return match_request(self.match)
+
+    async def get_shot_data(
+        self, typed: bool = False, **kwargs: Any
+    ) -> Dict[str, Any]:
+        """
+        Get shot level data for a match
+
+        :param typed: Return :class:`~understatapi.models.Shot` records,
+            with numbers already converted, instead of dictionaries
+        :param kwargs: Keyword argument to pass to
+            :meth:`understatapi.aio.endpoints.AsyncBaseEndpoint._request_ajax`
+        """
+        return await self._run(
+            Query(self._request(), "shots", Shot, typed, shape="sides"),
+            **kwargs,
+        )
+
+    async def get_roster_data(
+        self, typed: bool = False, **kwargs: Any
+    ) -> Dict[str, Any]:
+        """
+        Get data about the roster for each team
+
+        :param typed: Return :class:`~understatapi.models.RosterEntry` records,
+            with numbers already converted, instead of dictionaries
+        :param kwargs: Keyword argument to pass to
+            :meth:`understatapi.aio.endpoints.AsyncBaseEndpoint._request_ajax`
+        """
+        return await self._run(
+            Query(
+                self._request(), "rosters", RosterEntry, typed, shape="roster"
+            ),
+            **kwargs,
+        )
+
+    async def get_match_info(self, **kwargs: Any) -> Dict[str, Any]:
+        """
+        Get information about the match
+
+        :param kwargs: Keyword argument to pass to
+            :meth:`understatapi.aio.endpoints.AsyncBaseEndpoint._request_ajax`
+        """
+        return await self._run(
+            Query(self._request(), "tmpl", shape="mapping"), **kwargs
+        )
@@ -1,24 +1,42 @@
 """understatAPI client"""
 
 from types import TracebackType
-import requests
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Union
+from requests.utils import DEFAULT_ACCEPT_ENCODING
+from . import crawler
+from .cache import CachePolicy, PayloadCache
+from .decoders import Decoder, get_decoder
+from .metrics import Hooks, MetricsRegistry
+from .session import SessionPool
+from .sync import SyncResult, SyncState, sync as sync_seasons
+from .throttle import RateLimiter, RetryPolicy, ThrottledHTTPAdapter
+from .transport import (
+    CachedTransport,
+    ReplayTransport,
+    RequestsTransport,
+    Transport,
+)
 from .utils import get_public_methods, str_to_class, find_endpoints
+from .warehouse import Warehouse
 from .endpoints import (
+    BaseEndpoint,
     LeagueEndpoint,
     PlayerEndpoint,
     TeamEndpoint,
     MatchEndpoint,
 )
+from .endpoints.base import SOURCES
 from .exceptions import PrimaryAttribute
 
 
-class UnderstatClient:
+class UnderstatClient:  # pylint: disable=too-many-instance-attributes
     """#pylint: disable=line-too-long
     API client for understat
 
     The main interface for interacting with understatAPI. Exposes
     each of the entrypoints, maintains a consistent
-    session and handles errors
+    session and handles errors. A client can be shared between threads,
+    see :class:`~understatapi.session.SessionPool`
 
     :Example:
 
@@ -50,10 +68,243 @@ class UnderstatClient:
         AttributeError: 'TeamEndpoint' object has no attribute 'get_bad_data'
         Its public methods are ['get_context_data', 'get_match_data', 'get_player_data']
 
+    Decoded AJAX payloads are cached and shared by every endpoint the
+    client creates, so asking for several views of the same data only
+    makes one request. Threads which ask for a payload while it is being
+    downloaded wait for that download, rather than making their own request
+
+    .. code-block::
+
+        with UnderstatClient() as understat:
+            league = understat.league(league="EPL")
+            team_data = league.get_team_data(season="2019")
+            player_data = league.get_player_data(season="2019")  # cached
+            print(understat.cache.stats())
+            understat.cache.invalidate("getLeagueData/EPL/2019")
+
+    Responses can also be stored on disk, so that they survive restarts.
+    Stored responses are revalidated with the server where it supports
+    ``ETag``/``Last-Modified`` headers, rather than downloaded again
+
+    .. code-block::
+
+        with UnderstatClient(http_cache="understat.sqlite") as understat:
+            player_data = understat.league(league="EPL").get_player_data(season="2019")
+
+    The connection pool can be sized to match the number of threads making
+    requests at once, for example when calling accessors on endpoints with
+    several primary attributes
+
+    .. code-block::
+
+        with UnderstatClient(pool_maxsize=32) as understat:
+            shot_data = understat.match(match=match_ids).get_shot_data(max_workers=32)
+
+    Functions can be registered to be called for every request, retry and
+    cache lookup, see :mod:`~understatapi.metrics`. With ``metrics=True``,
+    counters and histograms of these are kept and can be exported in the
+    Prometheus text format
+
+    .. code-block::
+
+        with UnderstatClient(metrics=True) as understat:
+            understat.hooks.register(
+                "request", lambda event: print(event.url, event.elapsed)
+            )
+            player_data = understat.league(league="EPL").get_player_data(season="2019")
+            print(understat.metrics.render())
+
+    AJAX responses can be recorded to disk and replayed later without
+    making any requests, or served with realistic latency by a
+    :class:`~understatapi.replay.StandInServer` for load testing
+
+    .. code-block::
+
+        with UnderstatClient(recordings="recordings", recording_mode="record") as understat:
+            player_data = understat.league(league="EPL").get_player_data(season="2019")
+
+        with UnderstatClient(recordings="recordings") as understat:
+            player_data = understat.league(league="EPL").get_player_data(season="2019")
+
+    Requests can also be sent by a transport of your own, see
+    :mod:`~understatapi.transport`
+
+    .. code-block::
+
+        from understatapi.transport import MemoryTransport
+
+        transport = MemoryTransport({"getPlayerData/2371": payload})
+        with UnderstatClient(transport=transport) as understat:
+            shot_data = understat.player(player="2371").get_shot_data()
+
+    To crawl politely, limit the rate of requests and retry requests which
+    fail with ``429`` or ``5xx`` errors, backing off exponentially
+
+    .. code-block::
+
+        from understatapi.throttle import RetryPolicy
+
+        with UnderstatClient(
+            rate_limit=5, retry_policy=RetryPolicy(max_retries=5, deadline=60)
+        ) as understat:
+            player_data = understat.league(league="EPL").get_player_data(season="2019")
+
     """
 
-    def __init__(self) -> None:
-        self.session = requests.Session()
+    def __init__(  # pylint: disable=too-many-arguments,too-many-locals
+        self,
+        *,
+        cache_maxsize: int = 128,
+        cache_ttl: Optional[float] = 300.0,
+        season_aware_cache: bool = True,
+        http_cache: Optional[str] = None,
+        http_cache_max_age: Optional[float] = None,
+        rate_limit: Optional[float] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        pool_connections: int = 10,
+        pool_maxsize: int = 10,
+        pool_block: bool = False,
+        keep_alive: bool = True,
+        compress: bool = True,
+        json_decoder: Union[str, Decoder] = "auto",
+        warehouse: Optional[str] = None,
+        metrics: bool = False,
+        base_url: Optional[str] = None,
+        recordings: Optional[str] = None,
+        recording_mode: str = "replay",
+        source: str = "ajax",
+        transport: Optional[Transport] = None,
+    ) -> None:
+        """
+        :param cache_maxsize: Maximum number of decoded payloads to cache,
+            ``0`` disables the cache
+        :param cache_ttl: Number of seconds for which a cached payload is
+            valid, ``None`` means payloads never expire
+        :param season_aware_cache: Cache the data of finished seasons and
+            matches without it expiring, as it can never change, see
+            :class:`~understatapi.cache.CachePolicy`
+        :param http_cache: Path to a SQLite database in which to persist
+            responses, ``None`` disables the persistent cache
+        :param http_cache_max_age: Number of seconds for which a persisted
+            response is used without revalidation, ``None`` to always
+            revalidate
+        :param rate_limit: Maximum number of requests per second, which
+            adapts to ``429`` responses from the server, ``None`` for no
+            limit
+        :param retry_policy: How to retry failed requests, ``None`` to
+            never retry
+        :param pool_connections: Number of per-host connection pools to keep
+        :param pool_maxsize: Maximum number of connections kept open to
+            each host, which should be at least the number of threads
+            making requests at once
+        :param pool_block: Whether to wait for a free connection, rather
+            than open a connection which is discarded after use, when all
+            ``pool_maxsize`` connections are busy
+        :param keep_alive: Whether to reuse connections between requests
+        :param compress: Whether to ask for compressed responses. ``gzip``
+            is always supported, ``br`` is used when ``brotli`` is installed
+        :param json_decoder: The name of the library used to decode AJAX
+            responses, see :func:`~understatapi.decoders.get_decoder`, or a
+            function which takes the raw bytes of a response
+        :param warehouse: Path to a SQLite database in which to store every
+            payload which is downloaded, so that it can be queried offline
+            with :meth:`query`. ``None`` disables the warehouse
+        :param metrics: Whether to record metrics of the requests which
+            are made in :attr:`metrics`, which can be exported in the
+            Prometheus text format
+        :param base_url: The url to send requests to instead of
+            ``https://understat.com/``, e.g. the url of a
+            :class:`~understatapi.replay.StandInServer`
+        :param recordings: Path to a directory in which to record AJAX
+            responses, or from which to replay them, ``None`` to always
+            make requests. Cannot be combined with ``http_cache``
+        :param recording_mode: ``record`` to record every response,
+            ``replay`` to answer every request from the recordings, or
+            ``auto`` to replay what has been recorded and record the rest,
+            see :class:`~understatapi.replay.RecordingAdapter`
+        :param source: ``ajax`` to get data from understat's AJAX
+            endpoints, ``html`` to read it from the datasets embedded in
+            its html pages, or ``auto`` to fall back to the html page when
+            an AJAX request fails
+        :param transport: What sends the requests of every endpoint, see
+            :mod:`~understatapi.transport`. ``None`` to send them with
+            :attr:`session`, through the persistent cache or the
+            recordings if either is set. The pool, retry, rate limit,
+            cache and recording options only apply when this is ``None``
+        """
+        if source not in SOURCES:
+            raise ValueError(
+                f"{source} is not a valid source, choose one of {SOURCES}"
+            )
+        self.source = source
+        self.session = SessionPool()
+        self.cache_policy = CachePolicy() if season_aware_cache else None
+        self.cache = PayloadCache(
+            maxsize=cache_maxsize, ttl=cache_ttl, policy=self.cache_policy
+        )
+        self.warehouse = (
+            Warehouse(warehouse) if warehouse is not None else None
+        )
+        self.hooks = Hooks()
+        self.metrics = MetricsRegistry() if metrics else None
+        if self.metrics is not None:
+            self.metrics.attach(self.hooks)
+        self.decoder = (
+            get_decoder(json_decoder)
+            if isinstance(json_decoder, str)
+            else json_decoder
+        )
+        self.rate_limiter = (
+            RateLimiter(rate=rate_limit, adaptive=True)
+            if rate_limit is not None
+            else None
+        )
+        adapter_kwargs: Dict[str, Any] = {
+            "rate_limiter": self.rate_limiter,
+            "retry_policy": retry_policy,
+            "hooks": self.hooks,
+            "pool_connections": pool_connections,
+            "pool_maxsize": pool_maxsize,
+            "pool_block": pool_block,
+        }
+        if http_cache is not None and recordings is not None:
+            raise ValueError(
+                "``http_cache`` and ``recordings`` cannot be combined"
+            )
+        self.base_url = (
+            base_url if base_url is not None else BaseEndpoint.base_url
+        )
+        self.transport: Transport
+        if transport is not None:
+            self.transport = transport
+        elif recordings is not None:
+            self.transport = ReplayTransport(
+                recordings,
+                mode=recording_mode,
+                session=self.session,
+                base_url=self.base_url,
+                **adapter_kwargs,
+            )
+        elif http_cache is not None:
+            self.transport = CachedTransport(
+                http_cache,
+                max_age=http_cache_max_age,
+                policy=self.cache_policy,
+                session=self.session,
+                base_url=self.base_url,
+                **adapter_kwargs,
+            )
+        else:
+            self.transport = RequestsTransport(
+                self.session,
+                ThrottledHTTPAdapter(**adapter_kwargs),
+                self.base_url,
+            )
+        if not keep_alive:
+            self.session.headers["Connection"] = "close"
+        self.session.headers["Accept-Encoding"] = (
+            DEFAULT_ACCEPT_ENCODING if compress else "identity"
+        )
 
     def __enter__(self) -> "UnderstatClient":
         return self
@@ -69,9 +320,19 @@ class UnderstatClient:
             endpoint_obj = str_to_class(__name__, endpoint[0])
             public_methods = get_public_methods(endpoint_obj)
             raise AttributeError(
-                str(exception_value) + f"\nIts public methods are {public_methods}"
+                str(exception_value)
+                + f"\nIts public methods are {public_methods}"
             )
+        self.transport.close()
         self.session.close()
+        if self.warehouse is not None:
+            self.warehouse.close()
+
+    def _endpoint_kwargs(self) -> Dict[str, Any]:
+        """Keyword arguments used to create an endpoint"""
+        return {
+            name: getattr(self, name) for name in BaseEndpoint.shared_attrs
+        }
 
     def league(self, league: PrimaryAttribute) -> LeagueEndpoint:
         """
@@ -98,7 +359,7 @@ class UnderstatClient:
             Bundesliga
 
         """
-        return LeagueEndpoint(league=league, session=self.session)
+        return LeagueEndpoint(league=league, **self._endpoint_kwargs())
 
     def player(self, player: PrimaryAttribute) -> PlayerEndpoint:
         """
@@ -124,7 +385,7 @@ class UnderstatClient:
             111
 
         """
-        return PlayerEndpoint(player=player, session=self.session)
+        return PlayerEndpoint(player=player, **self._endpoint_kwargs())
 
     def team(self, team: PrimaryAttribute) -> TeamEndpoint:
         """
@@ -150,7 +411,7 @@ class UnderstatClient:
             Liverpool
 
         """
-        return TeamEndpoint(team=team, session=self.session)
+        return TeamEndpoint(team=team, **self._endpoint_kwargs())
 
     def match(self, match: PrimaryAttribute) -> MatchEndpoint:
         """
@@ -176,7 +437,102 @@ class UnderstatClient:
             456
 
         """
-        return MatchEndpoint(
-            match=match,
-            session=self.session,
-        )
+        return MatchEndpoint(match=match, **self._endpoint_kwargs())
+
+    def crawl(
+        self,
+        leagues: Union[str, Iterable[str]],
+        seasons: Union[str, Iterable[str]],
+        path: str,
+        entities: Sequence[str] = crawler.ENTITIES,
+        **kwargs: Any,
+    ) -> crawler.CrawlResult:
+        """
+        Crawl the fixtures, players, teams, shots and rosters of every
+        season of every league into a partitioned Parquet dataset, see
+        :func:`~understatapi.crawler.crawl`
+
+        :param leagues: Name of the league(s) to crawl
+        :param seasons: The season(s) to crawl
+        :param path: The root directory of the dataset
+        :param entities: Which entities to crawl
+        :param kwargs: Keyword arguments to pass to
+            :func:`~understatapi.crawler.crawl`
+
+        :Example:
+
+        .. code-block::
+
+            with UnderstatClient(rate_limit=5) as understat:
+                result = understat.crawl(
+                    leagues=["EPL", "La_Liga"],
+                    seasons=[str(season) for season in range(2014, 2024)],
+                    path="understat_data",
+                )
+                # Run again to retry anything in result.errors
+
+        """
+        return crawler.crawl(self, leagues, seasons, path, entities, **kwargs)
+
+    def sync(
+        self,
+        leagues: Union[str, Iterable[str]],
+        seasons: Union[str, Iterable[str]],
+        state: Union[str, SyncState],
+        **kwargs: Any,
+    ) -> SyncResult:
+        """
+        Fetch the data for every match which has finished since the last
+        sync, see :func:`~understatapi.sync.sync`
+
+        :param leagues: Name of the league(s) to sync
+        :param seasons: The season(s) to sync
+        :param state: A :class:`~understatapi.sync.SyncState`, or the path
+            of its JSON file
+        :param kwargs: Keyword arguments to pass to
+            :func:`~understatapi.sync.sync`
+
+        :Example:
+
+        .. code-block::
+
+            with UnderstatClient() as understat:
+                result = understat.sync("EPL", "2023", state="sync.json")
+                for match_id, data in result.matches.items():
+                    store(match_id, data["shots"], data["rosters"])
+
+        """
+        return sync_seasons(self, leagues, seasons, state, **kwargs)
+
+    def query(self, table: str, **filters: Any) -> List[Dict[str, Any]]:
+        """
+        Look up data which has already been downloaded, without making any
+        requests, see :meth:`~understatapi.warehouse.Warehouse.query`.
+        Requires the client to have been created with a ``warehouse``
+
+        :param table: The name of the table, one of ``fixtures``,
+            ``players``, ``player_matches``, ``shots`` or ``rosters``
+        :param filters: Values which columns must equal, a list or tuple
+            matches any of its values. ``team`` matches the name of either
+            team
+        :return: The rows, as dictionaries keyed by column name
+
+        :Example:
+
+        .. code-block::
+
+            with UnderstatClient(warehouse="understat.db") as understat:
+                understat.player(player="647").get_shot_data()
+                # Answered from the warehouse, even after a restart
+                shots = understat.query("shots", player_id=647, season=2021)
+                fixtures = understat.query(
+                    "fixtures", season=2021, team="Manchester_United"
+                )
+
+        """
+        if self.warehouse is None:
+            raise ValueError(
+                "The client has no warehouse, create it with "
+                "``UnderstatClient(warehouse=<path>)``"
+            )
+        return self.warehouse.query(table, **filters)
@@ -0,0 +1,389 @@
+"""In-memory caching of decoded AJAX payloads"""
+
+import asyncio
+import datetime
+import threading
+import time
+from collections import OrderedDict
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    FrozenSet,
+    Optional,
+    Tuple,
+)
+
+# The AJAX endpoints, and html pages, whose path ends in a season,
+# e.g. ``getLeagueData/EPL/2016``
+SEASON_ENDPOINTS = ("getLeagueData", "getTeamData", "league", "team")
+
+# The AJAX endpoint, and html page, of a match
+MATCH_ENDPOINTS = ("getMatchData", "match")
+
+# The month in which a new understat season starts, seasons are named
+# after the year they start in
+SEASON_START_MONTH = 7
+
+
+def season_of(date: datetime.date) -> int:
+    """
+    Get the season a date falls in
+
+    :param date: The date
+    """
+    return date.year if date.month >= SEASON_START_MONTH else date.year - 1
+
+
+class CachePolicy:
+    """
+    Decide which payloads can never change, so that they can be cached
+    without expiring.
+
+    Data for a season which has finished is immutable, and so is the data
+    of a match which has been played. Everything else, e.g. the current
+    season of a league, or a player's career, changes after every
+    matchday and keeps its time-to-live. Matches are known to have been
+    played if their season has finished, or if they have been seen with
+    ``isResult`` set in the fixtures of a league or team payload passed to
+    :meth:`observe`.
+
+    :attr finished: FrozenSet[str]: Ids of the matches which are known to
+        have been played
+    """
+
+    def __init__(self, current_season: Optional[int] = None) -> None:
+        """
+        :param current_season: The season which is being played, ``None``
+            to work it out from today's date
+        """
+        self._current_season = current_season
+        self.finished: FrozenSet[str] = frozenset()
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        name = self.__class__.__name__
+        return f"<{name}(current_season={self.current_season})>"
+
+    @property
+    def current_season(self) -> int:
+        """The season which is being played"""
+        if self._current_season is not None:
+            return self._current_season
+        return season_of(datetime.date.today())
+
+    @staticmethod
+    def _parts(key: str) -> Tuple[str, ...]:
+        """Split a cache key, or an AJAX endpoint path, into its segments"""
+        return tuple(key.split("?", 1)[0].strip("/").split("/"))
+
+    @staticmethod
+    def season(key: str) -> Optional[int]:
+        """
+        Get the season a cache key is for
+
+        :param key: The cache key, usually the AJAX endpoint path, or the
+            path of a url
+        :return: The season, or ``None`` if the key is not for one season
+        """
+        parts = CachePolicy._parts(key)
+        if parts[0] not in SEASON_ENDPOINTS or len(parts) < 3:
+            return None
+        try:
+            return int(parts[2])
+        except ValueError:
+            return None
+
+    def is_immutable(self, key: str, data: Any = None) -> bool:
+        """
+        Whether the payload for a key can never change
+
+        :param key: The cache key, usually the AJAX endpoint path, or the
+            path of a url
+        :param data: The decoded payload, if it is known
+        """
+        season = self.season(key)
+        if season is not None:
+            return season < self.current_season
+        parts = self._parts(key)
+        if parts[0] not in MATCH_ENDPOINTS or len(parts) < 2:
+            return False
+        if parts[1] in self.finished:
+            return True
+        try:
+            return int(data["tmpl"]["season"]) < self.current_season
+        except (KeyError, TypeError, ValueError):
+            return False
+
+    def observe(self, key: str, data: Any) -> None:
+        """
+        Learn which matches have been played from a league or team payload
+
+        :param key: The cache key, usually the AJAX endpoint path
+        :param data: The decoded payload
+        """
+        if self.season(key) is None or not isinstance(data, dict):
+            return
+        played = {
+            str(fixture["id"])
+            for fixture in data.get("dates", [])
+            if fixture.get("isResult")
+        }
+        if not played or played <= self.finished:
+            return
+        # The set is replaced, never mutated, so it can be read unlocked
+        with self._lock:
+            self.finished = self.finished | played
+
+
+class _Flight:
+    """A load which is in progress, and the callers waiting for it"""
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.value: Any = None
+        self.error: Optional[BaseException] = None
+
+
+def _retrieve_exception(task: "asyncio.Task[Any]") -> None:
+    """
+    Mark the error of a load as retrieved, so that it is not logged when
+    every coroutine waiting for it has been cancelled
+    """
+    if not task.cancelled():
+        task.exception()
+
+
+class PayloadCache:  # pylint: disable=too-many-instance-attributes
+    """
+    A thread-safe LRU cache with an optional time-to-live, used to share
+    decoded AJAX payloads between all of the endpoints created by an
+    :class:`~understatapi.api.UnderstatClient`.
+
+    Payloads are returned as-is, not copied, so mutating the data
+    returned by an endpoint also mutates the cached payload. With a
+    :class:`CachePolicy`, payloads which can never change, such as those
+    of finished seasons, do not expire.
+
+    Loads made through :meth:`get_or_load` are deduplicated: while a
+    payload is being fetched, other callers asking for the same key wait
+    for that fetch instead of starting their own. This holds even when
+    ``maxsize`` is ``0``.
+
+    :attr hits: int: Number of lookups which were answered from the cache
+    :attr misses: int: Number of lookups which were not in the cache
+    :attr shared: int: Number of loads which waited for a load of the same
+        key that was already in progress
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 128,
+        ttl: Optional[float] = 300.0,
+        policy: Optional[CachePolicy] = None,
+    ) -> None:
+        """
+        :param maxsize: Maximum number of payloads to hold, ``0`` disables
+            the cache
+        :param ttl: Number of seconds for which a payload is valid,
+            ``None`` means payloads never expire
+        :param policy: Decides which payloads are immutable and never
+            expire, ``None`` to give every payload the same ``ttl``
+        """
+        if maxsize < 0:
+            raise ValueError("``maxsize`` must be non-negative")
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.policy = policy
+        self.hits = 0
+        self.misses = 0
+        self.shared = 0
+        # Payloads and the time at which they expire, ``None`` for never
+        self._data: "OrderedDict[str, Tuple[Optional[float], Any]]" = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+        self._flights: Dict[str, _Flight] = {}
+        # Loads made by coroutines, by event loop and key
+        self._async_flights: Dict[
+            Tuple[asyncio.AbstractEventLoop, str], "asyncio.Task[Any]"
+        ] = {}
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: object) -> bool:
+        if not isinstance(key, str):
+            return False
+        with self._lock:
+            entry = self._data.get(key)
+            return entry is not None and not self._expired(entry[0])
+
+    def __repr__(self) -> str:
+        return (
+            f"<{self.__class__.__name__}(maxsize={self.maxsize}, "
+            f"ttl={self.ttl}, size={len(self)})>"
+        )
+
+    @staticmethod
+    def _expired(expires_at: Optional[float]) -> bool:
+        return expires_at is not None and time.monotonic() > expires_at
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Look up a payload, counting the lookup as a hit or a miss
+
+        :param key: The cache key, usually the AJAX endpoint path
+        :return: The cached payload, or ``None`` if it is missing or expired
+        """
+        with self._lock:
+            return self._get(key)
+
+    def _get(self, key: str) -> Optional[Any]:
+        """Look up a payload, the lock must be held"""
+        entry = self._data.get(key)
+        if entry is None or self._expired(entry[0]):
+            if entry is not None:
+                del self._data[key]
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def get_or_load(self, key: str, load: Callable[[], Any]) -> Any:
+        """
+        Look up a payload, calling ``load`` to fetch it if it is missing.
+        If another thread is already loading the same key, wait for its
+        result, or its error, instead of calling ``load`` again
+
+        :param key: The cache key, usually the AJAX endpoint path
+        :param load: Function which fetches the payload
+        :return: The payload
+        """
+        with self._lock:
+            data = self._get(key)
+            if data is not None:
+                return data
+            flight = self._flights.get(key)
+            leader = flight is None
+            if flight is None:
+                flight = self._flights[key] = _Flight()
+            else:
+                self.shared += 1
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+        try:
+            flight.value = load()
+            self.set(key, flight.value)
+        except BaseException as err:
+            flight.error = err
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+        return flight.value
+
+    async def get_or_load_async(
+        self, key: str, load: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """
+        Asynchronous version of :meth:`get_or_load`, which deduplicates
+        loads made by coroutines running in the same event loop. The load
+        runs in a task of its own, so cancelling the coroutine which
+        started it does not cancel the others waiting for it
+
+        :param key: The cache key, usually the AJAX endpoint path
+        :param load: Coroutine function which fetches the payload
+        :return: The payload
+        """
+        data = self.get(key)
+        if data is not None:
+            return data
+        loop = asyncio.get_running_loop()
+        flight_key = (loop, key)
+        with self._lock:
+            task = self._async_flights.get(flight_key)
+            if task is None:
+                task = loop.create_task(self._load_async(flight_key, load))
+                task.add_done_callback(_retrieve_exception)
+                self._async_flights[flight_key] = task
+            else:
+                self.shared += 1
+        return await asyncio.shield(task)
+
+    async def _load_async(
+        self,
+        flight_key: Tuple[asyncio.AbstractEventLoop, str],
+        load: Callable[[], Awaitable[Any]],
+    ) -> Any:
+        """Load a payload and store it, for :meth:`get_or_load_async`"""
+        try:
+            data = await load()
+            self.set(flight_key[1], data)
+            return data
+        finally:
+            with self._lock:
+                del self._async_flights[flight_key]
+
+    def set(self, key: str, value: Any) -> None:
+        """
+        Store a payload, evicting the least recently used payload if the
+        cache is full
+
+        :param key: The cache key, usually the AJAX endpoint path
+        :param value: The decoded payload
+        """
+        ttl = self.ttl
+        if self.policy is not None:
+            self.policy.observe(key, value)
+            if self.policy.is_immutable(key, value):
+                ttl = None
+        if self.maxsize == 0:
+            return
+        expires_at = None if ttl is None else time.monotonic() + ttl
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def invalidate(self, key: str) -> bool:
+        """
+        Remove a single payload from the cache
+
+        :param key: The cache key, usually the AJAX endpoint path
+        :return: Whether a payload was removed
+        """
+        with self._lock:
+            return self._data.pop(key, None) is not None
+
+    def clear(self) -> None:
+        """Remove every payload from the cache and reset the counters"""
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+            self.shared = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get a summary of the cache usage
+
+        :return: A dictionary with keys hits, misses, shared, size,
+            maxsize, ttl
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "shared": self.shared,
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+            }
@@ -0,0 +1,131 @@
+"""
+The ``understatapi`` command.
+
+.. code-block:: text
+
+    understatapi export --league EPL --seasons 2014-2024 --entity shots \\
+        --workers 16 --format ndjson > shots.ndjson
+
+``export`` streams one entity of every league season given to stdout, or
+to ``--output``, as the requests finish. Errors for individual seasons or
+matches are reported on stderr once the export is done, and make the
+command exit with status ``1``
+"""
+
+import argparse
+import sys
+from typing import Dict, List, Optional
+from .api import UnderstatClient
+from .crawler import ENTITIES
+from .endpoints.base import BaseEndpoint
+from .export import (
+    FORMATS,
+    iter_export,
+    parse_seasons,
+    write_ndjson,
+    write_parquet,
+)
+
+
+def _seasons(value: str) -> List[str]:
+    try:
+        return parse_seasons(value)
+    except ValueError as err:
+        raise argparse.ArgumentTypeError(str(err)) from err
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the parser for the command's arguments"""
+    parser = argparse.ArgumentParser(
+        prog="understatapi", description="Bulk extraction from understat.com"
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    export_parser = commands.add_parser(
+        "export", help="Export one entity of several league seasons"
+    )
+    export_parser.add_argument(
+        "--league",
+        nargs="+",
+        required=True,
+        choices=BaseEndpoint.leagues,
+        help="The league(s) to export",
+    )
+    export_parser.add_argument(
+        "--seasons",
+        type=_seasons,
+        required=True,
+        help=(
+            "A season, a range such as 2014-2024, or several separated "
+            "by ','"
+        ),
+    )
+    export_parser.add_argument("--entity", required=True, choices=ENTITIES)
+    export_parser.add_argument(
+        "--workers",
+        type=int,
+        default=8,
+        help=(
+            "The number of requests to make concurrently "
+            "(default: %(default)s)"
+        ),
+    )
+    export_parser.add_argument("--format", choices=FORMATS, default="ndjson")
+    export_parser.add_argument(
+        "--output",
+        "-o",
+        default="-",
+        help="The file to write to, '-' for stdout, which parquet does not "
+        "support (default: %(default)s)",
+    )
+    export_parser.add_argument(
+        "--rate-limit",
+        type=float,
+        default=None,
+        help="The maximum number of requests per second",
+    )
+    return parser
+
+
+def export(args: argparse.Namespace) -> int:
+    """Run ``understatapi export``"""
+    if args.format == "parquet" and args.output == "-":
+        raise SystemExit("understatapi export: parquet needs --output")
+    errors: Dict[str, Exception] = {}
+    with UnderstatClient(
+        rate_limit=args.rate_limit, pool_maxsize=max(args.workers, 10)
+    ) as understat:
+        records = iter_export(
+            understat,
+            args.league,
+            args.seasons,
+            args.entity,
+            max_workers=args.workers,
+            errors=errors,
+        )
+        if args.format == "parquet":
+            write_parquet(records, args.entity, args.output)
+        elif args.output == "-":
+            write_ndjson(records, sys.stdout)
+            sys.stdout.flush()
+        else:
+            with open(args.output, "w", encoding="utf-8") as fh:
+                write_ndjson(records, fh)
+    for key, error in errors.items():
+        print(f"{key}: {error}", file=sys.stderr)
+    return 1 if errors else 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Run the ``understatapi`` command
+
+    :param argv: The command's arguments, ``sys.argv[1:]`` by default
+    :return: The exit status
+    """
+    args = build_parser().parse_args(argv)
+    try:
+        return export(args)
+    except BrokenPipeError:
+        # The reader went away, e.g. ``understatapi export ... | head``
+        sys.stderr.close()
+        return 0
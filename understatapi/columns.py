@@ -0,0 +1,174 @@
+"""
+Columnar results, built directly from the decoded rows of a response.
+
+Passing ``format="columns"`` to an endpoint returns a dictionary of NumPy
+arrays, and ``format="arrow"`` returns a ``pyarrow.Table``. Column types
+come from the records in :mod:`understatapi.models`: floats are
+``float32``, integers are ``int32`` and low-cardinality strings such as
+``result``, ``situation`` and ``shotType`` are categorical
+"""
+
+from typing import Any, Dict, Iterable, List, NamedTuple, Sequence, Tuple
+from .models import (
+    CONVERTERS,
+    Fixture,
+    Player,
+    RosterEntry,
+    Shot,
+    field_types,
+    flat_rows,
+)
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None  # type: ignore[assignment]
+try:
+    import pyarrow as pa
+except ImportError:  # pragma: no cover
+    pa = None  # type: ignore[assignment]
+
+FORMATS = ("columns", "arrow")
+
+ARROW_TYPES: Dict[type, str] = {
+    float: "float32",
+    int: "int32",
+    bool: "bool_",
+    str: "string",
+}
+
+CATEGORICAL: Dict[type, Tuple[str, ...]] = {
+    Shot: (
+        "result",
+        "player",
+        "h_a",
+        "situation",
+        "shotType",
+        "h_team",
+        "a_team",
+        "player_assisted",
+        "lastAction",
+    ),
+    Player: ("position", "team_title"),
+    Fixture: (
+        "h_title",
+        "h_short_title",
+        "a_title",
+        "a_short_title",
+        "side",
+        "result",
+    ),
+    RosterEntry: ("position", "h_a"),
+}
+
+
+class Categorical(NamedTuple):
+    """
+    A categorical column. ``codes`` holds the index of each value in
+    ``categories``, or -1 where the value is missing
+    """
+
+    codes: Any
+    categories: List[str]
+
+
+def _encode(values: Sequence[Any]) -> Tuple[List[int], List[str]]:
+    """Encode values as indices into a list of the distinct values"""
+    lookup: Dict[str, int] = {}
+    codes = []
+    for value in values:
+        if value is None or value == "":
+            codes.append(-1)
+        else:
+            codes.append(lookup.setdefault(value, len(lookup)))
+    return codes, list(lookup)
+
+
+def _convert(values: Sequence[Any], field_type: type) -> List[Any]:
+    convert = CONVERTERS[field_type]
+    return [
+        None if value is None or value == "" else convert(value)
+        for value in values
+    ]
+
+
+def _numpy_column(
+    values: Sequence[Any], field_type: type, categorical: bool
+) -> Any:
+    if categorical:
+        codes, categories = _encode(values)
+        return Categorical(np.array(codes, dtype=np.int32), categories)
+    converted = _convert(values, field_type)
+    if field_type is float:
+        return np.array(
+            [np.nan if value is None else value for value in converted],
+            dtype=np.float32,
+        )
+    if field_type is int:
+        # Integers are never missing in practice, -1 marks any which are
+        return np.array(
+            [-1 if value is None else value for value in converted],
+            dtype=np.int32,
+        )
+    return np.array(converted, dtype=bool if field_type is bool else object)
+
+
+def _arrow_column(
+    values: Sequence[Any], field_type: type, categorical: bool
+) -> Any:
+    if categorical:
+        codes, categories = _encode(values)
+        indices = pa.array(
+            codes, type=pa.int32(), mask=[code < 0 for code in codes]
+        )
+        return pa.DictionaryArray.from_arrays(
+            indices, pa.array(categories, type=pa.string())
+        )
+    return pa.array(
+        _convert(values, field_type),
+        type=getattr(pa, ARROW_TYPES[field_type])(),
+    )
+
+
+def to_columns(
+    record_type: type,
+    rows: Iterable[Dict[str, Any]],
+    format: str,  # pylint: disable=redefined-builtin
+) -> Any:
+    """
+    Build typed columns from the dictionaries returned by understat, without
+    creating an object per row
+
+    :param record_type: The record class which describes the columns, e.g.
+        :class:`~understatapi.models.Shot`
+    :param rows: The dictionaries returned by understat
+    :param format: ``columns`` for a dictionary of NumPy arrays, in which
+        categorical columns are :class:`Categorical`, or ``arrow`` for a
+        ``pyarrow.Table`` with dictionary-encoded categorical columns
+    """
+    if format not in FORMATS:
+        raise ValueError(
+            f"{format} is not a valid format, choose one of {FORMATS}"
+        )
+    if format == "columns" and np is None:
+        raise ImportError(
+            "format='columns' requires numpy, install it with "
+            "``pip install understatapi[columns]``"
+        )
+    if format == "arrow" and pa is None:
+        raise ImportError(
+            "format='arrow' requires pyarrow, install it with "
+            "``pip install understatapi[arrow]``"
+        )
+    rows = list(flat_rows(record_type, rows))
+    build = _numpy_column if format == "columns" else _arrow_column
+    categorical = CATEGORICAL.get(record_type, ())
+    columns = {
+        name: build(
+            [row.get(name) for row in rows], field_type, name in categorical
+        )
+        for name, field_type in field_types(record_type)
+    }
+    if format == "arrow":
+        return pa.table(columns)
+    return columns
@@ -0,0 +1,450 @@
+"""
+Crawl whole league seasons into a partitioned Parquet dataset.
+
+:func:`crawl` fetches the fixtures, players and teams of every league and
+season it is given, then the shots and rosters of every fixture which has
+been played, and writes one Parquet file per entity to
+``<path>/league=<league>/season=<season>/entity=<entity>/part-0.parquet``.
+The layout is hive-partitioned, and :func:`read_entity` reads one entity
+back across every league and season as a single table.
+
+Crawls are resumable. The shots and rosters files record which matches
+they hold, so a crawl which is interrupted, or fails for some matches,
+only fetches the missing matches when it is run again. Entities of a
+finished season whose file is complete are not fetched again, and a
+``_SUCCESS`` marker is written to a season's directory once all of its
+entities are complete. The season being played is never complete: its
+fixtures, players and teams are fetched again on every crawl, along with
+the matches played since the last one
+"""
+
+import datetime
+import glob
+import os
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Collection,
+    Dict,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Union,
+    cast,
+)
+from .cache import season_of
+from .columns import pa, to_columns
+from .endpoints import LeagueEndpoint
+from .endpoints.base import BATCH_ERRORS
+from .models import Fixture, Player, RosterEntry, Shot
+
+try:
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover
+    ds = None  # type: ignore[assignment]
+    pq = None  # type: ignore[assignment]
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .api import UnderstatClient
+
+ENTITIES = ("fixtures", "players", "teams", "shots", "rosters")
+MATCH_ENTITIES = ("shots", "rosters")
+PART_NAME = "part-0.parquet"
+SUCCESS_MARKER = "_SUCCESS"
+
+# Keys of the Parquet metadata of the shots and rosters files, holding
+# the ids of the matches in the file, and whether these are every match
+# which had been played in the season when it was written
+MATCHES_KEY = b"understatapi.matches"
+COMPLETE_KEY = b"understatapi.complete"
+
+
+class CrawlResult(NamedTuple):
+    """
+    The outcome of a crawl
+
+    :attr written: Paths of the Parquet files which were written
+    :attr skipped: Directories of the seasons which were already complete
+    :attr errors: Errors keyed by the partition, or match, they occurred for
+    """
+
+    written: List[str]
+    skipped: List[str]
+    errors: Dict[str, Exception]
+
+
+def partition_path(
+    path: str, league: str, season: str, entity: str = ""
+) -> str:
+    """
+    Get the directory of a partition of a crawled dataset
+
+    :param path: The root directory of the dataset
+    :param league: Name of the league
+    :param season: The season
+    :param entity: One of :data:`ENTITIES`, or leave empty for the
+        directory of the whole season
+    """
+    season_dir = os.path.join(path, f"league={league}", f"season={season}")
+    if not entity:
+        return season_dir
+    return os.path.join(season_dir, f"entity={entity}")
+
+
+def _read_matches(filename: str) -> Optional[Tuple[Set[str], bool]]:
+    """
+    Read which matches a shots or rosters file holds
+
+    :return: The ids of the matches and whether the file is complete, or
+        ``None`` if the file does not exist or was written without them
+    """
+    if not os.path.exists(filename):
+        return None
+    metadata = pq.read_schema(filename).metadata or {}
+    if MATCHES_KEY not in metadata:
+        return None
+    matches = set(metadata[MATCHES_KEY].decode("utf-8").split(","))
+    matches.discard("")
+    return matches, metadata.get(COMPLETE_KEY) == b"1"
+
+
+def _write_table(table: Any, directory: str) -> str:
+    """Write a table to a directory, replacing any previous file atomically"""
+    os.makedirs(directory, exist_ok=True)
+    filename = os.path.join(directory, PART_NAME)
+    pq.write_table(table, filename + ".tmp")
+    os.replace(filename + ".tmp", filename)
+    return filename
+
+
+def team_rows(teams: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Flatten the data returned by ``LeagueEndpoint.get_team_data()`` into a
+    row for each team in each match
+
+    :param teams: The data of every team in a league season
+    """
+    return [
+        {"team_id": int(team["id"]), "title": team["title"], **match}
+        for team in teams.values()
+        for match in team.get("history", [])
+    ]
+
+
+def _team_table(teams: Dict[str, Any]) -> Any:
+    """Build a table with a row for each team in each match"""
+    return pa.Table.from_pylist(team_rows(teams))
+
+
+def match_rows(
+    understat: "UnderstatClient", match_id: str, entities: Sequence[str]
+) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Get the shots and roster entries of a match
+
+    :param understat: The client to make requests with
+    :param match_id: The id of the match
+    :param entities: Which of :data:`MATCH_ENTITIES` to get
+    :return: The rows of each entity, roster entries have a ``match_id``
+    """
+    match = understat.match(match_id)
+    rows: Dict[str, List[Dict[str, Any]]] = {}
+    if "shots" in entities:
+        shots = match.get_shot_data()
+        rows["shots"] = shots.get("h", []) + shots.get("a", [])
+    if "rosters" in entities:
+        rosters = match.get_roster_data()
+        rows["rosters"] = [
+            {"match_id": match_id, **entry}
+            for side in ("h", "a")
+            for entry in rosters.get(side, {}).values()
+        ]
+    return rows
+
+
+def _match_tables(rows: Dict[str, List[Dict[str, Any]]]) -> Dict[str, Any]:
+    """Build a table for each entity of the matches which were crawled"""
+    tables = {}
+    if "shots" in rows:
+        tables["shots"] = to_columns(Shot, rows["shots"], "arrow")
+    if "rosters" in rows:
+        table = to_columns(RosterEntry, rows["rosters"], "arrow")
+        match_column = pa.array(
+            [int(row["match_id"]) for row in rows["rosters"]], type=pa.int32()
+        )
+        tables["rosters"] = table.append_column("match_id", match_column)
+    return tables
+
+
+def _league_tables(
+    endpoint: LeagueEndpoint, season: str, entities: Sequence[str]
+) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """
+    Get the fixtures of a league season, and build a table for each of the
+    league-wide entities
+    """
+    dates = cast(List[Dict[str, Any]], endpoint.get_match_data(season=season))
+    tables = {}
+    if "fixtures" in entities:
+        tables["fixtures"] = to_columns(Fixture, dates, "arrow")
+    if "players" in entities:
+        players = endpoint.get_player_data(season=season)
+        tables["players"] = to_columns(Player, players, "arrow")
+    if "teams" in entities:
+        tables["teams"] = _team_table(endpoint.get_team_data(season=season))
+    return dates, tables
+
+
+def _crawl_matches(
+    understat: "UnderstatClient",
+    match_ids: Sequence[str],
+    entities: Sequence[str],
+    executor: Executor,
+) -> Tuple[Dict[str, Dict[str, List[Dict[str, Any]]]], Dict[str, Exception]]:
+    """
+    Fetch the shots and rosters of several matches concurrently
+
+    :return: The rows of each entity for every match which was fetched,
+        and the errors of the others
+    """
+    rows: Dict[str, Dict[str, List[Dict[str, Any]]]] = {}
+    errors: Dict[str, Exception] = {}
+    futures = [
+        (match_id, executor.submit(match_rows, understat, match_id, entities))
+        for match_id in match_ids
+    ]
+    for match_id, future in futures:
+        try:
+            rows[match_id] = future.result()
+        except BATCH_ERRORS as err:
+            errors[match_id] = err
+    return rows, errors
+
+
+def _write_match_entity(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+    entity: str,
+    directory: str,
+    played: Collection[str],
+    done: Set[str],
+    rows: Dict[str, Dict[str, List[Dict[str, Any]]]],
+    overwrite: bool,
+) -> Tuple[Optional[str], bool]:
+    """
+    Add the matches which were fetched to the file of a match entity,
+    recording which matches it holds
+
+    :param entity: One of :data:`MATCH_ENTITIES`
+    :param directory: The directory of the entity's partition
+    :param played: The ids of the matches which have been played
+    :param done: The ids of the matches already in the file
+    :param rows: The rows of each match which was fetched
+    :param overwrite: Replace the file rather than adding to it
+    :return: The path of the file if it was written, and whether it holds
+        every match which has been played
+    """
+    filename = os.path.join(directory, PART_NAME)
+    new = [
+        match_id
+        for match_id in played
+        if match_id in rows and match_id not in done
+    ]
+    matches = done | set(new)
+    complete = matches.issuperset(played)
+    if not new and not overwrite and os.path.exists(filename):
+        return None, complete
+    table = _match_tables(
+        {entity: [row for match_id in new for row in rows[match_id][entity]]}
+    )[entity]
+    if done:
+        existing = pq.read_table(filename).replace_schema_metadata(None)
+        table = pa.concat_tables([existing, table])
+    table = table.replace_schema_metadata(
+        {
+            MATCHES_KEY: ",".join(sorted(matches)).encode("utf-8"),
+            COMPLETE_KEY: b"1" if complete else b"0",
+        }
+    )
+    return _write_table(table, directory), complete
+
+
+def _crawl_season(  # pylint: disable=too-many-arguments,too-many-positional-arguments,too-many-locals
+    understat: "UnderstatClient",
+    league: str,
+    season: str,
+    path: str,
+    entities: Sequence[str],
+    executor: Executor,
+    overwrite: bool,
+) -> CrawlResult:
+    """
+    Crawl one league season, fetching its matches with ``executor``
+
+    :return: The outcome of crawling the season
+    """
+    result = CrawlResult(written=[], skipped=[], errors={})
+    season_dir = partition_path(path, league, season)
+    finished = int(season) < season_of(datetime.date.today())
+    # The matches already written for each match entity
+    done: Dict[str, Set[str]] = {}
+    pending = []
+    for entity in entities:
+        filename = os.path.join(
+            partition_path(path, league, season, entity), PART_NAME
+        )
+        if entity in MATCH_ENTITIES:
+            written = None if overwrite else _read_matches(filename)
+            done[entity] = set() if written is None else written[0]
+            if written is None or not written[1] or not finished:
+                pending.append(entity)
+        elif overwrite or not finished or not os.path.exists(filename):
+            pending.append(entity)
+    if not pending:
+        result.skipped.append(season_dir)
+        return result
+    try:
+        dates, tables = _league_tables(
+            understat.league(league), season, pending
+        )
+    except BATCH_ERRORS as err:
+        result.errors[season_dir] = err
+        return result
+    for entity, table in tables.items():
+        directory = partition_path(path, league, season, entity)
+        result.written.append(_write_table(table, directory))
+    complete = True
+    match_entities = [entity for entity in MATCH_ENTITIES if entity in pending]
+    if match_entities:
+        played = [
+            str(fixture["id"]) for fixture in dates if fixture["isResult"]
+        ]
+        missing = [
+            match_id
+            for match_id in played
+            if any(match_id not in done[entity] for entity in match_entities)
+        ]
+        rows, errors = _crawl_matches(
+            understat, missing, match_entities, executor
+        )
+        for match_id, error in errors.items():
+            result.errors[f"{season_dir}/match={match_id}"] = error
+        # Every match which was fetched is written, a failed match is
+        # fetched again when the crawl is resumed
+        for entity in match_entities:
+            written_file, entity_complete = _write_match_entity(
+                entity,
+                partition_path(path, league, season, entity),
+                played,
+                done[entity],
+                rows,
+                overwrite,
+            )
+            if written_file is not None:
+                result.written.append(written_file)
+            complete = complete and entity_complete
+    if finished and complete:
+        with open(
+            os.path.join(season_dir, SUCCESS_MARKER), "w", encoding="utf-8"
+        ):
+            pass
+    return result
+
+
+def crawl(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+    understat: "UnderstatClient",
+    leagues: Union[str, Iterable[str]],
+    seasons: Union[str, Iterable[str]],
+    path: str,
+    entities: Sequence[str] = ENTITIES,
+    max_workers: int = 8,
+    overwrite: bool = False,
+    max_seasons: int = 4,
+) -> CrawlResult:
+    """
+    Crawl every season of every league into a partitioned Parquet dataset.
+    Requires ``pyarrow``, install it with ``pip install understatapi[arrow]``
+
+    :param understat: The client to make requests with
+    :param leagues: Name of the league(s) to crawl
+    :param seasons: The season(s) to crawl
+    :param path: The root directory of the dataset
+    :param entities: Which of :data:`ENTITIES` to crawl
+    :param max_workers: The number of matches to fetch concurrently,
+        shared by every season
+    :param overwrite: Crawl seasons again, even if they have already been
+        written
+    :param max_seasons: The number of league seasons to crawl
+        concurrently
+    """
+    if pq is None:
+        raise ImportError(
+            "Crawling requires pyarrow, install it with "
+            "``pip install understatapi[arrow]``"
+        )
+    invalid = set(entities) - set(ENTITIES)
+    if invalid:
+        raise ValueError(
+            f"{sorted(invalid)} are not valid entities, choose from {ENTITIES}"
+        )
+    if isinstance(leagues, str):
+        leagues = [leagues]
+    if isinstance(seasons, str):
+        seasons = [seasons]
+    result = CrawlResult(written=[], skipped=[], errors={})
+    seasons = [str(season) for season in seasons]
+    # Seasons are shut down first, as they wait for the matches
+    with ThreadPoolExecutor(
+        max_workers=max_workers
+    ) as match_pool, ThreadPoolExecutor(
+        max_workers=max_seasons
+    ) as season_pool:
+        futures = [
+            season_pool.submit(
+                _crawl_season,
+                understat,
+                league,
+                season,
+                path,
+                entities,
+                match_pool,
+                overwrite,
+            )
+            for league in leagues
+            for season in seasons
+        ]
+        for future in futures:
+            season_result = future.result()
+            result.written.extend(season_result.written)
+            result.skipped.extend(season_result.skipped)
+            result.errors.update(season_result.errors)
+    return result
+
+
+def read_entity(path: str, entity: str) -> Any:
+    """
+    Read one entity of a crawled dataset, for every league and season, as
+    a ``pyarrow.Table`` with ``league`` and ``season`` columns
+
+    :param path: The root directory of the dataset
+    :param entity: One of :data:`ENTITIES`
+    """
+    if entity not in ENTITIES:
+        raise ValueError(
+            f"{entity} is not a valid entity, choose from {ENTITIES}"
+        )
+    files = sorted(
+        glob.glob(
+            os.path.join(
+                path, "league=*", "season=*", f"entity={entity}", PART_NAME
+            )
+        )
+    )
+    dataset = ds.dataset(
+        files, format="parquet", partitioning="hive", partition_base_dir=path
+    )
+    return dataset.to_table()
@@ -0,0 +1,81 @@
+"""JSON decoding backends for AJAX responses"""
+
+import json
+from typing import Any, Callable, Dict, List, Union
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None  # type: ignore[assignment]
+try:
+    import msgspec
+except ImportError:  # pragma: no cover
+    msgspec = None  # type: ignore[assignment]
+
+Decoder = Callable[[Union[bytes, str]], Any]
+
+
+def _json_decoder() -> Decoder:
+    return json.loads
+
+
+def _orjson_decoder() -> Decoder:
+    if orjson is None:
+        raise ImportError(
+            "The orjson decoder requires orjson, install it with "
+            "``pip install understatapi[orjson]``"
+        )
+    return orjson.loads  # pylint: disable=no-member
+
+
+def _msgspec_decoder() -> Decoder:
+    if msgspec is None:
+        raise ImportError(
+            "The msgspec decoder requires msgspec, install it with "
+            "``pip install understatapi[msgspec]``"
+        )
+    return msgspec.json.Decoder().decode
+
+
+DECODERS: Dict[str, Callable[[], Decoder]] = {
+    "json": _json_decoder,
+    "orjson": _orjson_decoder,
+    "msgspec": _msgspec_decoder,
+}
+
+
+def available_decoders() -> List[str]:
+    """
+    Get the names of the decoders which can be used in this environment
+
+    :return: A list of decoder names, fastest first
+    """
+    names = []
+    if orjson is not None:
+        names.append("orjson")
+    if msgspec is not None:
+        names.append("msgspec")
+    names.append("json")
+    return names
+
+
+def get_decoder(name: str = "auto") -> Decoder:
+    """
+    Get a function which decodes the raw bytes of a JSON response
+
+    :param name: One of ``json``, ``orjson``, ``msgspec``, or ``auto`` to
+        use the fastest decoder which is installed, falling back to the
+        standard library ``json`` module
+    :return: A function which takes ``bytes`` or ``str`` and returns the
+        decoded object
+    """
+    if name == "auto":
+        name = available_decoders()[0]
+    try:
+        factory = DECODERS[name]
+    except KeyError as err:
+        raise ValueError(
+            f"{name} is not a valid decoder, choose one of "
+            f"{['auto'] + list(DECODERS)}"
+        ) from err
+    return factory()
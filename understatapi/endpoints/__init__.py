@@ -1,6 +1,6 @@
 """Endpoints"""
 
-from .base import BaseEndpoint
+from .base import BaseEndpoint, BatchResult
 from .league import LeagueEndpoint
 from .player import PlayerEndpoint
 from .team import TeamEndpoint
@@ -1,22 +1,129 @@
 """Base endpoint"""
 
-from typing import Sequence, Dict, Any, Optional
+from concurrent.futures import ThreadPoolExecutor
+import functools
+import json
+import logging
+import threading
+from typing import (
+    Sequence,
+    Dict,
+    Any,
+    Iterator,
+    Optional,
+    Callable,
+    Tuple,
+    TypeVar,
+    Union,
+    cast,
+)
 import requests
 from requests import Response
+from ..cache import PayloadCache
+from ..decoders import Decoder, get_decoder
+from ..metrics import (
+    CacheEvent,
+    Hooks,
+    IngestEvent,
+    RequestTimer,
+    endpoint_name,
+)
 from ..parsers import BaseParser
+from ..parsers.base import extract
+from ..protocol import (
+    AJAX_HEADERS,
+    BASE_URL,
+    LEAGUES,
+    Endpoint,
+    Query,
+    Request,
+    cache_key,
+    check_args,
+)
+from ..streaming import iter_section
+from ..transport import RequestsTransport, Transport
+from ..warehouse import Warehouse
 from ..exceptions import (
     InvalidLeague,
+    InvalidMatch,
+    InvalidPlayer,
     InvalidSeason,
+    InvalidTeam,
     PrimaryAttribute,
 )
 
-# Headers required for AJAX requests to Understat
-AJAX_HEADERS = {
-    "X-Requested-With": "XMLHttpRequest",
-}
+logger = logging.getLogger(__name__)
+
+# Where the data for AJAX requests is read from, see ``BaseEndpoint.source``
+SOURCES = ("ajax", "html", "auto")
+
+# Size of the chunks in which streamed responses are read
+STREAM_CHUNK_SIZE = 1 << 16
+
+# Errors which are recorded per item, rather than raised, by a batch call.
+# ``ValueError`` covers payloads which cannot be decoded, e.g.
+# ``json.JSONDecodeError``, and html pages without the dataset asked for
+BATCH_ERRORS = (
+    requests.RequestException,
+    ValueError,
+    InvalidLeague,
+    InvalidMatch,
+    InvalidPlayer,
+    InvalidSeason,
+    InvalidTeam,
+)
+
+F = TypeVar("F", bound=Callable[..., Any])
 
 
-class BaseEndpoint:
+class BatchResult(Dict[str, Any]):
+    """
+    The result of calling an accessor on an endpoint with several primary
+    attributes. Maps each primary attribute to its data, in the order the
+    attributes were given.
+
+    :attr errors: Dict[str, Exception]: The error raised for each primary
+        attribute whose data could not be fetched
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.errors: Dict[str, Exception] = {}
+
+
+def fan_out(method: F) -> F:
+    """
+    Decorate an endpoint accessor so that, when the endpoint has a list of
+    primary attributes, the accessor is called concurrently for each of
+    them and a :class:`BatchResult` is returned.
+
+    The number of threads used can be set with a ``max_workers`` keyword
+    argument, and defaults to ``BaseEndpoint.max_workers``
+    """
+
+    @functools.wraps(method)
+    def wrapper(self: "BaseEndpoint", *args: Any, **kwargs: Any) -> Any:
+        max_workers = kwargs.pop("max_workers", self.max_workers)
+        if isinstance(self._primary_attr, str) or not isinstance(
+            self._primary_attr, Sequence
+        ):
+            return method(self, *args, **kwargs)
+        return self._fan_out(method, max_workers, *args, **kwargs)
+
+    return cast(F, wrapper)
+
+
+def _body_size(res: Response, stream: bool) -> int:
+    """
+    The number of bytes in the body of a response, taken from its
+    ``Content-Length`` header if the body is streamed, so not yet read
+    """
+    if stream:
+        return int(res.headers.get("Content-Length", 0))
+    return len(res.content)
+
+
+class BaseEndpoint(Endpoint):  # pylint: disable=too-many-instance-attributes
     """
     Base endpoint for understat API
 
@@ -24,75 +131,407 @@ class BaseEndpoint:
         ``https://understat.com/``
     :attr leagues: List[str]: The available leagues, ``EPL``, ``La_Liga``,
         ``Bundesliga``, optional``Serie_A``, ``Ligue_1``, ``RFPL``
+    :attr max_workers: int: The default number of threads used when an
+        accessor is called on an endpoint with several primary attributes
+    :attr page: str: The html page which embeds the same data as the
+        endpoint's AJAX requests, e.g. ``league`` for
+        ``https://understat.com/league/<league>/<season>``
+    :attr page_datasets: Dict[str, str]: The key of the AJAX payload which
+        each dataset embedded in the page corresponds to
     """
 
-    base_url = "https://understat.com/"
-    leagues = ["EPL", "La_Liga", "Bundesliga", "Serie_A", "Ligue_1", "RFPL"]
+    base_url = BASE_URL
+    shared_attrs = (
+        "session",
+        "transport",
+        "cache",
+        "decoder",
+        "warehouse",
+        "hooks",
+        "base_url",
+        "source",
+    )
+    leagues = LEAGUES
+    max_workers = 8
     parser: BaseParser
+    page: str
+    page_datasets: Dict[str, str]
 
-    def __init__(
+    def __init__(  # pylint: disable=too-many-arguments,too-many-positional-arguments
         self,
         primary_attr: PrimaryAttribute,
-        session: requests.Session,
+        session: Optional[requests.Session] = None,
+        cache: Optional[PayloadCache] = None,
+        decoder: Optional[Decoder] = None,
+        warehouse: Optional[Warehouse] = None,
+        hooks: Optional[Hooks] = None,
+        base_url: Optional[str] = None,
+        source: str = "ajax",
+        transport: Optional[Transport] = None,
     ) -> None:
         """
-        :session: requests.Session: The current ``request`` session
+        :session: requests.Session: The current ``request`` session, used
+            to send requests if no ``transport`` is given
+        :param cache: Cache shared between endpoints for decoded AJAX
+            payloads, ``None`` to always make a request
+        :param decoder: Function which decodes the raw bytes of an AJAX
+            response, ``None`` to use the fastest installed JSON library.
+            See :func:`~understatapi.decoders.get_decoder`
+        :param warehouse: Where to store every payload which is
+            downloaded, ``None`` to not store them
+        :param hooks: Functions to call when requests are made, see
+            :mod:`~understatapi.metrics`
+        :param base_url: The url to send requests to instead of
+            :attr:`base_url`, e.g. a
+            :class:`~understatapi.replay.StandInServer`
+        :param source: ``ajax`` to request data from understat's AJAX
+            endpoints, ``html`` to read it from the datasets embedded in
+            the html pages instead, or ``auto`` to fall back to the html
+            page when an AJAX request fails
+        :param transport: What sends the requests, see
+            :mod:`~understatapi.transport`. ``None`` to send them with
+            ``session``
         """
+        if source not in SOURCES:
+            raise ValueError(
+                f"{source} is not a valid source, choose one of {SOURCES}"
+            )
         self.session = session
-        self._primary_attr = primary_attr
-
-    def __repr__(self) -> str:
-        return f"<{self.__class__.__name__}({self._primary_attr!r})>"
+        self.transport = (
+            transport if transport is not None else RequestsTransport(session)
+        )
+        self.cache = cache
+        self.decoder = decoder if decoder is not None else get_decoder()
+        self.warehouse = warehouse
+        self.hooks = hooks
+        if base_url is not None:
+            self.base_url = base_url
+        self.source = source
+        self._page: Optional[Tuple[str, Dict[str, Any]]] = None
+        self._page_lock = threading.Lock()
+        super().__init__(primary_attr)
 
-    def __len__(self) -> int:
-        if isinstance(self._primary_attr, str):
-            return 1
-        if isinstance(self._primary_attr, Sequence):
-            return len(self._primary_attr)
-        raise TypeError("Primary attribute is not a sequence or string")
+    def _fan_out(
+        self,
+        method: Callable[..., Any],
+        max_workers: int,
+        *args: Any,
+        **kwargs: Any,
+    ) -> BatchResult:
+        """
+        Call an accessor for every primary attribute, using a pool of
+        threads. Errors for individual items are recorded in
+        :attr:`BatchResult.errors` rather than raised.
 
-    def __getitem__(self, index: int) -> "BaseEndpoint":
-        if index >= len(self):
-            raise IndexError
-        if isinstance(self._primary_attr, str):
-            return self.__class__(self._primary_attr, session=self.session)
-        return self.__class__(self._primary_attr[index], session=self.session)
+        :param method: The undecorated accessor to call
+        :param max_workers: The maximum number of threads to use
+        :param args: Arguments to pass to ``method``
+        :param kwargs: Keyword arguments to pass to ``method``
+        """
+        results = BatchResult()
+        keys = cast(Sequence[str], self._primary_attr)
+        if not keys:
+            return results
+        with ThreadPoolExecutor(
+            max_workers=min(max_workers, len(keys))
+        ) as executor:
+            futures = [
+                (key, executor.submit(method, self[index], *args, **kwargs))
+                for index, key in enumerate(keys)
+            ]
+            for key, future in futures:
+                try:
+                    results[key] = future.result()
+                except BATCH_ERRORS as err:
+                    results.errors[key] = err
+        return results
 
     def _check_args(
         self, league: Optional[str] = None, season: Optional[str] = None
     ) -> None:
         """Handle invalid arguments"""
-        if league is not None and league not in self.leagues:
-            raise InvalidLeague(f"{league}is not a valid league", league=league)
-        if season is not None and int(season) < 2014:
-            raise InvalidSeason(f"{season} is not a valid season", season=season)
+        check_args(league=league, season=season, leagues=self.leagues)
 
-    def _request_url(self, *args: Any, **kwargs: Any) -> Response:
+    def _request_url(self, url: str, **kwargs: Any) -> Response:
         """
-        Use the requests module to send a HTTP request to a url, and check
-        that this request worked.
+        Use the endpoint's transport to send a HTTP request to a url, and
+        check that this request worked.
 
-        :param args: Arguments to pass to ``requests.get()``
-        :param kwargs: Keyword arguments to pass to ``requests.get()``
+        :param url: The url to request
+        :param kwargs: Keyword arguments to pass to
+            :meth:`~understatapi.transport.Transport.get`
         """
-        res = self.session.get(*args, **kwargs)
-        res.raise_for_status()
+        res, _ = self._timed_get("page", url, **kwargs)
         return res
 
+    def _timed_get(  # pylint: disable=too-many-arguments
+        self,
+        name: str,
+        url: str,
+        decoder: Optional[Decoder] = None,
+        **kwargs: Any,
+    ) -> Tuple[Response, Any]:
+        """
+        Send a HTTP request, check that it worked and optionally decode the
+        response, emitting a ``request`` event if the endpoint has hooks.
+        The body of a streamed response is left unread, and closed if the
+        request failed
+
+        :param name: The name used to label the request, see
+            :class:`~understatapi.metrics.RequestEvent`
+        :param url: The url to request
+        :param decoder: Function which decodes the body of the response
+        :param kwargs: Keyword arguments to pass to
+            :meth:`~understatapi.transport.Transport.get`
+        :return: The response, and the decoded body or ``None``
+        """
+        stream = kwargs.get("stream", False)
+        with RequestTimer(self.hooks, name, url) as timer:
+            res = timer.received(self.transport.get(url, **kwargs))
+            try:
+                res.raise_for_status()
+                data = None
+                if decoder is not None:
+                    data = timer.decode(decoder, res.content)
+            except Exception:
+                if stream:
+                    res.close()
+                raise
+            timer.size = _body_size(res, stream)
+            return res, data
+
+    def _run(self, query: Query, **kwargs: Any) -> Any:
+        """
+        Send the request of a query and read its section of the payload
+
+        :param query: The request, and what to return from its payload
+        :param kwargs: Keyword arguments to pass to :meth:`_load`
+        """
+        return query.result(self._load(query.request, **kwargs))
+
+    def _load(self, request: Request, **kwargs: Any) -> Dict[str, Any]:
+        """
+        Get the payload of a request, raising the error of the request's
+        entity if the server answers with an error
+
+        :param request: The request to send
+        :param kwargs: Keyword arguments to pass to :meth:`_request_ajax`
+        """
+        try:
+            return self._request_ajax(request.path, **kwargs)
+        except requests.HTTPError as err:
+            error = request.error()
+            if error is None:
+                raise
+            raise error from err
+
+    @staticmethod
+    def _cache_key(
+        endpoint: str, params: Optional[Dict[str, Any]] = None
+    ) -> str:
+        """
+        Build the key under which an AJAX payload is cached
+
+        :param endpoint: The AJAX endpoint path
+        :param params: Query parameters sent with the request
+        """
+        return cache_key(endpoint, params)
+
     def _request_ajax(self, endpoint: str, **kwargs: Any) -> Dict[str, Any]:
         """
         Make an AJAX request to Understat's internal API endpoints.
 
         Understat loads data dynamically via AJAX calls. This method
         handles the required headers and returns parsed JSON data.
+        If the endpoint has a cache, payloads are looked up there first,
+        so every accessor which shares an endpoint path costs one request,
+        and threads asking for a payload which is already being fetched
+        wait for that request instead of making their own.
 
-        :param endpoint: The AJAX endpoint path (e.g., 'getLeagueData/EPL/2024')
-        :param kwargs: Additional keyword arguments to pass to ``requests.get()``
+        :param endpoint: The AJAX endpoint path
+            (e.g., 'getLeagueData/EPL/2024')
+        :param kwargs: Additional keyword arguments to pass to
+            ``requests.get()``
         :return: Parsed JSON response as a dictionary
         """
+        if self.cache is None:
+            return self._fetch(endpoint, **kwargs)
+        key = self._cache_key(endpoint, kwargs.get("params"))
+        loaded = []
+
+        def load() -> Dict[str, Any]:
+            loaded.append(True)
+            return self._fetch(endpoint, **kwargs)
+
+        data = self.cache.get_or_load(key, load)
+        if self.hooks is not None:
+            self.hooks.emit(
+                "cache",
+                CacheEvent(endpoint_name(endpoint), key, hit=not loaded),
+            )
+        return data
+
+    def _fetch(self, endpoint: str, **kwargs: Any) -> Dict[str, Any]:
+        """
+        Get the payload of an AJAX endpoint from the endpoint's
+        :attr:`source`, bypassing the cache, and store it in the warehouse
+
+        :param endpoint: The AJAX endpoint path
+            (e.g., 'getLeagueData/EPL/2024')
+        :param kwargs: Additional keyword arguments to pass to
+            ``requests.get()``
+        """
+        if self.source == "html":
+            data = self._fetch_page(endpoint, **kwargs)
+        elif self.source == "auto":
+            try:
+                data = self._fetch_ajax(endpoint, **kwargs)
+            except (requests.HTTPError, ValueError):
+                data = self._fetch_page(endpoint, **kwargs)
+        else:
+            data = self._fetch_ajax(endpoint, **kwargs)
+        if self.warehouse is not None:
+            self._ingest(endpoint, data)
+        return data
+
+    def _ingest(self, endpoint: str, data: Dict[str, Any]) -> None:
+        """
+        Store a payload in the warehouse. Failures are logged and reported
+        with an ``ingest`` event rather than raised, so that they do not
+        stop the payload from being returned
+
+        :param endpoint: The AJAX endpoint path
+            (e.g., 'getLeagueData/EPL/2024')
+        :param data: The decoded payload
+        """
+        error: Optional[Exception] = None
+        try:
+            cast(Warehouse, self.warehouse).ingest(endpoint, data)
+        except Exception as err:  # pylint: disable=broad-except
+            error = err
+            logger.warning(
+                "Could not store %s in the warehouse: %r", endpoint, err
+            )
+        if self.hooks is not None:
+            self.hooks.emit(
+                "ingest", IngestEvent(endpoint_name(endpoint), endpoint, error)
+            )
+
+    def _fetch_ajax(self, endpoint: str, **kwargs: Any) -> Dict[str, Any]:
+        """
+        Request and decode an AJAX payload
+
+        :param endpoint: The AJAX endpoint path
+            (e.g., 'getLeagueData/EPL/2024')
+        :param kwargs: Additional keyword arguments to pass to
+            ``requests.get()``
+        """
+        url = self.base_url + endpoint
+        headers = dict(kwargs.pop("headers", {}))
+        headers.update(AJAX_HEADERS)
+        _, data = self._timed_get(
+            endpoint_name(endpoint),
+            url,
+            headers=headers,
+            decoder=self.decoder,
+            **kwargs,
+        )
+        return data
+
+    def _fetch_page(self, endpoint: str, **kwargs: Any) -> Dict[str, Any]:
+        """
+        Build the payload of an AJAX endpoint from the datasets embedded in
+        the matching html page. The page is only requested once by each
+        endpoint, however many accessors or threads use it, and is scanned
+        once for all of its datasets.
+        Payloads built from the player page do not have a ``player`` key.
+
+        :param endpoint: The AJAX endpoint path
+            (e.g., 'getLeagueData/EPL/2024')
+        :param kwargs: Additional keyword arguments to pass to
+            ``requests.get()``
+        """
+        _, path = endpoint.split("/", 1)
+        url = f"{self.base_url}{self.page}/{path}"
+        # Threads asking for the page wait for the one requesting it
+        with self._page_lock:
+            if self._page is None or self._page[0] != url:
+                self._page = (url, self._request_page(url, **kwargs))
+            return self._page[1]
+
+    def _request_page(self, url: str, **kwargs: Any) -> Dict[str, Any]:
+        """
+        Request a html page and build the payload from its datasets
+
+        :param url: The url of the page
+        :param kwargs: Additional keyword arguments to pass to
+            ``requests.get()``
+        """
+
+        def decode(content: Union[bytes, str]) -> Dict[str, Any]:
+            html = (
+                content
+                if isinstance(content, str)
+                else content.decode("utf-8")
+            )
+            datasets = extract(html)
+            return {
+                key: json.loads(datasets[name])
+                for name, key in self.page_datasets.items()
+                if name in datasets
+            }
+
+        _, data = self._timed_get("page", url, decoder=decode, **kwargs)
+        if not data:
+            raise ValueError(f"{url} does not embed any data")
+        return data
+
+    def _stream_ajax(
+        self, endpoint: str, section: str, **kwargs: Any
+    ) -> Iterator[Any]:
+        """
+        Make an AJAX request and yield the items of one section of the
+        response as the body arrives, without decoding the rest of it.
+        A payload which is already in the cache is used instead, but
+        streamed payloads are not added to the cache. Endpoints whose
+        :attr:`source` is ``html`` yield the section of the page's
+        payload, as do ``auto`` endpoints whose AJAX request fails
+
+        :param endpoint: The AJAX endpoint path
+            (e.g., 'getLeagueData/EPL/2024')
+        :param section: The key of an array in the response, e.g. ``players``
+        :param kwargs: Additional keyword arguments to pass to
+            ``requests.get()``
+        """
+        if self.cache is not None:
+            data = self.cache.get(
+                self._cache_key(endpoint, kwargs.get("params"))
+            )
+            if data is not None:
+                yield from data.get(section, [])
+                return
+        if self.source == "html":
+            yield from self._fetch(endpoint, **kwargs).get(section, [])
+            return
         url = self.base_url + endpoint
-        headers: Dict[str, str] = kwargs.pop("headers", {})
+        headers = dict(kwargs.pop("headers", {}))
         headers.update(AJAX_HEADERS)
-        res = self.session.get(url, headers=headers, **kwargs)
-        res.raise_for_status()
-        return res.json()
+        try:
+            res, _ = self._timed_get(
+                endpoint_name(endpoint),
+                url,
+                headers=headers,
+                stream=True,
+                **kwargs,
+            )
+        except requests.HTTPError:
+            if self.source != "auto":
+                raise
+            yield from self._fetch_page(endpoint, **kwargs).get(section, [])
+            return
+        try:
+            yield from iter_section(
+                res.iter_content(chunk_size=STREAM_CHUNK_SIZE), section
+            )
+        finally:
+            res.close()
@@ -1,9 +1,11 @@
 """League endpoint"""
 
-from typing import Dict, Any, List
+from typing import Dict, Any, Iterator, List, Optional, Union
 import requests
-from .base import BaseEndpoint
+from .base import BaseEndpoint, fan_out
+from ..models import Fixture, Player, iter_records
 from ..parsers import LeagueParser
+from ..protocol import Query, Request, league_request
 from ..exceptions import PrimaryAttribute
 
 
@@ -35,36 +37,58 @@ class LeagueEndpoint(BaseEndpoint):
     """
 
     parser = LeagueParser()
-
-    def __init__(self, league: PrimaryAttribute, session: requests.Session):
+    page = "league"
+    page_datasets = {
+        "datesData": "dates",
+        "teamsData": "teams",
+        "playersData": "players",
+    }
+
+    def __init__(
+        self,
+        league: PrimaryAttribute,
+        session: Optional[requests.Session] = None,
+        **kwargs: Any,
+    ):
         """
         :param league: Name of the league(s) to get data for,
             one of {EPL, La_Liga, Bundesliga, Serie_A, Ligue_1, RFPL}
         :param session: The current session
+        :param kwargs: Keyword arguments to pass to
+            :class:`~understatapi.endpoints.base.BaseEndpoint`
         """
         self._primary_attr = league
-        super().__init__(primary_attr=self._primary_attr, session=session)
+        super().__init__(
+            primary_attr=self._primary_attr, session=session, **kwargs
+        )
 
     @property
     def league(self) -> PrimaryAttribute:
         """league name"""
         return self._primary_attr
 
-    def _get_data(self, season: str, **kwargs: Any) -> Dict[str, Any]:
+    def _request(self, season: str) -> Request:
+        """
+        The AJAX request for the league's data
+
+        :param season: Season to get data for
+        """
+        return league_request(self.league, season, leagues=self.leagues)
+
+    def _stream_data(
+        self, season: str, section: str, **kwargs: Any
+    ) -> Iterator[Dict[str, Any]]:
         """
-        Get data on a league-wide basis via AJAX endpoint.
+        Stream one section of the league-wide data via AJAX endpoint.
 
         :param season: Season to get data for
+        :param section: One of ``players`` or ``dates``
         :param kwargs: Keyword argument to pass to
-            :meth:`understatapi.endpoints.base.BaseEndpoint._request_ajax`
-        :return: Dictionary with keys: teams, players, dates
+            :meth:`understatapi.endpoints.base.BaseEndpoint._stream_ajax`
         """
-        if not isinstance(self.league, str):
-            raise TypeError("``league`` must be a string")
-        self._check_args(league=self.league, season=season)
-        endpoint = f"getLeagueData/{self.league}/{season}"
-        return self._request_ajax(endpoint, **kwargs)
+        return self._stream_ajax(self._request(season).path, section, **kwargs)
 
+    @fan_out
     def get_team_data(self, season: str, **kwargs: Any) -> Dict[str, Any]:
         """
         Get data for all teams in a given league and season
@@ -73,27 +97,86 @@ class LeagueEndpoint(BaseEndpoint):
         :param kwargs: Keyword argument to pass to
             :meth:`understatapi.endpoints.base.BaseEndpoint._request_ajax`
         """
-        data = self._get_data(season=season, **kwargs)
-        return data.get("teams", {})
-
-    def get_match_data(self, season: str, **kwargs: Any) -> List[Dict[str, Any]]:
+        return self._run(
+            Query(self._request(season), "teams", shape="mapping"), **kwargs
+        )
+
+    @fan_out
+    def get_match_data(
+        self, season: str, typed: bool = False, **kwargs: Any
+    ) -> Union[List[Dict[str, Any]], List[Fixture]]:
         """
         Get data for all fixtures in a given league and season.
 
         :param season: Season to get data for
+        :param typed: Return :class:`~understatapi.models.Fixture` records,
+            with numbers already converted, instead of dictionaries
         :param kwargs: Keyword argument to pass to
             :meth:`understatapi.endpoints.base.BaseEndpoint._request_ajax`
         """
-        data = self._get_data(season=season, **kwargs)
-        return data.get("dates", [])
-
-    def get_player_data(self, season: str, **kwargs: Any) -> List[Dict[str, Any]]:
+        return self._run(
+            Query(self._request(season), "dates", Fixture, typed), **kwargs
+        )
+
+    @fan_out
+    def get_player_data(
+        self,
+        season: str,
+        typed: bool = False,
+        format: Optional[str] = None,  # pylint: disable=redefined-builtin
+        **kwargs: Any,
+    ) -> Any:
         """
         Get data for all players in a given league and season
 
         :param season: Season to get data for
+        :param typed: Return :class:`~understatapi.models.Player` records,
+            with numbers already converted, instead of dictionaries
+        :param format: ``columns`` to return a dictionary of NumPy arrays,
+            or ``arrow`` to return a ``pyarrow.Table``, see
+            :func:`~understatapi.columns.to_columns`
         :param kwargs: Keyword argument to pass to
             :meth:`understatapi.endpoints.base.BaseEndpoint._request_ajax`
         """
-        data = self._get_data(season=season, **kwargs)
-        return data.get("players", [])
+        return self._run(
+            Query(self._request(season), "players", Player, typed, format),
+            **kwargs,
+        )
+
+    def iter_match_data(
+        self, season: str, typed: bool = False, **kwargs: Any
+    ) -> Iterator[Any]:
+        """
+        Yield the fixtures in a given league and season one at a time, as
+        the response is parsed. Unlike :meth:`get_match_data`, the rest of
+        the league data is skipped rather than decoded, which bounds the
+        memory used when reading many leagues and seasons. The request
+        bypasses the persistent HTTP cache
+
+        :param season: Season to get data for
+        :param typed: Yield :class:`~understatapi.models.Fixture` records
+            instead of dictionaries
+        :param kwargs: Keyword argument to pass to
+            :meth:`understatapi.endpoints.base.BaseEndpoint._stream_ajax`
+        """
+        dates = self._stream_data(season=season, section="dates", **kwargs)
+        return iter_records(Fixture, dates) if typed else dates
+
+    def iter_player_data(
+        self, season: str, typed: bool = False, **kwargs: Any
+    ) -> Iterator[Any]:
+        """
+        Yield the players in a given league and season one at a time, as
+        the response is parsed. Unlike :meth:`get_player_data`, the rest of
+        the league data is skipped rather than decoded, which bounds the
+        memory used when reading many leagues and seasons. The request
+        bypasses the persistent HTTP cache
+
+        :param season: Season to get data for
+        :param typed: Yield :class:`~understatapi.models.Player` records
+            instead of dictionaries
+        :param kwargs: Keyword argument to pass to
+            :meth:`understatapi.endpoints.base.BaseEndpoint._stream_ajax`
+        """
+        players = self._stream_data(season=season, section="players", **kwargs)
+        return iter_records(Player, players) if typed else players
@@ -1,11 +1,12 @@
 """Match endpoint"""
 
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 import requests
-from requests.exceptions import HTTPError
-from .base import BaseEndpoint
+from .base import BaseEndpoint, fan_out
+from ..models import RosterEntry, Shot
 from ..parsers import MatchParser
-from ..exceptions import InvalidMatch, PrimaryAttribute
+from ..protocol import Query, Request, match_request
+from ..exceptions import PrimaryAttribute
 
 
 class MatchEndpoint(BaseEndpoint):
@@ -35,60 +36,76 @@ class MatchEndpoint(BaseEndpoint):
     """
 
     parser = MatchParser()
-
-    def __init__(self, match: PrimaryAttribute, session: requests.Session):
+    page = "match"
+    page_datasets = {
+        "shotsData": "shots",
+        "rostersData": "rosters",
+        "match_info": "tmpl",
+    }
+
+    def __init__(
+        self,
+        match: PrimaryAttribute,
+        session: Optional[requests.Session] = None,
+        **kwargs: Any,
+    ):
         """
         :param match: Id of match(es) to get data for
         :param session: The current session
+        :param kwargs: Keyword arguments to pass to
+            :class:`~understatapi.endpoints.base.BaseEndpoint`
         """
         self._primary_attr = match
-        super().__init__(primary_attr=self._primary_attr, session=session)
+        super().__init__(
+            primary_attr=self._primary_attr, session=session, **kwargs
+        )
 
     @property
     def match(self) -> PrimaryAttribute:
         """match id"""
         return self._primary_attr
 
-    def _get_data(self, **kwargs: Any) -> Dict[str, Any]:
-        """
-        Get data on a per-match basis via AJAX endpoint.
+    def _request(self) -> Request:
+        """The AJAX request for the match's data"""
+        return match_request(self.match)
 
-        :param kwargs: Keyword argument to pass to
-            :meth:`understatapi.endpoints.base.BaseEndpoint._request_ajax`
-        :return: Dictionary with keys: rosters, shots, tmpl
-        """
-        if not isinstance(self.match, str):
-            raise TypeError("``match`` must be a string")
-        self._check_args()
-        endpoint = f"getMatchData/{self.match}"
-
-        try:
-            return self._request_ajax(endpoint, **kwargs)
-        except HTTPError as err:
-            raise InvalidMatch(
-                f"{self.match} is not a valid match", match=self.match
-            ) from err
-
-    def get_shot_data(self, **kwargs: Any) -> Dict[str, Any]:
+    @fan_out
+    def get_shot_data(
+        self, typed: bool = False, **kwargs: Any
+    ) -> Dict[str, Any]:
         """
         Get shot level data for a match
 
+        :param typed: Return :class:`~understatapi.models.Shot` records,
+            with numbers already converted, instead of dictionaries
         :param kwargs: Keyword argument to pass to
             :meth:`understatapi.endpoints.base.BaseEndpoint._request_ajax`
         """
-        data = self._get_data(**kwargs)
-        return data.get("shots", {})
-
-    def get_roster_data(self, **kwargs: Any) -> Dict[str, Any]:
+        return self._run(
+            Query(self._request(), "shots", Shot, typed, shape="sides"),
+            **kwargs,
+        )
+
+    @fan_out
+    def get_roster_data(
+        self, typed: bool = False, **kwargs: Any
+    ) -> Dict[str, Any]:
         """
         Get data about the roster for each team
 
+        :param typed: Return :class:`~understatapi.models.RosterEntry` records,
+            with numbers already converted, instead of dictionaries
         :param kwargs: Keyword argument to pass to
             :meth:`understatapi.endpoints.base.BaseEndpoint._request_ajax`
         """
-        data = self._get_data(**kwargs)
-        return data.get("rosters", {})
-
+        return self._run(
+            Query(
+                self._request(), "rosters", RosterEntry, typed, shape="roster"
+            ),
+            **kwargs,
+        )
+
+    @fan_out
     def get_match_info(self, **kwargs: Any) -> Dict[str, Any]:
         """
         Get information about the match
@@ -96,5 +113,6 @@ class MatchEndpoint(BaseEndpoint):
         :param kwargs: Keyword argument to pass to
             :meth:`understatapi.endpoints.base.BaseEndpoint._request_ajax`
         """
-        data = self._get_data(**kwargs)
-        return data.get("tmpl", {})
+        return self._run(
+            Query(self._request(), "tmpl", shape="mapping"), **kwargs
+        )
@@ -1,11 +1,12 @@
 """Player endpoint"""
 
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Union
 import requests
-from requests.exceptions import HTTPError
-from .base import BaseEndpoint
+from .base import BaseEndpoint, fan_out
+from ..models import PlayerMatch, Shot
 from ..parsers import PlayerParser
-from ..exceptions import InvalidPlayer, PrimaryAttribute
+from ..protocol import Query, Request, player_request
+from ..exceptions import PrimaryAttribute
 
 
 class PlayerEndpoint(BaseEndpoint):
@@ -36,61 +37,78 @@ class PlayerEndpoint(BaseEndpoint):
     """
 
     parser = PlayerParser()
-
-    def __init__(self, player: PrimaryAttribute, session: requests.Session) -> None:
+    page = "player"
+    page_datasets = {
+        "matchesData": "matches",
+        "shotsData": "shots",
+        "groupsData": "groups",
+    }
+
+    def __init__(
+        self,
+        player: PrimaryAttribute,
+        session: Optional[requests.Session] = None,
+        **kwargs: Any,
+    ) -> None:
         """
         :param player: Id of the player(s) to get data for
         :param session: The current session
+        :param kwargs: Keyword arguments to pass to
+            :class:`~understatapi.endpoints.base.BaseEndpoint`
         """
         self._primary_attr = player
-        super().__init__(primary_attr=self._primary_attr, session=session)
+        super().__init__(
+            primary_attr=self._primary_attr, session=session, **kwargs
+        )
 
     @property
     def player(self) -> PrimaryAttribute:
         """player id"""
         return self._primary_attr
 
-    def _get_data(self, **kwargs: Any) -> Dict[str, Any]:
-        """
-        Get data on a per-player basis via AJAX endpoint.
+    def _request(self) -> Request:
+        """The AJAX request for the player's data"""
+        return player_request(self.player)
 
-        :param kwargs: Keyword argument to pass to
-            :meth:`understatapi.endpoints.base.BaseEndpoint._request_ajax`
-        :return: Dictionary with keys: player, matches, shots, groups, etc.
-        """
-        if not isinstance(self.player, str):
-            raise TypeError("``player`` must be a string")
-        self._check_args()
-        endpoint = f"getPlayerData/{self.player}"
-
-        try:
-            return self._request_ajax(endpoint, **kwargs)
-        except HTTPError as err:
-            raise InvalidPlayer(
-                f"{self.player} is not a valid player or player id",
-                player=self.player,
-            ) from err
-
-    def get_match_data(self, **kwargs: Any) -> List[Dict[str, Any]]:
+    @fan_out
+    def get_match_data(
+        self, typed: bool = False, **kwargs: Any
+    ) -> Union[List[Dict[str, Any]], List[PlayerMatch]]:
         """
         Get match level data for a player
 
+        :param typed: Return :class:`~understatapi.models.PlayerMatch` records,
+            with numbers already converted, instead of dictionaries
         :param kwargs: Keyword argument to pass to
             :meth:`understatapi.endpoints.base.BaseEndpoint._request_ajax`
         """
-        data = self._get_data(**kwargs)
-        return data.get("matches", [])
-
-    def get_shot_data(self, **kwargs: Any) -> List[Dict[str, Any]]:
+        return self._run(
+            Query(self._request(), "matches", PlayerMatch, typed), **kwargs
+        )
+
+    @fan_out
+    def get_shot_data(
+        self,
+        typed: bool = False,
+        format: Optional[str] = None,  # pylint: disable=redefined-builtin
+        **kwargs: Any,
+    ) -> Any:
         """
         Get shot level data for a player
 
+        :param typed: Return :class:`~understatapi.models.Shot` records,
+            with numbers already converted, instead of dictionaries
+        :param format: ``columns`` to return a dictionary of NumPy arrays,
+            or ``arrow`` to return a ``pyarrow.Table``, see
+            :func:`~understatapi.columns.to_columns`
         :param kwargs: Keyword argument to pass to
             :meth:`understatapi.endpoints.base.BaseEndpoint._request_ajax`
         """
-        data = self._get_data(**kwargs)
-        return data.get("shots", [])
+        return self._run(
+            Query(self._request(), "shots", Shot, typed, format), **kwargs
+        )
 
+    @fan_out
     def get_season_data(self, **kwargs: Any) -> List[Dict[str, Any]]:
         """
         Get season level data for a player
@@ -98,5 +116,4 @@ class PlayerEndpoint(BaseEndpoint):
         :param kwargs: Keyword argument to pass to
             :meth:`understatapi.endpoints.base.BaseEndpoint._request_ajax`
         """
-        data = self._get_data(**kwargs)
-        return data.get("groups", [])
+        return self._run(Query(self._request(), "groups"), **kwargs)
@@ -1,11 +1,12 @@
 """Team endpoint"""
 
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Union
 import requests
-from requests.exceptions import HTTPError
-from .base import BaseEndpoint
+from .base import BaseEndpoint, fan_out
+from ..models import Fixture, Player
 from ..parsers import TeamParser
-from ..exceptions import InvalidTeam, PrimaryAttribute
+from ..protocol import Query, Request, team_request
+from ..exceptions import PrimaryAttribute
 
 
 class TeamEndpoint(BaseEndpoint):
@@ -36,63 +37,86 @@ class TeamEndpoint(BaseEndpoint):
     """
 
     parser = TeamParser()
-
-    def __init__(self, team: PrimaryAttribute, session: requests.Session) -> None:
+    page = "team"
+    page_datasets = {
+        "datesData": "dates",
+        "playersData": "players",
+        "statisticsData": "statistics",
+    }
+
+    def __init__(
+        self,
+        team: PrimaryAttribute,
+        session: Optional[requests.Session] = None,
+        **kwargs: Any,
+    ) -> None:
         """
         :param team: Name of the team(s) to get data for
         :param session: The current session
+        :param kwargs: Keyword arguments to pass to
+            :class:`~understatapi.endpoints.base.BaseEndpoint`
         """
         self._primary_attr = team
-        super().__init__(primary_attr=self._primary_attr, session=session)
+        super().__init__(
+            primary_attr=self._primary_attr, session=session, **kwargs
+        )
 
     @property
     def team(self) -> PrimaryAttribute:
         """team name"""
         return self._primary_attr
 
-    def _get_data(self, season: str, **kwargs: Any) -> Dict[str, Any]:
+    def _request(self, season: str) -> Request:
         """
-        Get data on a per-team basis via AJAX endpoint.
+        The AJAX request for the team's data
 
         :param season: Season to get data for
-        :param kwargs: Keyword argument to pass to
-            :meth:`understatapi.endpoints.base.BaseEndpoint._request_ajax`
-        :return: Dictionary with keys: dates, players, statistics
         """
-        if not isinstance(self.team, str):
-            raise TypeError("``team`` must be a string")
-        self._check_args()
-        endpoint = f"getTeamData/{self.team}/{season}"
-
-        try:
-            return self._request_ajax(endpoint, **kwargs)
-        except HTTPError as err:
-            raise InvalidTeam(
-                f"{self.team} is not a valid team", team=self.team
-            ) from err
-
-    def get_player_data(self, season: str, **kwargs: Any) -> List[Dict[str, Any]]:
+        return team_request(self.team, season)
+
+    @fan_out
+    def get_player_data(
+        self,
+        season: str,
+        typed: bool = False,
+        format: Optional[str] = None,  # pylint: disable=redefined-builtin
+        **kwargs: Any,
+    ) -> Any:
         """
         Get data for all players on a given team in a given season
 
         :param season: Season to get data for
+        :param typed: Return :class:`~understatapi.models.Player` records,
+            with numbers already converted, instead of dictionaries
+        :param format: ``columns`` to return a dictionary of NumPy arrays,
+            or ``arrow`` to return a ``pyarrow.Table``, see
+            :func:`~understatapi.columns.to_columns`
         :param kwargs: Keyword argument to pass to
             :meth:`understatapi.endpoints.base.BaseEndpoint._request_ajax`
         """
-        data = self._get_data(season=season, **kwargs)
-        return data.get("players", [])
-
-    def get_match_data(self, season: str, **kwargs: Any) -> List[Dict[str, Any]]:
+        return self._run(
+            Query(self._request(season), "players", Player, typed, format),
+            **kwargs,
+        )
+
+    @fan_out
+    def get_match_data(
+        self, season: str, typed: bool = False, **kwargs: Any
+    ) -> Union[List[Dict[str, Any]], List[Fixture]]:
         """
         Get data on a per match level for a given team in a given season
 
         :param season: Season to get data for
+        :param typed: Return :class:`~understatapi.models.Fixture` records,
+            with numbers already converted, instead of dictionaries
         :param kwargs: Keyword argument to pass to
             :meth:`understatapi.endpoints.base.BaseEndpoint._request_ajax`
         """
-        data = self._get_data(season=season, **kwargs)
-        return data.get("dates", [])
+        return self._run(
+            Query(self._request(season), "dates", Fixture, typed), **kwargs
+        )
 
+    @fan_out
     def get_context_data(
         self,
         season: str,
@@ -105,5 +129,7 @@ class TeamEndpoint(BaseEndpoint):
         :param kwargs: Keyword argument to pass to
             :meth:`understatapi.endpoints.base.BaseEndpoint._request_ajax`
         """
-        data = self._get_data(season=season, **kwargs)
-        return data.get("statistics", {})
+        return self._run(
+            Query(self._request(season), "statistics", shape="mapping"),
+            **kwargs,
+        )
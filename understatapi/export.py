@@ -0,0 +1,256 @@
+"""
+Export one entity of many league seasons as a stream of records.
+
+:func:`iter_export` fetches the seasons, and the matches of each season,
+with a pool of threads and yields each record as soon as the request it
+came from has finished, so a whole export is never held in memory.
+:func:`write_ndjson` and :func:`write_parquet` write the records as they
+arrive. This is what ``understatapi export`` runs, see :mod:`~understatapi.cli`
+"""
+
+import json
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ThreadPoolExecutor,
+    wait,
+)
+from typing import (
+    IO,
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+    cast,
+)
+from .columns import pa, to_columns
+from .crawler import ENTITIES, MATCH_ENTITIES, match_rows, team_rows
+from .endpoints.base import BATCH_ERRORS
+from .models import Fixture, Player, RosterEntry, Shot
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover
+    pq = None  # type: ignore[assignment]
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .api import UnderstatClient
+
+FORMATS = ("ndjson", "parquet")
+
+# The record type used to build the Parquet columns of each entity,
+# ``teams`` have no record type and their columns are inferred
+RECORD_TYPES: Dict[str, type] = {
+    "fixtures": Fixture,
+    "players": Player,
+    "shots": Shot,
+    "rosters": RosterEntry,
+}
+
+# Number of records written to each row group of a Parquet file
+PARQUET_BATCH_SIZE = 50_000
+
+# (league, season, match id) of the request a future is running
+_Job = Tuple[str, str, Optional[str]]
+
+
+def parse_seasons(seasons: str) -> List[str]:
+    """
+    Expand a season range, e.g. ``2014-2024`` or ``2019,2021``
+
+    :param seasons: A season, an inclusive range of seasons separated by
+        ``-``, or several of either separated by ``,``
+    """
+    result: List[str] = []
+    for part in seasons.split(","):
+        first, _, last = part.strip().partition("-")
+        try:
+            start, end = int(first), int(last or first)
+        except ValueError as err:
+            raise ValueError(
+                f"{part!r} is not a season or range of seasons"
+            ) from err
+        if end < start:
+            raise ValueError(f"{part!r} is not a valid range of seasons")
+        result.extend(str(season) for season in range(start, end + 1))
+    return result
+
+
+def _season_rows(
+    understat: "UnderstatClient", league: str, season: str, entity: str
+) -> List[Dict[str, Any]]:
+    """Get the rows of a league-wide entity, or the fixtures of a season"""
+    endpoint = understat.league(league)
+    if entity == "players":
+        return endpoint.get_player_data(season=season)
+    if entity == "teams":
+        return team_rows(endpoint.get_team_data(season=season))
+    return cast(List[Dict[str, Any]], endpoint.get_match_data(season=season))
+
+
+def _job_rows(
+    understat: "UnderstatClient", entity: str, job: _Job
+) -> List[Dict[str, Any]]:
+    """Get the rows of an entity for a league season, or for one match"""
+    league, season, match_id = job
+    if match_id is not None:
+        return match_rows(understat, match_id, [entity])[entity]
+    return _season_rows(understat, league, season, entity)
+
+
+def _error_key(league: str, season: str, match_id: Optional[str]) -> str:
+    """Name the request an error occurred for"""
+    key = f"league={league}/season={season}"
+    if match_id is not None:
+        key += f"/match={match_id}"
+    return key
+
+
+def iter_export(  # pylint: disable=too-many-arguments,too-many-positional-arguments,too-many-locals,too-many-branches
+    understat: "UnderstatClient",
+    leagues: Union[str, Iterable[str]],
+    seasons: Union[str, Iterable[str]],
+    entity: str,
+    max_workers: int = 8,
+    errors: Optional[Dict[str, Exception]] = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Yield every record of an entity, for every league and season, in the
+    order the requests finish. Each record has ``league`` and ``season``
+    keys added. For ``shots`` and ``rosters`` the fixtures of each season
+    are fetched first, then every match which has been played.
+
+    :param understat: The client to make requests with
+    :param leagues: Name of the league(s) to export
+    :param seasons: The season(s) to export
+    :param entity: One of :data:`~understatapi.crawler.ENTITIES`
+    :param max_workers: The number of requests to make concurrently
+    :param errors: If given, errors for a season or match are recorded in
+        it, keyed by the request they occurred for, rather than raised
+    """
+    if entity not in ENTITIES:
+        raise ValueError(
+            f"{entity} is not a valid entity, choose from {ENTITIES}"
+        )
+    if isinstance(leagues, str):
+        leagues = [leagues]
+    if isinstance(seasons, str):
+        seasons = [seasons]
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    pending: Dict["Future[List[Dict[str, Any]]]", _Job] = {}
+
+    def submit(job: _Job) -> None:
+        pending[executor.submit(_job_rows, understat, entity, job)] = job
+
+    try:
+        for league in leagues:
+            for season in seasons:
+                submit((league, str(season), None))
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                job = pending.pop(future)
+                try:
+                    rows = future.result()
+                except BATCH_ERRORS as err:
+                    if errors is None:
+                        raise
+                    errors[_error_key(*job)] = err
+                    continue
+                if entity in MATCH_ENTITIES and job[2] is None:
+                    for fixture in rows:
+                        if fixture["isResult"]:
+                            submit((job[0], job[1], str(fixture["id"])))
+                    continue
+                for row in rows:
+                    yield {"league": job[0], "season": job[1], **row}
+    finally:
+        for future in pending:
+            future.cancel()
+        executor.shutdown(wait=True)
+
+
+def write_ndjson(records: Iterable[Dict[str, Any]], fh: IO[str]) -> int:
+    """
+    Write records as newline-delimited JSON, one line per record
+
+    :param records: The records to write
+    :param fh: A file opened for writing text
+    :return: The number of records written
+    """
+    count = 0
+    for record in records:
+        fh.write(json.dumps(record, separators=(",", ":")))
+        fh.write("\n")
+        count += 1
+    return count
+
+
+def _batch_table(entity: str, rows: List[Dict[str, Any]]) -> Any:
+    """Build a table from a batch of records"""
+    record_type = RECORD_TYPES.get(entity)
+    if record_type is None:
+        return pa.Table.from_pylist(rows)
+    table = to_columns(record_type, rows, "arrow")
+    for name in ("league", "season", "match_id"):
+        if name in rows[0] and name not in table.column_names:
+            values = [row[name] for row in rows]
+            if name != "league":
+                values = pa.array(
+                    [int(value) for value in values], type=pa.int32()
+                )
+            table = table.append_column(name, pa.array(values))
+    return table
+
+
+def write_parquet(
+    records: Iterable[Dict[str, Any]],
+    entity: str,
+    path: str,
+    batch_size: int = PARQUET_BATCH_SIZE,
+) -> int:
+    """
+    Write records to a Parquet file, one row group per ``batch_size``
+    records, with the column types of the entity's record type.
+    Requires ``pyarrow``, install it with ``pip install understatapi[arrow]``
+
+    :param records: The records of one entity, from :func:`iter_export`
+    :param entity: One of :data:`~understatapi.crawler.ENTITIES`
+    :param path: The file to write to
+    :param batch_size: The number of records to hold before writing them
+    :return: The number of records written
+    """
+    if pq is None:
+        raise ImportError(
+            "Writing Parquet requires pyarrow, install it with "
+            "``pip install understatapi[arrow]``"
+        )
+    writer = None
+    count = 0
+    batch: List[Dict[str, Any]] = []
+
+    def flush() -> None:
+        nonlocal writer
+        table = _batch_table(entity, batch)
+        if writer is None:
+            writer = pq.ParquetWriter(path, table.schema)
+        writer.write_table(table.cast(writer.schema))
+        batch.clear()
+
+    try:
+        for record in records:
+            batch.append(record)
+            count += 1
+            if len(batch) >= batch_size:
+                flush()
+        if batch:
+            flush()
+    finally:
+        if writer is not None:
+            writer.close()
+    return count
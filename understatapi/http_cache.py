@@ -0,0 +1,252 @@
+"""Persistent HTTP caching with conditional revalidation"""
+
+import io
+import sqlite3
+import threading
+import time
+from typing import Any, NamedTuple, Optional
+from urllib.parse import urlsplit
+import requests
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+from .cache import CachePolicy
+from .throttle import ThrottledHTTPAdapter
+
+
+class CachedResponse(NamedTuple):
+    """A response body stored by a :class:`SQLiteCacheStore`"""
+
+    url: str
+    content: bytes
+    content_type: Optional[str]
+    etag: Optional[str]
+    last_modified: Optional[str]
+    stored_at: float
+
+
+class SQLiteCacheStore:
+    """
+    Store response bodies in a SQLite database so that they outlive the
+    process which downloaded them. Safe to share between threads.
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        :param path: Path to the SQLite database file, created if it
+            does not exist
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "url TEXT PRIMARY KEY, content BLOB NOT NULL, "
+                "content_type TEXT, etag TEXT, last_modified TEXT, "
+                "stored_at REAL NOT NULL)"
+            )
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__}({self.path!r})>"
+
+    def get(self, url: str) -> Optional[CachedResponse]:
+        """
+        Look up a stored response
+
+        :param url: The url of the request
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT url, content, content_type, etag, last_modified, "
+                "stored_at FROM responses WHERE url = ?",
+                (url,),
+            ).fetchone()
+        if row is None:
+            return None
+        return CachedResponse(*row)
+
+    def set(
+        self,
+        url: str,
+        content: bytes,
+        content_type: Optional[str] = None,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+    ) -> None:
+        """
+        Store a response, replacing any response stored for the same url
+
+        :param url: The url of the request
+        :param content: The decompressed response body
+        :param content_type: The ``Content-Type`` header of the response
+        :param etag: The ``ETag`` header of the response
+        :param last_modified: The ``Last-Modified`` header of the response
+        """
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+                (url, content, content_type, etag, last_modified, time.time()),
+            )
+
+    def touch(self, url: str) -> None:
+        """
+        Mark a stored response as having just been revalidated
+
+        :param url: The url of the request
+        """
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE responses SET stored_at = ? WHERE url = ?",
+                (time.time(), url),
+            )
+
+    def delete(self, url: str) -> None:
+        """
+        Remove a stored response
+
+        :param url: The url of the request
+        """
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM responses WHERE url = ?", (url,))
+
+    def clear(self) -> None:
+        """Remove every stored response"""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM responses")
+
+    def close(self) -> None:
+        """Close the database connection"""
+        with self._lock:
+            self._conn.close()
+
+
+class CachingHTTPAdapter(ThrottledHTTPAdapter):
+    """
+    A ``requests`` transport adapter which stores successful ``GET``
+    responses in a :class:`SQLiteCacheStore`.
+
+    When a stored response has an ``ETag`` or ``Last-Modified`` header the
+    request is revalidated with ``If-None-Match``/``If-Modified-Since``,
+    and a ``304 Not Modified`` reply is answered from the store instead of
+    downloading the body again. Stored responses younger than ``max_age``,
+    and those which the ``policy`` says can never change, are served
+    without making a request at all. Requests which are answered from the
+    store do not count towards the rate limit.
+
+    Responses served from the store have ``from_cache`` set to ``True``.
+    Streamed requests, e.g. those of
+    :meth:`~understatapi.endpoints.league.LeagueEndpoint.iter_player_data`,
+    bypass the store, as storing a body means reading all of it before
+    the first byte reaches the caller.
+    """
+
+    def __init__(
+        self,
+        store: SQLiteCacheStore,
+        max_age: Optional[float] = None,
+        policy: Optional[CachePolicy] = None,
+        **kwargs: Any,
+    ) -> None:
+        """
+        :param store: Where to keep the responses
+        :param max_age: Number of seconds for which a stored response is
+            served without revalidation, ``None`` to always revalidate
+        :param policy: Decides which responses can never change, and are
+            served without revalidation however old they are
+        :param kwargs: Keyword arguments to pass to
+            :class:`~understatapi.throttle.ThrottledHTTPAdapter`
+        """
+        super().__init__(**kwargs)
+        self.store = store
+        self.max_age = max_age
+        self.policy = policy
+
+    def send(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+        self,
+        request: requests.PreparedRequest,
+        stream: bool = False,
+        timeout: Any = None,
+        verify: Any = True,
+        cert: Any = None,
+        proxies: Any = None,
+    ) -> requests.Response:
+        """
+        Send a request, answering it from the store where possible.
+        See ``requests.adapters.HTTPAdapter.send()`` for the parameters.
+        """
+        kwargs = {
+            "stream": stream,
+            "timeout": timeout,
+            "verify": verify,
+            "cert": cert,
+            "proxies": proxies,
+        }
+        if stream or request.method != "GET" or request.url is None:
+            return super().send(request, **kwargs)
+        url = request.url
+        entry = self.store.get(url)
+        if entry is not None:
+            if self._is_fresh(url, entry):
+                return self._build_cached_response(request, entry)
+            if entry.etag:
+                request.headers["If-None-Match"] = entry.etag
+            if entry.last_modified:
+                request.headers["If-Modified-Since"] = entry.last_modified
+        response = super().send(request, **kwargs)
+        if response.status_code == 304 and entry is not None:
+            response.close()
+            self.store.touch(url)
+            return self._build_cached_response(request, entry)
+        if response.status_code == 200:
+            self.store.set(
+                url,
+                response.content,
+                content_type=response.headers.get("Content-Type"),
+                etag=response.headers.get("ETag"),
+                last_modified=response.headers.get("Last-Modified"),
+            )
+        return response
+
+    def _is_fresh(self, url: str, entry: CachedResponse) -> bool:
+        """Whether a stored response can be served without revalidation"""
+        if self.policy is not None and self.policy.is_immutable(
+            urlsplit(url).path
+        ):
+            return True
+        return (
+            self.max_age is not None
+            and time.time() - entry.stored_at <= self.max_age
+        )
+
+    @staticmethod
+    def _build_cached_response(
+        request: requests.PreparedRequest, entry: CachedResponse
+    ) -> requests.Response:
+        """Build a ``requests.Response`` from a stored response"""
+        response = requests.Response()
+        response.status_code = 200
+        response.reason = "OK"
+        response.url = entry.url
+        response.request = request
+        headers = {
+            "Content-Type": entry.content_type,
+            "ETag": entry.etag,
+            "Last-Modified": entry.last_modified,
+        }
+        response.headers = CaseInsensitiveDict(
+            {key: value for key, value in headers.items() if value is not None}
+        )
+        response.encoding = get_encoding_from_headers(response.headers)
+        # Set the body as both read and readable, so that the response can
+        # be streamed with ``iter_content()`` and closed like a real one
+        response.raw = io.BytesIO(entry.content)
+        response._content = entry.content  # pylint: disable=protected-access
+        setattr(response, "_content_consumed", True)
+        setattr(response, "from_cache", True)
+        return response
+
+    def close(self) -> None:
+        """Close the connection pool and the store"""
+        super().close()
+        self.store.close()
@@ -0,0 +1,587 @@
+"""
+Instrumentation hooks and request metrics.
+
+Every :class:`~understatapi.api.UnderstatClient` has a :class:`Hooks`
+registry, which calls functions registered for these events:
+
+* ``request``: a :class:`RequestEvent` after every HTTP request, whether
+  it succeeded or not
+* ``retry``: a :class:`RetryEvent` before a failed request is retried
+* ``cache``: a :class:`CacheEvent` each time an AJAX payload is looked up
+  in the client's cache
+* ``ingest``: an :class:`IngestEvent` each time a payload is stored in
+  the client's warehouse, whether it succeeded or not
+
+A :class:`MetricsRegistry` listens to these events and keeps counters and
+histograms of them, which :meth:`MetricsRegistry.render` exports in the
+Prometheus text format
+"""
+
+import threading
+import time
+from types import TracebackType
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+)
+
+EVENTS = ("request", "retry", "cache", "ingest")
+
+# Upper bounds of the latency histogram buckets, in seconds
+DURATION_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+
+class RequestEvent(NamedTuple):
+    """
+    An HTTP request made by an endpoint
+
+    :attr endpoint: The name of the AJAX endpoint, e.g. ``getLeagueData``,
+        or ``page`` for other urls
+    :attr url: The url which was requested
+    :attr status_code: The status code of the response, ``None`` if no
+        response was received
+    :attr elapsed: Seconds taken to receive the response
+    :attr size: The number of bytes in the response body, ``0`` if the
+        request failed. Streamed bodies are not read when the event is
+        emitted, so their ``Content-Length`` is used
+    :attr decode_time: Seconds taken to decode the response body
+    :attr from_cache: Whether the response was served by the HTTP cache
+    :attr error: The error raised by the request, if any
+    """
+
+    endpoint: str
+    url: str
+    status_code: Optional[int]
+    elapsed: float
+    size: int
+    decode_time: float
+    from_cache: bool
+    error: Optional[BaseException]
+
+
+class RetryEvent(NamedTuple):
+    """
+    A failed request which is about to be retried
+
+    :attr url: The url which was requested
+    :attr attempt: The number of the attempt which failed, from ``0``
+    :attr status_code: The status code of the failed attempt, ``None`` if
+        the connection failed
+    :attr delay: Seconds to wait before the next attempt
+    """
+
+    url: str
+    attempt: int
+    status_code: Optional[int]
+    delay: float
+
+
+class CacheEvent(NamedTuple):
+    """
+    A lookup of an AJAX payload in the client's cache
+
+    :attr endpoint: The name of the AJAX endpoint, e.g. ``getLeagueData``
+    :attr key: The cache key
+    :attr hit: Whether the payload was returned without this lookup making
+        a request
+    """
+
+    endpoint: str
+    key: str
+    hit: bool
+
+
+class IngestEvent(NamedTuple):
+    """
+    A payload stored in the client's :class:`~understatapi.warehouse.Warehouse`
+
+    :attr endpoint: The name of the AJAX endpoint, e.g. ``getLeagueData``
+    :attr path: The AJAX endpoint path of the payload
+    :attr error: The error raised while storing the payload, if any. The
+        payload is still returned to the caller
+    """
+
+    endpoint: str
+    path: str
+    error: Optional[BaseException]
+
+
+def endpoint_name(path: str) -> str:
+    """
+    Get the name of the AJAX endpoint of a path, which is used to label
+    metrics, e.g. ``getLeagueData`` for ``getLeagueData/EPL/2021``
+
+    :param path: The AJAX endpoint path
+    """
+    return path.split("/", 1)[0].split("?", 1)[0]
+
+
+class Hooks:
+    """
+    Functions to call when events happen. Functions are called in the
+    thread which caused the event, in the order they were registered, and
+    errors they raise are not caught.
+    """
+
+    def __init__(self) -> None:
+        self._callbacks: Dict[str, List[Callable[[Any], None]]] = {
+            event: [] for event in EVENTS
+        }
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        counts = {
+            event: len(callbacks)
+            for event, callbacks in self._callbacks.items()
+        }
+        return f"<{self.__class__.__name__}({counts})>"
+
+    def _check_event(self, event: str) -> None:
+        if event not in EVENTS:
+            raise ValueError(
+                f"{event} is not a valid event, choose one of {EVENTS}"
+            )
+
+    def register(self, event: str, callback: Callable[[Any], None]) -> None:
+        """
+        Call a function each time an event happens
+
+        :param event: One of :data:`EVENTS`
+        :param callback: Function which takes the event, e.g. a
+            :class:`RequestEvent`
+        """
+        self._check_event(event)
+        with self._lock:
+            self._callbacks[event] = self._callbacks[event] + [callback]
+
+    def unregister(self, event: str, callback: Callable[[Any], None]) -> None:
+        """
+        Stop calling a function when an event happens
+
+        :param event: One of :data:`EVENTS`
+        :param callback: A function passed to :meth:`register`
+        """
+        self._check_event(event)
+        with self._lock:
+            self._callbacks[event] = [
+                other for other in self._callbacks[event] if other != callback
+            ]
+
+    def emit(self, event: str, payload: Any) -> None:
+        """
+        Call every function registered for an event
+
+        :param event: One of :data:`EVENTS`
+        :param payload: The event, passed to each function
+        """
+        # The list is replaced, never mutated, so it can be read unlocked
+        for callback in self._callbacks[event]:
+            callback(payload)
+
+
+class RequestTimer:  # pylint: disable=too-many-instance-attributes
+    """
+    Time an HTTP request made by an endpoint, shared by the blocking and
+    ``asyncio`` endpoints. Used as a context manager around the request,
+    it emits a :class:`RequestEvent` when the block ends, whether the
+    request succeeded or not
+
+    :Example:
+
+    .. code-block::
+
+        with RequestTimer(hooks, "getPlayerData", url) as timer:
+            res = timer.received(session.get(url))
+            data = timer.decode(json.loads, res.content)
+            timer.size = len(res.content)
+
+    :attr size: int: The number of bytes in the body of the response,
+        set by the caller once the request has succeeded
+    """
+
+    def __init__(self, hooks: Optional[Hooks], name: str, url: str) -> None:
+        """
+        :param hooks: Where to emit the event, ``None`` to not emit one
+        :param name: The name used to label the request, see
+            :class:`RequestEvent`
+        :param url: The url which is requested
+        """
+        self.hooks = hooks
+        self.name = name
+        self.url = url
+        self.size = 0
+        self.response: Any = None
+        self._start = time.perf_counter()
+        self._elapsed: Optional[float] = None
+        self._decode_time = 0.0
+
+    def __enter__(self) -> "RequestTimer":
+        return self
+
+    def __exit__(
+        self,
+        exception_type: Optional[Type[BaseException]],
+        exception_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        if self.hooks is None:
+            return
+        res = self.response
+        elapsed = self._elapsed
+        self.hooks.emit(
+            "request",
+            RequestEvent(
+                endpoint=self.name,
+                url=self.url,
+                status_code=None if res is None else res.status_code,
+                elapsed=(
+                    time.perf_counter() - self._start
+                    if elapsed is None
+                    else elapsed
+                ),
+                size=0 if exception_value is not None else self.size,
+                decode_time=self._decode_time,
+                from_cache=getattr(res, "from_cache", False),
+                error=exception_value,
+            ),
+        )
+
+    def received(self, response: Any) -> Any:
+        """
+        Record that the response has arrived
+
+        :param response: The response, from ``requests`` or ``httpx``
+        :return: The response
+        """
+        self.response = response
+        self._elapsed = time.perf_counter() - self._start
+        return response
+
+    def decode(self, decoder: Callable[[Any], Any], content: Any) -> Any:
+        """
+        Decode the body of the response, recording how long it took
+
+        :param decoder: Function which decodes the body
+        :param content: The body of the response
+        """
+        start = time.perf_counter()
+        data = decoder(content)
+        self._decode_time = time.perf_counter() - start
+        return data
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: Sequence[Tuple[str, str]]) -> str:
+    if not labels:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in labels)
+    return "{" + pairs + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class Metric:
+    """A metric, which has a value for each combination of labels"""
+
+    type = "untyped"
+
+    def __init__(
+        self, name: str, documentation: str, labels: Sequence[str]
+    ) -> None:
+        """
+        :param name: The name of the metric
+        :param documentation: A description of the metric
+        :param labels: The names of the labels
+        """
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__}({self.name!r})>"
+
+    def _key(self, labels: Dict[str, Any]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labels):
+            raise ValueError(f"{self.name} has labels {self.labels}")
+        return tuple(str(labels[name]) for name in self.labels)
+
+    def samples(
+        self,
+    ) -> Iterator[Tuple[str, Sequence[Tuple[str, str]], float]]:
+        """Yield the name, labels and value of each sample"""
+        with self._lock:
+            values = sorted(self._values.items())
+        for key, value in values:
+            yield self.name, tuple(zip(self.labels, key)), value
+
+
+class Counter(Metric):
+    """A value which only goes up"""
+
+    type = "counter"
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        """
+        Add to the counter
+
+        :param amount: How much to add
+        :param labels: The value of each label
+        """
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: Any) -> float:
+        """
+        Get the value of the counter
+
+        :param labels: The value of each label
+        """
+        return self._values.get(self._key(labels), 0.0)
+
+
+class Histogram(Metric):
+    """The distribution of observed values"""
+
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels: Sequence[str],
+        buckets: Sequence[float] = DURATION_BUCKETS,
+    ) -> None:
+        """
+        :param name: The name of the metric
+        :param documentation: A description of the metric
+        :param labels: The names of the labels
+        :param buckets: The upper bounds of the buckets
+        """
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        self._counts: Dict[Tuple[str, ...], List[int]] = {}
+
+    def observe(self, value: float, **labels: Any) -> None:
+        """
+        Record an observation
+
+        :param value: The observed value
+        :param labels: The value of each label
+        """
+        key = self._key(labels)
+        with self._lock:
+            counts = self._counts.setdefault(key, [0] * len(self.buckets))
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[index] += 1
+            self._values[key] = self._values.get(key, 0.0) + value
+
+    def count(self, **labels: Any) -> int:
+        """
+        Get the number of observations
+
+        :param labels: The value of each label
+        """
+        counts = self._counts.get(self._key(labels))
+        return counts[-1] if counts else 0
+
+    def samples(
+        self,
+    ) -> Iterator[Tuple[str, Sequence[Tuple[str, str]], float]]:
+        """Yield the name, labels and value of each sample"""
+        with self._lock:
+            entries = sorted(
+                (key, list(counts), self._values[key])
+                for key, counts in self._counts.items()
+            )
+        for key, counts, total in entries:
+            labels = tuple(zip(self.labels, key))
+            for bound, count in zip(self.buckets, counts):
+                bucket = labels + (("le", _format_value(bound)),)
+                yield self.name + "_bucket", bucket, count
+            yield self.name + "_sum", labels, total
+            yield self.name + "_count", labels, counts[-1]
+
+
+class MetricsRegistry:  # pylint: disable=too-many-instance-attributes
+    """
+    Counters and histograms of the requests made by a client, built from
+    the events of a :class:`Hooks`
+
+    :Example:
+
+    .. code-block::
+
+        from understatapi import UnderstatClient
+
+        with UnderstatClient(metrics=True) as understat:
+            understat.league(league="EPL").get_player_data(season="2021")
+            print(understat.metrics.render())
+
+    :attr requests: Requests by endpoint and status code
+    :attr request_duration: Seconds taken to receive responses, by endpoint
+    :attr response_bytes: Bytes received, by endpoint
+    :attr decode_duration: Seconds taken to decode responses, by endpoint
+    :attr http_cache_hits: Responses served by the HTTP cache, by endpoint
+    :attr retries: Retried requests, by status code
+    :attr cache_lookups: Payload cache lookups, by endpoint and result
+    :attr ingests: Payloads stored in the warehouse, by endpoint and result
+    """
+
+    def __init__(self, namespace: str = "understat") -> None:
+        """
+        :param namespace: Prefix of the name of every metric
+        """
+        self.requests = Counter(
+            f"{namespace}_requests_total",
+            "HTTP requests made",
+            ("endpoint", "status"),
+        )
+        self.request_duration = Histogram(
+            f"{namespace}_request_duration_seconds",
+            "Seconds taken to receive a response",
+            ("endpoint",),
+        )
+        self.response_bytes = Counter(
+            f"{namespace}_response_bytes_total",
+            "Bytes received",
+            ("endpoint",),
+        )
+        self.decode_duration = Histogram(
+            f"{namespace}_decode_duration_seconds",
+            "Seconds taken to decode a response",
+            ("endpoint",),
+        )
+        self.http_cache_hits = Counter(
+            f"{namespace}_http_cache_hits_total",
+            "Responses served by the HTTP cache",
+            ("endpoint",),
+        )
+        self.retries = Counter(
+            f"{namespace}_retries_total",
+            "Requests which were retried",
+            ("status",),
+        )
+        self.cache_lookups = Counter(
+            f"{namespace}_cache_lookups_total",
+            "Lookups of decoded payloads",
+            ("endpoint", "result"),
+        )
+        self.ingests = Counter(
+            f"{namespace}_warehouse_ingests_total",
+            "Payloads stored in the warehouse",
+            ("endpoint", "result"),
+        )
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__}()>"
+
+    @property
+    def metrics(self) -> Tuple[Metric, ...]:
+        """Every metric in the registry"""
+        return (
+            self.requests,
+            self.request_duration,
+            self.response_bytes,
+            self.decode_duration,
+            self.http_cache_hits,
+            self.retries,
+            self.cache_lookups,
+            self.ingests,
+        )
+
+    def on_request(self, event: RequestEvent) -> None:
+        """Record a :class:`RequestEvent`"""
+        status = (
+            "error" if event.status_code is None else str(event.status_code)
+        )
+        self.requests.inc(endpoint=event.endpoint, status=status)
+        self.request_duration.observe(event.elapsed, endpoint=event.endpoint)
+        self.response_bytes.inc(event.size, endpoint=event.endpoint)
+        if event.decode_time:
+            self.decode_duration.observe(
+                event.decode_time, endpoint=event.endpoint
+            )
+        if event.from_cache:
+            self.http_cache_hits.inc(endpoint=event.endpoint)
+
+    def on_retry(self, event: RetryEvent) -> None:
+        """Record a :class:`RetryEvent`"""
+        status = (
+            "error" if event.status_code is None else str(event.status_code)
+        )
+        self.retries.inc(status=status)
+
+    def on_cache(self, event: CacheEvent) -> None:
+        """Record a :class:`CacheEvent`"""
+        result = "hit" if event.hit else "miss"
+        self.cache_lookups.inc(endpoint=event.endpoint, result=result)
+
+    def on_ingest(self, event: IngestEvent) -> None:
+        """Record an :class:`IngestEvent`"""
+        result = "ok" if event.error is None else "error"
+        self.ingests.inc(endpoint=event.endpoint, result=result)
+
+    def attach(self, hooks: Hooks) -> None:
+        """
+        Start recording the events of a :class:`Hooks`
+
+        :param hooks: The hooks of a client
+        """
+        hooks.register("request", self.on_request)
+        hooks.register("retry", self.on_retry)
+        hooks.register("cache", self.on_cache)
+        hooks.register("ingest", self.on_ingest)
+
+    def detach(self, hooks: Hooks) -> None:
+        """
+        Stop recording the events of a :class:`Hooks`
+
+        :param hooks: The hooks passed to :meth:`attach`
+        """
+        hooks.unregister("request", self.on_request)
+        hooks.unregister("retry", self.on_retry)
+        hooks.unregister("cache", self.on_cache)
+        hooks.unregister("ingest", self.on_ingest)
+
+    def render(self) -> str:
+        """Export every metric in the Prometheus text format"""
+        lines = []
+        for metric in self.metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            for name, labels, value in metric.samples():
+                lines.append(
+                    f"{name}{_format_labels(labels)} {_format_value(value)}"
+                )
+        return "\n".join(lines) + "\n"
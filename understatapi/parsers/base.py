@@ -1,32 +1,166 @@
 """Base html parser"""
 
-from typing import List, Any, Dict
+from typing import Iterator, List, Any, Dict, Match, Optional, Tuple
+import codecs
 import json
+import re
+
+OPEN = "JSON.parse('"
+CLOSE = "')"
+
+# The name a ``JSON.parse`` call is assigned to, e.g. ``var teamsData = ``
+_NAME = re.compile(r"(\w+)\s*=\s*$")
+# The escape sequences of a javascript string literal
+_ESCAPE = re.compile(r"\\(x[0-9A-Fa-f]{2}|u[0-9A-Fa-f]{4}|.)", re.DOTALL)
+_SIMPLE_ESCAPES = {
+    "n": "\n",
+    "r": "\r",
+    "t": "\t",
+    "b": "\b",
+    "f": "\f",
+    "v": "\v",
+    "0": "\0",
+}
+
+
+def _unescape_match(match: Match[str]) -> str:
+    escape = match.group(1)
+    if escape[0] in "xu" and len(escape) > 1:
+        return chr(int(escape[1:], 16))
+    return _SIMPLE_ESCAPES.get(escape, escape)
+
+
+def unescape(literal: str) -> str:
+    """
+    Decode the escape sequences in the body of a javascript string literal
+
+    :param literal: The characters between the quotes of the literal
+    """
+    if "\\" not in literal:
+        return literal
+    if literal.isascii():
+        # Only ascii, so the codec's utf-8 view of the string is the string
+        return codecs.decode(literal, "unicode_escape")
+    return _ESCAPE.sub(_unescape_match, literal)
+
+
+def _escaped(html: str, index: int) -> bool:
+    """Whether the character at ``index`` is escaped by a backslash"""
+    count = 0
+    while index - count > 0 and html[index - count - 1] == "\\":
+        count += 1
+    return count % 2 == 1
+
+
+def _datasets(html: str) -> Iterator[Tuple[str, int, int]]:
+    """
+    Find each ``<name> = JSON.parse('...')`` in a html document
+
+    :param html: A html document
+    :return: The name of each dataset, and where its string starts and ends
+    """
+    position = 0
+    while True:
+        start = html.find(OPEN, position)
+        if start < 0:
+            return
+        begin = start + len(OPEN)
+        end = html.find(CLOSE, begin)
+        while end >= 0 and _escaped(html, end):
+            end = html.find(CLOSE, end + 1)
+        if end < 0:
+            return
+        name = _NAME.search(html, max(0, start - 100), start)
+        if name is not None:
+            yield name.group(1), begin, end
+        position = end + len(CLOSE)
+
+
+def extract(html: str) -> Dict[str, str]:
+    """
+    Find every ``<name> = JSON.parse('...')`` in a html document in a single
+    pass, and decode the escape sequences in each string, so extracting
+    several datasets from the same page only scans it once.
+
+    :param html: A html document
+    :return: The JSON text of each dataset, by the name it is assigned to.
+        Only the first dataset with a given name is kept
+    """
+    datasets: Dict[str, str] = {}
+    for name, begin, end in _datasets(html):
+        if name not in datasets:
+            datasets[name] = unescape(html[begin:end])
+    return datasets
+
+
+def find_dataset(html: str, query: str) -> Optional[str]:
+    """
+    Find one dataset in a html document, decoding only its string
+
+    :param html: A html document
+    :param query: The name of the dataset, or a sub-string of it
+    :return: The JSON text of the dataset with this name, or else of the
+        first dataset whose name contains it, ``None`` if there is none
+    """
+    candidate: Optional[Tuple[int, int]] = None
+    for name, begin, end in _datasets(html):
+        if name == query:
+            return unescape(html[begin:end])
+        if candidate is None and query in name:
+            candidate = (begin, end)
+    if candidate is None:
+        return None
+    return unescape(html[candidate[0] : candidate[1]])
 
 
 class BaseParser:
-    """Parse a html document and extract relevant data"""
+    """
+    Parse a html document and extract relevant data
+
+    The datasets of the last document parsed are kept, so reading several
+    datasets from the same page, e.g. with each getter of
+    :class:`~understatapi.parsers.league.LeagueParser`, only scans it once
+    """
 
     queries: List[str]
 
-    # def __init__(self, html: str):
-    #     self.html = html
+    def __init__(self) -> None:
+        self._last: Optional[Tuple[str, Dict[str, str]]] = None
+
+    def datasets(self, html: str) -> Dict[str, str]:
+        """
+        The JSON text of each dataset in a html document, see
+        :func:`extract`
+
+        :param html: A html document
+        """
+        # Read once, so a thread parsing another page cannot swap the
+        # document and its datasets between the check and the return
+        last = self._last
+        if last is not None and last[0] is html:
+            return last[1]
+        datasets = extract(html)
+        self._last = (html, datasets)
+        return datasets
 
-    @staticmethod
-    def parse(html: str, query: str = "teamsData") -> Dict[str, Any]:
+    def parse(self, html: str, query: str = "teamsData") -> Dict[str, Any]:
         """
         Finds a JSON in the HTML according to a query, and returns the
         object corresponding to this JSON.
 
         :param html: A html document
-        :param query: A sub-string to look for in the html document
+        :param query: The name of the dataset, or else a sub-string of the
+            first name containing it, see :func:`find_dataset`
+        :raises ValueError: If the document does not embed the dataset
         """
-        query_index = html.find(query)
-        # get the start and end of the JSON data string
-        start = html.find("(", query_index) + 2
-        end = html.find(")", start) - 1
-        json_data = html[start:end]
-        # Clean up the json and return the data
-        json_data = json_data.encode("utf8").decode("unicode_escape")
+        datasets = self.datasets(html)
+        json_data = datasets.get(query)
+        if json_data is None:
+            json_data = next(
+                (text for name, text in datasets.items() if query in name),
+                None,
+            )
+        if json_data is None:
+            raise ValueError(f"{query} is not embedded in the document")
         data = json.loads(json_data)
         return data
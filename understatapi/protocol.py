@@ -0,0 +1,329 @@
+"""
+The requests understat's AJAX endpoints expect, and how to read their
+responses, without sending anything.
+
+An accessor such as ``PlayerEndpoint.get_shot_data()`` is described by a
+:class:`Query`: the :class:`Request` to send, and which section of the
+payload to return, in which shape. Building a request validates its
+arguments, and :meth:`Query.result` turns a decoded payload into what
+the accessor returns. Sending the request is left to a driver, so the
+same description is used by the blocking endpoints, the ``asyncio``
+endpoints and any executor which sends many requests at once
+
+:Example:
+
+.. code-block::
+
+    import requests
+    from understatapi.protocol import Query, player_request
+    from understatapi.models import Shot
+
+    query = Query(player_request("647"), "shots", Shot, typed=True)
+    request = query.request
+    res = requests.get(request.url(), headers=request.headers)
+    if res.status_code == 404:
+        raise request.error()
+    res.raise_for_status()
+    shots = query.result(res.json())
+
+"""
+
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+    cast,
+)
+from urllib.parse import urlencode
+from .columns import to_columns
+from .exceptions import (
+    InvalidLeague,
+    InvalidMatch,
+    InvalidPlayer,
+    InvalidSeason,
+    InvalidTeam,
+    PrimaryAttribute,
+)
+from .models import to_records
+
+BASE_URL = "https://understat.com/"
+
+# Headers required for AJAX requests to Understat
+AJAX_HEADERS = {
+    "X-Requested-With": "XMLHttpRequest",
+}
+
+LEAGUES = ["EPL", "La_Liga", "Bundesliga", "Serie_A", "Ligue_1", "RFPL"]
+
+# The first season understat has data for
+FIRST_SEASON = 2014
+
+# The error raised when the request for an entity fails
+_ERRORS: Dict[str, Callable[[str], Exception]] = {
+    "player": lambda player: InvalidPlayer(
+        f"{player} is not a valid player or player id", player=player
+    ),
+    "team": lambda team: InvalidTeam(f"{team} is not a valid team", team=team),
+    "match": lambda match: InvalidMatch(
+        f"{match} is not a valid match", match=match
+    ),
+}
+
+
+E = TypeVar("E", bound="Endpoint")
+
+
+class Endpoint:
+    """
+    An endpoint for one or several primary attributes, e.g. the ids of
+    some players, shared by the blocking and ``asyncio`` endpoints.
+    Indexing it gives the endpoint of one primary attribute, which shares
+    the state named by :attr:`shared_attrs`
+
+    :attr shared_attrs: Tuple[str, ...]: The attributes passed on to the
+        endpoints created from this one
+    """
+
+    shared_attrs: Tuple[str, ...] = ()
+
+    def __init__(self, primary_attr: PrimaryAttribute) -> None:
+        """
+        :param primary_attr: The primary attribute of the endpoint
+        """
+        self._primary_attr = primary_attr
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__}({self._primary_attr!r})>"
+
+    def __len__(self) -> int:
+        if isinstance(self._primary_attr, str):
+            return 1
+        if isinstance(self._primary_attr, Sequence):
+            return len(self._primary_attr)
+        raise TypeError("Primary attribute is not a sequence or string")
+
+    def __getitem__(self: E, index: int) -> E:
+        if index >= len(self):
+            raise IndexError
+        if isinstance(self._primary_attr, str):
+            return self.__class__(
+                self._primary_attr, **self._endpoint_kwargs()
+            )
+        return self.__class__(
+            self._primary_attr[index], **self._endpoint_kwargs()
+        )
+
+    def _endpoint_kwargs(self) -> Dict[str, Any]:
+        """
+        Keyword arguments used to create a new endpoint which shares
+        the state of this one
+        """
+        return {name: getattr(self, name) for name in self.shared_attrs}
+
+
+class Request(NamedTuple):
+    """
+    A request for the AJAX payload of one entity
+
+    :attr path: str: The path of the request, e.g. ``getPlayerData/647``
+    :attr entity: str: One of ``league``, ``player``, ``team`` or ``match``
+    :attr key: str: The league, player id, team name or match id
+    """
+
+    path: str
+    entity: str
+    key: str
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        """The headers to send with the request"""
+        return dict(AJAX_HEADERS)
+
+    def url(self, base_url: str = BASE_URL) -> str:
+        """
+        The url of the request
+
+        :param base_url: The url of the server to send the request to
+        """
+        return base_url + self.path
+
+    def error(self) -> Optional[Exception]:
+        """
+        The error to raise when the server answers the request with an
+        error, ``None`` to raise the error of the HTTP library instead
+        """
+        make_error = _ERRORS.get(self.entity)
+        return make_error(self.key) if make_error is not None else None
+
+
+class Query(NamedTuple):
+    """
+    A request, and which section of its payload to return in which shape
+
+    :attr request: Request: The request to send
+    :attr section: str: The key of the payload to return, e.g. ``shots``
+    :attr record_type: Optional[type]: The record class describing each
+        row of the section, e.g. :class:`~understatapi.models.Shot`
+    :attr typed: bool: Return records instead of dictionaries
+    :attr format: Optional[str]: Return columns, see
+        :func:`~understatapi.columns.to_columns`
+    :attr shape: str: ``rows`` for a list of rows, ``mapping`` for a
+        dictionary returned as it is, ``sides`` for a list of rows for
+        each of the home and away sides and ``roster`` for a dictionary of
+        rows for each side
+    """
+
+    request: Request
+    section: str
+    record_type: Optional[type] = None
+    typed: bool = False
+    format: Optional[str] = None
+    shape: str = "rows"
+
+    def result(self, data: Dict[str, Any]) -> Any:
+        """
+        Read the section of a decoded payload
+
+        Records are built from ``data`` on every call, ``data`` itself is
+        left as it is so that it can stay in the cache
+
+        :param data: The payload of :attr:`request`
+        """
+        if self.shape == "rows":
+            return format_rows(
+                self.record_type,
+                data.get(self.section, []),
+                self.typed,
+                self.format,
+            )
+        section = data.get(self.section, {})
+        if not self.typed or self.shape == "mapping":
+            return section
+        record_type = cast(type, self.record_type)
+        if self.shape == "sides":
+            return {
+                side: to_records(record_type, rows)
+                for side, rows in section.items()
+            }
+        return {
+            side: dict(zip(roster, to_records(record_type, roster.values())))
+            for side, roster in section.items()
+        }
+
+
+def format_rows(
+    record_type: Optional[type],
+    rows: Any,
+    typed: bool = False,
+    format: Optional[str] = None,  # pylint: disable=redefined-builtin
+) -> Any:
+    """
+    Convert the rows of a response to the format asked for by the caller
+
+    :param record_type: The record class describing each row, e.g.
+        :class:`~understatapi.models.Shot`
+    :param rows: The dictionaries returned by understat
+    :param typed: Return records instead of dictionaries
+    :param format: Return columns, see
+        :func:`~understatapi.columns.to_columns`
+    """
+    if record_type is None:
+        return rows
+    if format is not None:
+        return to_columns(record_type, rows, format)
+    if typed:
+        return to_records(record_type, rows)
+    return rows
+
+
+def cache_key(path: str, params: Optional[Dict[str, Any]] = None) -> str:
+    """
+    The key under which an AJAX payload is cached
+
+    :param path: The path of the request, e.g. ``getPlayerData/647``
+    :param params: Query parameters sent with the request
+    """
+    if not params:
+        return path
+    return f"{path}?{urlencode(sorted(params.items()))}"
+
+
+def check_args(
+    league: Optional[str] = None,
+    season: Optional[str] = None,
+    leagues: Optional[Sequence[str]] = None,
+) -> None:
+    """
+    Handle invalid arguments
+
+    :param league: Name of a league
+    :param season: A season
+    :param leagues: The valid leagues, ``None`` for :data:`LEAGUES`
+    """
+    if leagues is None:
+        leagues = LEAGUES
+    if league is not None and league not in leagues:
+        raise InvalidLeague(f"{league}is not a valid league", league=league)
+    if season is not None and int(season) < FIRST_SEASON:
+        raise InvalidSeason(f"{season} is not a valid season", season=season)
+
+
+def _check_key(name: str, value: PrimaryAttribute) -> str:
+    if not isinstance(value, str):
+        raise TypeError(f"``{name}`` must be a string")
+    return value
+
+
+def league_request(
+    league: PrimaryAttribute,
+    season: str,
+    leagues: Optional[Sequence[str]] = None,
+) -> Request:
+    """
+    The request for the data of every team, player and fixture in a
+    league season
+
+    :param league: Name of the league
+    :param season: Season to get data for
+    :param leagues: The valid leagues, ``None`` for :data:`LEAGUES`
+    """
+    league = _check_key("league", league)
+    check_args(league=league, season=season, leagues=leagues)
+    return Request(f"getLeagueData/{league}/{season}", "league", league)
+
+
+def player_request(player: PrimaryAttribute) -> Request:
+    """
+    The request for a player's matches, shots and seasons
+
+    :param player: Id of the player
+    """
+    player = _check_key("player", player)
+    return Request(f"getPlayerData/{player}", "player", player)
+
+
+def team_request(team: PrimaryAttribute, season: str) -> Request:
+    """
+    The request for the fixtures, players and statistics of a team in a
+    season
+
+    :param team: Name of the team
+    :param season: Season to get data for
+    """
+    team = _check_key("team", team)
+    return Request(f"getTeamData/{team}/{season}", "team", team)
+
+
+def match_request(match: PrimaryAttribute) -> Request:
+    """
+    The request for the shots, rosters and information of a match
+
+    :param match: Id of the match
+    """
+    match = _check_key("match", match)
+    return Request(f"getMatchData/{match}", "match", match)
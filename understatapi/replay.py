@@ -0,0 +1,453 @@
+"""
+Record AJAX responses to disk and replay them, without touching understat.
+
+A :class:`RecordingStore` keeps one file per AJAX endpoint path, e.g.
+``<directory>/getLeagueData/EPL/2021.json``. :class:`RecordingAdapter`
+fills the store from real responses, or answers requests from it, and
+:class:`StandInServer` serves a store over HTTP with configurable latency,
+so that a client pointed at it with ``base_url`` behaves as it would
+against understat.com. Pass ``http2=True`` to serve HTTP/2 instead, see
+:class:`~understatapi.transport.HTTP2Transport`
+"""
+
+import io
+import os
+import random
+import socket
+import socketserver
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import TracebackType
+from typing import Any, Dict, Iterator, Optional, Type, cast
+from urllib.parse import quote, urlsplit
+import requests
+from requests.structures import CaseInsensitiveDict
+from .throttle import ThrottledHTTPAdapter
+
+try:
+    import h2.config
+    import h2.connection
+    import h2.events
+    import h2.exceptions
+except ImportError:  # pragma: no cover
+    h2 = None  # type: ignore[assignment]  # pylint: disable=invalid-name
+
+MODES = ("record", "replay", "auto")
+
+SUFFIX = ".json"
+
+
+class MissingRecording(requests.ConnectionError):
+    """A request was replayed, but has not been recorded"""
+
+
+class RecordingStore:
+    """
+    Store response bodies as files in a directory, keyed by the path of
+    the request. Safe to share between threads and processes.
+    """
+
+    def __init__(self, directory: str) -> None:
+        """
+        :param directory: The directory holding the recordings, created
+            when the first response is recorded
+        """
+        self.directory = directory
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__}({self.directory!r})>"
+
+    @staticmethod
+    def key(url: str) -> str:
+        """
+        Get the key of a request, its path and query relative to the root
+        of the server, e.g. ``getLeagueData/EPL/2021``
+
+        :param url: The url of the request, or its path
+        """
+        parts = urlsplit(url)
+        key = parts.path.lstrip("/")
+        if parts.query:
+            key += "?" + parts.query
+        return key
+
+    def filename(self, key: str) -> str:
+        """
+        Get the file a recording is kept in
+
+        :param key: The key of the request, see :meth:`key`
+        """
+        segments = key.split("/")
+        if any(segment in ("", ".", "..") for segment in segments):
+            raise ValueError(f"{key!r} is not a valid recording key")
+        safe = [quote(segment, safe="") for segment in segments]
+        return os.path.join(self.directory, *safe) + SUFFIX
+
+    def get(self, key: str) -> Optional[bytes]:
+        """
+        Read a recorded response body
+
+        :param key: The key of the request, see :meth:`key`
+        :return: The body, or ``None`` if it has not been recorded
+        """
+        try:
+            with open(self.filename(key), "rb") as fh:
+                return fh.read()
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def set(self, key: str, content: bytes) -> None:
+        """
+        Record a response body, replacing any previous recording
+
+        :param key: The key of the request, see :meth:`key`
+        :param content: The decompressed response body
+        """
+        filename = self.filename(key)
+        os.makedirs(os.path.dirname(filename), exist_ok=True)
+        tmp = f"{filename}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as fh:
+            fh.write(content)
+        os.replace(tmp, filename)
+
+    def keys(self) -> Iterator[str]:
+        """Yield the key of every recording"""
+        for root, _, files in os.walk(self.directory):
+            for name in sorted(files):
+                if not name.endswith(SUFFIX):
+                    continue
+                path = os.path.relpath(
+                    os.path.join(root, name), self.directory
+                )
+                yield path[: -len(SUFFIX)].replace(os.sep, "/")
+
+
+def build_response(
+    request: requests.PreparedRequest, content: bytes
+) -> requests.Response:
+    """Build a ``requests.Response`` from a recorded body"""
+    response = requests.Response()
+    response.status_code = 200
+    response.reason = "OK"
+    response.url = str(request.url)
+    response.request = request
+    response.headers = CaseInsensitiveDict(
+        {"Content-Type": "application/json"}
+    )
+    response.encoding = "utf-8"
+    # Set the body as both read and readable, so that the response can be
+    # streamed with ``iter_content()`` and closed like a real one
+    response.raw = io.BytesIO(content)
+    response._content = content  # pylint: disable=protected-access
+    setattr(response, "_content_consumed", True)
+    setattr(response, "from_recording", True)
+    return response
+
+
+class RecordingAdapter(ThrottledHTTPAdapter):
+    """
+    A ``requests`` transport adapter which records the bodies of
+    successful ``GET`` responses in a :class:`RecordingStore`, or answers
+    requests from it.
+
+    In ``record`` mode every request is sent and successful responses are
+    recorded. In ``replay`` mode no request is sent, and a
+    :class:`MissingRecording` error is raised for requests which were not
+    recorded. ``auto`` replays the requests which were recorded and
+    records the rest. Replayed responses have ``from_recording`` set to
+    ``True`` and do not count towards the rate limit.
+    """
+
+    def __init__(
+        self, store: RecordingStore, mode: str = "replay", **kwargs: Any
+    ) -> None:
+        """
+        :param store: Where to keep the recordings
+        :param mode: One of ``record``, ``replay`` or ``auto``
+        :param kwargs: Keyword arguments to pass to
+            :class:`~understatapi.throttle.ThrottledHTTPAdapter`
+        """
+        if mode not in MODES:
+            raise ValueError(
+                f"{mode} is not a valid mode, choose one of {MODES}"
+            )
+        super().__init__(**kwargs)
+        self.store = store
+        self.mode = mode
+
+    def send(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+        self,
+        request: requests.PreparedRequest,
+        stream: bool = False,
+        timeout: Any = None,
+        verify: Any = True,
+        cert: Any = None,
+        proxies: Any = None,
+    ) -> requests.Response:
+        """
+        Send a request, or answer it from the store.
+        See ``requests.adapters.HTTPAdapter.send()`` for the parameters.
+        """
+        kwargs: Dict[str, Any] = {
+            "stream": stream,
+            "timeout": timeout,
+            "verify": verify,
+            "cert": cert,
+            "proxies": proxies,
+        }
+        if request.method != "GET":
+            return super().send(request, **kwargs)
+        key = RecordingStore.key(str(request.url))
+        if self.mode != "record":
+            content = self.store.get(key)
+            if content is not None:
+                return build_response(request, content)
+            if self.mode == "replay":
+                raise MissingRecording(
+                    f"{request.url} has not been recorded in "
+                    f"{self.store.directory}",
+                    request=request,
+                )
+        response = super().send(request, **kwargs)
+        if response.status_code == 200:
+            self.store.set(key, response.content)
+        return response
+
+
+class _StandInHandler(BaseHTTPRequestHandler):
+    """Answer requests from the recordings of a :class:`StandInServer`"""
+
+    server: "_StandInHTTPServer"
+    # Keep connections open between requests, as understat.com does
+    protocol_version = "HTTP/1.1"
+    # Send the headers and body without waiting for the client's ACK
+    disable_nagle_algorithm = True
+
+    def do_GET(self) -> None:  # pylint: disable=invalid-name
+        """Serve a recording, after the server's latency"""
+        stand_in = self.server.stand_in
+        stand_in.wait()
+        content = stand_in.store.get(RecordingStore.key(self.path))
+        if content is None:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(
+        self, *args: Any
+    ) -> None:  # pylint: disable=arguments-differ
+        """Do not log requests"""
+
+
+class _StandInHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    stand_in: "StandInServer"
+
+
+class _H2StandInHandler(socketserver.BaseRequestHandler):
+    """
+    Answer HTTP/2 requests, sent with prior knowledge, from the recordings
+    of a :class:`StandInServer`. Each stream is answered in its own
+    thread, so streams on one connection wait for their latency at once
+    """
+
+    server: "_H2StandInServer"
+
+    def setup(self) -> None:
+        self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, True)
+        self.connection = h2.connection.H2Connection(
+            config=h2.config.H2Configuration(
+                client_side=False, header_encoding="utf-8"
+            )
+        )
+        self.lock = threading.Lock()
+        # Bodies waiting for the client to open its flow control window
+        self.pending: Dict[int, bytes] = {}
+
+    def handle(self) -> None:
+        with self.lock:
+            self.connection.initiate_connection()
+            self._send()
+        while True:
+            try:
+                data = self.request.recv(1 << 16)
+            except OSError:
+                return
+            if not data:
+                return
+            with self.lock:
+                for event in self.connection.receive_data(data):
+                    if isinstance(event, h2.events.RequestReceived):
+                        headers = cast(Dict[str, str], dict(event.headers))
+                        threading.Thread(
+                            target=self._respond,
+                            args=(event.stream_id, headers[":path"]),
+                            daemon=True,
+                        ).start()
+                    elif isinstance(event, h2.events.WindowUpdated):
+                        for stream_id in list(self.pending):
+                            self._flush(stream_id)
+                    elif isinstance(event, h2.events.StreamReset):
+                        self.pending.pop(event.stream_id, None)
+                self._send()
+
+    def _send(self) -> None:
+        """Write the frames h2 has queued to the socket"""
+        data = self.connection.data_to_send()
+        if data:
+            self.request.sendall(data)
+
+    def _flush(self, stream_id: int) -> None:
+        """Send as much of a pending body as the flow control window allows"""
+        content = self.pending.pop(stream_id)
+        frame_size = self.connection.max_outbound_frame_size
+        while content:
+            window = self.connection.local_flow_control_window(stream_id)
+            if window <= 0:
+                self.pending[stream_id] = content
+                return
+            chunk = content[: min(window, frame_size)]
+            content = content[len(chunk) :]
+            self.connection.send_data(stream_id, chunk, end_stream=not content)
+
+    def _respond(self, stream_id: int, path: str) -> None:
+        """Serve a recording on a stream, after the server's latency"""
+        stand_in = self.server.stand_in
+        stand_in.wait()
+        content = stand_in.store.get(RecordingStore.key(path))
+        status = "404" if content is None else "200"
+        content = content or b""
+        headers = [
+            (":status", status),
+            ("content-type", "application/json"),
+            ("content-length", str(len(content))),
+        ]
+        try:
+            with self.lock:
+                self.connection.send_headers(
+                    stream_id, headers, end_stream=not content
+                )
+                if content:
+                    self.pending[stream_id] = content
+                    self._flush(stream_id)
+                self._send()
+        except (OSError, h2.exceptions.ProtocolError):
+            # The client has gone away
+            pass
+
+
+class _H2StandInServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+    stand_in: "StandInServer"
+
+
+class StandInServer:
+    """
+    A local HTTP server which serves the recordings in a
+    :class:`RecordingStore`, standing in for understat.com. Each request
+    is answered in its own thread, after a delay of ``latency`` seconds
+    plus up to ``jitter`` seconds more, and requests which were not
+    recorded get a ``404``. With ``http2=True`` the server speaks HTTP/2
+    without TLS, which clients must use with prior knowledge, and
+    requires ``h2``, install it with ``pip install understatapi[http2]``
+
+    :Example:
+
+    .. code-block::
+
+        from understatapi import UnderstatClient
+        from understatapi.replay import StandInServer
+
+        with StandInServer("recordings", latency=0.05) as server:
+            with UnderstatClient(base_url=server.url) as understat:
+                league = understat.league("EPL")
+                players = league.get_player_data(season="2021")
+
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+        self,
+        directory: str,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        http2: bool = False,
+    ) -> None:
+        """
+        :param directory: The directory holding the recordings
+        :param latency: Seconds to wait before answering each request
+        :param jitter: Maximum number of seconds to add to ``latency``,
+            chosen at random for each request
+        :param host: The address to listen on
+        :param port: The port to listen on, ``0`` to pick a free port
+        :param http2: Serve HTTP/2 rather than HTTP/1.1
+        """
+        if latency < 0 or jitter < 0:
+            raise ValueError("``latency`` and ``jitter`` must be non-negative")
+        if http2 and h2 is None:  # pragma: no cover
+            raise ImportError(
+                "Serving HTTP/2 requires h2, install it with "
+                "``pip install understatapi[http2]``"
+            )
+        self.store = RecordingStore(directory)
+        self.latency = latency
+        self.jitter = jitter
+        self._server: socketserver.TCPServer
+        if http2:
+            self._server = _H2StandInServer((host, port), _H2StandInHandler)
+        else:
+            self._server = _StandInHTTPServer((host, port), _StandInHandler)
+        self._server.stand_in = self  # type: ignore[attr-defined]
+        self._thread: Optional[threading.Thread] = None
+
+    def __repr__(self) -> str:
+        return (
+            f"<{self.__class__.__name__}({self.store.directory!r}, "
+            f"url={self.url!r})>"
+        )
+
+    def __enter__(self) -> "StandInServer":
+        self.start()
+        return self
+
+    def __exit__(
+        self,
+        exception_type: Optional[Type[BaseException]],
+        exception_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        self.stop()
+
+    @property
+    def url(self) -> str:
+        """The base url of the server, to pass to the client as ``base_url``"""
+        host, port = self._server.server_address[:2]
+        return f"http://{host!s}:{port}/"
+
+    def wait(self) -> None:
+        """Sleep for the latency of one request"""
+        delay = self.latency + random.uniform(0, self.jitter)
+        if delay:
+            time.sleep(delay)
+
+    def start(self) -> None:
+        """Start serving in a background thread"""
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop serving and close the socket"""
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._server.server_close()
@@ -0,0 +1,81 @@
+"""A ``requests.Session`` which can be shared between threads"""
+
+import threading
+from typing import Any
+import requests
+
+# Settings copied from the pool to the session of each thread before each
+# request
+_SESSION_ATTRS = (
+    "auth",
+    "proxies",
+    "params",
+    "stream",
+    "verify",
+    "cert",
+    "max_redirects",
+    "trust_env",
+)
+
+
+class SessionPool(requests.Session):
+    """
+    A drop-in replacement for ``requests.Session`` which is safe to use
+    from several threads at once.
+
+    ``requests.Session`` is not documented as thread-safe, so every thread
+    which sends a request through the pool gets a session of its own,
+    created on first use. The sessions share the pool's transport
+    adapters, so the ``urllib3`` connection pools behind them, which are
+    thread-safe, are reused by every thread. They also share the pool's
+    cookie jar, which has its own lock, and its headers and hooks. Other
+    settings, e.g. ``verify``, are copied from the pool before each
+    request, so headers, settings and adapters can all be changed after
+    the pool has been used.
+
+    :Example:
+
+    .. code-block::
+
+        from concurrent.futures import ThreadPoolExecutor
+        from understatapi import UnderstatClient
+
+        understat = UnderstatClient()
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            shots = list(
+                executor.map(
+                    lambda match_id: understat.match(match_id).get_shot_data(),
+                    ["14711", "14712", "14713"],
+                )
+            )
+
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._local = threading.local()
+
+    def _thread_session(self) -> requests.Session:
+        """Get the session of the calling thread, creating it if needed"""
+        session = getattr(self._local, "session", None)
+        if session is not None:
+            return session
+        session = requests.Session()
+        session.adapters = self.adapters
+        session.cookies = self.cookies
+        session.headers = self.headers
+        session.hooks = self.hooks
+        self._local.session = session
+        return session
+
+    def request(  # type: ignore[override]
+        self, method: str, url: str, *args: Any, **kwargs: Any
+    ) -> requests.Response:
+        """
+        Send a request with the calling thread's session.
+        See ``requests.Session.request()`` for the parameters.
+        """
+        session = self._thread_session()
+        for attr in _SESSION_ATTRS:
+            setattr(session, attr, getattr(self, attr))
+        return session.request(method, url, *args, **kwargs)
@@ -0,0 +1,250 @@
+"""
+Incremental parsing of AJAX responses, for reading one section of a large
+document without holding the rest of it in memory.
+
+:func:`iter_section` uses `ijson <https://pypi.org/project/ijson/>`_ if it
+is installed, and otherwise falls back to a pure Python scanner which
+decodes one item at a time with the standard library ``json`` module and
+skips over the sections which were not asked for. Both return the same
+values as ``json.loads()``: integers are ``int`` and every other number is
+a ``float``
+"""
+
+import codecs
+from decimal import Decimal
+import json
+import re
+from typing import Any, Iterable, Iterator
+
+try:
+    import ijson
+except ImportError:  # pragma: no cover
+    ijson = None  # type: ignore[assignment]
+
+BACKENDS = ("auto", "ijson", "python")
+
+_STRUCTURE = re.compile(r'[{}\[\]"]')
+_STRING_END = re.compile(r'["\\]')
+_WHITESPACE = " \t\r\n"
+# Text which has been parsed is dropped from the buffer once there is at
+# least this much of it
+_COMPACT_SIZE = 1 << 16
+
+
+class _ChunkReader:
+    """A read-only file-like object over an iterable of ``bytes``"""
+
+    def __init__(self, chunks: Iterable[bytes]) -> None:
+        self._chunks = iter(chunks)
+        self._buffer = b""
+
+    def read(self, size: int = -1) -> bytes:
+        """
+        Read up to ``size`` bytes, or everything which is left if ``size``
+        is negative
+        """
+        while size < 0 or len(self._buffer) < size:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                break
+            self._buffer += chunk
+        if size < 0:
+            size = len(self._buffer)
+        data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
+
+class _Scanner:
+    """Walk through a JSON document which arrives in chunks"""
+
+    def __init__(self, chunks: Iterable[bytes]) -> None:
+        self._chunks = iter(chunks)
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self._decoder = json.JSONDecoder()
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self) -> bool:
+        """Read the next chunk into the buffer, return False at the end"""
+        for chunk in self._chunks:
+            text = self._utf8.decode(chunk)
+            if text:
+                self.buf += text
+                return True
+        self.buf += self._utf8.decode(b"", final=True)
+        self.eof = True
+        return False
+
+    def _compact(self) -> None:
+        if self.pos >= _COMPACT_SIZE:
+            self.buf = self.buf[self.pos :]
+            self.pos = 0
+
+    def _unexpected_end(self) -> ValueError:
+        return ValueError("Unexpected end of JSON document")
+
+    def peek(self) -> str:
+        """Get the next non-whitespace character, or ``""`` at the end"""
+        self._compact()
+        while True:
+            while (
+                self.pos < len(self.buf) and self.buf[self.pos] in _WHITESPACE
+            ):
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if self.eof or not self._fill():
+                return ""
+
+    def expect(self, char: str) -> None:
+        """Consume ``char``, which must be the next non-whitespace character"""
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Expected {char!r} but found {found!r}")
+        self.pos += 1
+
+    def value(self) -> Any:
+        """Decode the next value"""
+        self.peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if self.eof or not self._fill():
+                    raise
+                continue
+            # A number is only complete once the character after it has
+            # arrived, and is not part of a fraction or exponent
+            if (
+                isinstance(value, (int, float))
+                and self.buf[end : end + 1] in ("", ".", "e", "E")
+                and not self.eof
+                and self._fill()
+            ):
+                continue
+            self.pos = end
+            return value
+
+    def _skip_string(self) -> None:
+        """Move past the end of a string whose opening quote was consumed"""
+        while True:
+            match = _STRING_END.search(self.buf, self.pos)
+            if match is None:
+                self.pos = len(self.buf)
+            elif match.group() == '"':
+                self.pos = match.end()
+                return
+            elif match.end() < len(self.buf):
+                self.pos = match.end() + 1
+                continue
+            else:
+                self.pos = match.start()
+            self._compact()
+            if self.eof or not self._fill():
+                raise self._unexpected_end()
+
+    def skip(self) -> None:
+        """Move past the next value without decoding it"""
+        if self.peek() not in ("{", "["):
+            self.value()
+            return
+        depth = 0
+        while True:
+            match = _STRUCTURE.search(self.buf, self.pos)
+            if match is None:
+                self.pos = len(self.buf)
+                self._compact()
+                if self.eof or not self._fill():
+                    raise self._unexpected_end()
+                continue
+            self.pos = match.end()
+            token = match.group()
+            if token == '"':
+                self._skip_string()
+            elif token in "{[":
+                depth += 1
+            else:
+                depth -= 1
+                if depth == 0:
+                    return
+
+    def array_items(self) -> Iterator[Any]:
+        """Decode the items of the next value, which must be an array"""
+        self.expect("[")
+        while self.peek() != "]":
+            yield self.value()
+            if self.peek() == ",":
+                self.pos += 1
+        self.pos += 1
+
+
+def _iter_section_python(chunks: Iterable[bytes], key: str) -> Iterator[Any]:
+    scanner = _Scanner(chunks)
+    scanner.expect("{")
+    while scanner.peek() != "}":
+        name = scanner.value()
+        scanner.expect(":")
+        if name == key:
+            yield from scanner.array_items()
+            return
+        scanner.skip()
+        if scanner.peek() == ",":
+            scanner.pos += 1
+
+
+def _to_float(value: Any) -> Any:
+    """Replace the ``Decimal`` numbers decoded by ijson with floats"""
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, dict):
+        return {name: _to_float(item) for name, item in value.items()}
+    if isinstance(value, list):
+        return [_to_float(item) for item in value]
+    return value
+
+
+def _iter_section_ijson(chunks: Iterable[bytes], key: str) -> Iterator[Any]:
+    # ``use_float=True`` makes the C backend reject integers which do not
+    # fit in 64 bits and floats which overflow, so numbers are decoded as
+    # ``Decimal`` and converted the way ``json.loads()`` converts them
+    for item in ijson.items(_ChunkReader(chunks), f"{key}.item"):
+        yield _to_float(item)
+
+
+def iter_section(
+    chunks: Iterable[bytes], key: str, backend: str = "auto"
+) -> Iterator[Any]:
+    """
+    Yield the items of one array in a JSON object, parsing the document as
+    it arrives
+
+    :Example:
+
+    .. doctest::
+
+        >>> from understatapi.streaming import iter_section
+        >>> chunks = [b'{"teams": {"1": {}}, "play', b'ers": [{"id": 1}, 2]}']
+        >>> list(iter_section(chunks, "players", backend="python"))
+        [{'id': 1}, 2]
+
+    :param chunks: The body of the response, e.g.
+        ``requests.Response.iter_content()``
+    :param key: The key of the array in the top level object
+    :param backend: ``ijson``, ``python``, or ``auto`` to use ``ijson``
+        if it is installed
+    """
+    if backend not in BACKENDS:
+        raise ValueError(
+            f"{backend} is not a valid backend, choose one of {BACKENDS}"
+        )
+    if backend == "auto":
+        backend = "python" if ijson is None else "ijson"
+    if backend == "ijson":
+        if ijson is None:
+            raise ImportError(
+                "The ijson backend requires ijson, install it with "
+                "``pip install understatapi[streaming]``"
+            )
+        return _iter_section_ijson(chunks, key)
+    return _iter_section_python(chunks, key)
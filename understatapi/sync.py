@@ -0,0 +1,229 @@
+"""
+Incremental syncing of league seasons.
+
+:func:`sync` keeps the ids of the matches it has synced in every league
+season, in a small JSON file. Each time it runs, it requests the fixture
+list of each season and fetches match data only for the fixtures which
+have finished and have not been synced. Seasons whose fixtures have all
+been synced are skipped without making any requests
+"""
+
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import (
+    Dict,
+    List,
+    Set,
+    Any,
+    Iterable,
+    NamedTuple,
+    Union,
+    cast,
+    TYPE_CHECKING,
+)
+from .endpoints.base import BATCH_ERRORS
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .api import UnderstatClient
+
+
+class SyncResult(NamedTuple):
+    """
+    The outcome of a sync
+
+    :attr matches: The data for each newly finished match, keyed by match
+        id, with keys ``tmpl``, ``shots`` and ``rosters``
+    :attr new: The ids of the newly finished matches in each league season,
+        keyed by ``<league>/<season>``
+    :attr skipped: The league seasons which were already complete
+    :attr errors: Errors keyed by the league season, or match, they
+        occurred for
+    """
+
+    matches: Dict[str, Dict[str, Any]]
+    new: Dict[str, List[str]]
+    skipped: List[str]
+    errors: Dict[str, Exception]
+
+
+class SyncState:
+    """
+    The ids of the synced matches of each league season, stored in a
+    JSON file. Matches are tracked by id, so that matches which finish
+    out of order, e.g. after being postponed, are not missed
+
+    :param path: Path of the JSON file. It is created on the first
+        :meth:`save` if it does not exist
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._seasons: Dict[str, Dict[str, Any]] = {}
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as fh:
+                self._seasons = json.load(fh)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.path!r})"
+
+    @staticmethod
+    def key(league: str, season: str) -> str:
+        """Key of a league season"""
+        return f"{league}/{season}"
+
+    def synced(self, league: str, season: str) -> Set[str]:
+        """Get the ids of the synced matches in a league season"""
+        return set(
+            self._seasons.get(self.key(league, season), {}).get("synced", [])
+        )
+
+    def is_complete(self, league: str, season: str) -> bool:
+        """Whether every fixture in a league season has been synced"""
+        return self._seasons.get(self.key(league, season), {}).get(
+            "complete", False
+        )
+
+    def update(
+        self,
+        league: str,
+        season: str,
+        fixtures: Iterable[Dict[str, Any]],
+        complete: bool = False,
+    ) -> None:
+        """
+        Record that matches have been synced
+
+        :param league: Name of the league
+        :param season: The season
+        :param fixtures: The fixtures which have been synced, as returned
+            by ``LeagueEndpoint.get_match_data()``
+        :param complete: Whether every fixture in the season has now been
+            synced
+        """
+        with self._lock:
+            state = self._seasons.setdefault(
+                self.key(league, season), {"synced": []}
+            )
+            synced = set(state["synced"])
+            synced.update(str(fixture["id"]) for fixture in fixtures)
+            state["synced"] = sorted(synced)
+            state["complete"] = complete
+
+    def save(self) -> None:
+        """Write the state to its file, replacing it atomically"""
+        with self._lock:
+            tmp = self.path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as fh:
+                json.dump(self._seasons, fh, indent=1, sort_keys=True)
+            os.replace(tmp, self.path)
+
+
+def new_results(
+    fixtures: Iterable[Dict[str, Any]], synced: Set[str]
+) -> List[Dict[str, Any]]:
+    """
+    Get the fixtures which have finished but have not been synced
+
+    :param fixtures: The fixtures of a league season
+    :param synced: The ids of the matches which have already been synced
+    """
+    return [
+        fixture
+        for fixture in fixtures
+        if fixture["isResult"] and str(fixture["id"]) not in synced
+    ]
+
+
+def _match_data(understat: "UnderstatClient", match_id: str) -> Dict[str, Any]:
+    """
+    Get all the data for a match, which is a single request if the client
+    has a cache
+    """
+    match = understat.match(match_id)
+    return {
+        "tmpl": match.get_match_info(),
+        "shots": match.get_shot_data(),
+        "rosters": match.get_roster_data(),
+    }
+
+
+def _sync_season(  # pylint: disable=too-many-arguments,too-many-positional-arguments,too-many-locals
+    understat: "UnderstatClient",
+    league: str,
+    season: str,
+    state: SyncState,
+    executor: ThreadPoolExecutor,
+    result: SyncResult,
+) -> None:
+    """Sync one league season, recording the outcome in ``result``"""
+    key = state.key(league, season)
+    if state.is_complete(league, season):
+        result.skipped.append(key)
+        return
+    try:
+        fixtures = cast(
+            List[Dict[str, Any]],
+            understat.league(league).get_match_data(season),
+        )
+    except BATCH_ERRORS as err:
+        result.errors[key] = err
+        return
+    pending = new_results(fixtures, state.synced(league, season))
+    futures = [
+        (fixture, executor.submit(_match_data, understat, str(fixture["id"])))
+        for fixture in pending
+    ]
+    synced = []
+    for fixture, future in futures:
+        match_id = str(fixture["id"])
+        try:
+            result.matches[match_id] = future.result()
+        except BATCH_ERRORS as err:
+            result.errors[f"{key}/{match_id}"] = err
+            continue
+        synced.append(fixture)
+    result.new[key] = [str(fixture["id"]) for fixture in synced]
+    complete = len(synced) == len(pending) and all(
+        fixture["isResult"] for fixture in fixtures
+    )
+    state.update(league, season, synced, complete=complete)
+
+
+def sync(  # pylint: disable=too-many-arguments
+    understat: "UnderstatClient",
+    leagues: Union[str, Iterable[str]],
+    seasons: Union[str, Iterable[str]],
+    state: Union[str, SyncState],
+    max_workers: int = 8,
+) -> SyncResult:
+    """
+    Fetch the data for every match which has finished since the last sync.
+    The state is saved after every league season, so an interrupted sync
+    loses no progress, and matches which could not be fetched are tried
+    again on the next sync
+
+    :param understat: The client to make requests with
+    :param leagues: Name of the league(s) to sync
+    :param seasons: The season(s) to sync
+    :param state: A :class:`SyncState`, or the path of its JSON file
+    :param max_workers: The number of matches to fetch concurrently
+    """
+    if isinstance(state, str):
+        state = SyncState(state)
+    if isinstance(leagues, str):
+        leagues = [leagues]
+    if isinstance(seasons, str):
+        seasons = [seasons]
+    seasons = [str(season) for season in seasons]
+    result = SyncResult(matches={}, new={}, skipped=[], errors={})
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for league in leagues:
+            for season in seasons:
+                _sync_season(
+                    understat, league, season, state, executor, result
+                )
+                state.save()
+    return result
@@ -0,0 +1,358 @@
+"""Client-side rate limiting and retries"""
+
+import email.utils
+import random
+import threading
+import time
+from typing import Any, Collection, Optional
+import requests
+from requests.adapters import HTTPAdapter
+from .metrics import Hooks, RetryEvent
+
+
+class RateLimiter:  # pylint: disable=too-many-instance-attributes
+    """
+    A thread-safe token bucket which limits the rate at which requests
+    are sent.
+
+    When ``adaptive`` is set the rate is halved every time the server
+    replies with ``429 Too Many Requests``, and then recovers gradually
+    towards the configured rate as requests succeed.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: Optional[float] = None,
+        adaptive: bool = False,
+        min_rate: float = 0.1,
+    ) -> None:
+        """
+        :param rate: Maximum number of requests per second
+        :param burst: Maximum number of requests which can be sent at
+            once after a quiet period, defaults to ``max(rate, 1)``
+        :param adaptive: Whether to adapt the rate to ``429`` responses
+        :param min_rate: The rate below which an adaptive limiter
+            will not go
+        """
+        if rate <= 0:
+            raise ValueError("``rate`` must be positive")
+        self.max_rate = rate
+        self.rate = rate
+        self.capacity = burst if burst is not None else max(rate, 1.0)
+        self.adaptive = adaptive
+        self.min_rate = min(min_rate, rate)
+        self._tokens = self.capacity
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        return (
+            f"<{self.__class__.__name__}(rate={self.rate}, "
+            f"capacity={self.capacity})>"
+        )
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        elapsed = now - self._updated_at
+        self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+        self._updated_at = now
+
+    def try_acquire(self) -> float:
+        """
+        Take a token if one is available, without blocking
+
+        :return: ``0`` if a request may be sent, otherwise the number of
+            seconds to wait before trying again
+        """
+        with self._lock:
+            self._refill()
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self.rate
+
+    def acquire(self) -> float:
+        """
+        Block until a request may be sent
+
+        :return: The number of seconds spent waiting
+        """
+        waited = 0.0
+        while True:
+            delay = self.try_acquire()
+            if not delay:
+                return waited
+            time.sleep(delay)
+            waited += delay
+
+    def observe(self, status_code: int) -> None:
+        """
+        Adapt the rate to the status code of a response
+
+        :param status_code: The status code of the response
+        """
+        if status_code == 429:
+            self.backoff()
+        elif status_code < 400:
+            self.recover()
+
+    def backoff(self) -> None:
+        """Halve the rate after the server has throttled a request"""
+        if not self.adaptive:
+            return
+        with self._lock:
+            self._refill()
+            self.rate = max(self.min_rate, self.rate / 2)
+            self._tokens = min(self._tokens, 0.0)
+
+    def recover(self) -> None:
+        """Increase the rate after a request has succeeded"""
+        if not self.adaptive or self.rate >= self.max_rate:
+            return
+        with self._lock:
+            self._refill()
+            self.rate = min(self.max_rate, self.rate + 0.05 * self.max_rate)
+
+
+class RetryPolicy:
+    """
+    Decide whether, and after how long, a failed request is retried.
+
+    Waits grow exponentially with the number of attempts, with "full
+    jitter" so that many clients do not retry in lockstep, and are never
+    shorter than the server's ``Retry-After`` header
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+        self,
+        max_retries: int = 3,
+        backoff_factor: float = 0.5,
+        max_backoff: float = 60.0,
+        jitter: bool = True,
+        status_forcelist: Collection[int] = (429, 500, 502, 503, 504),
+        respect_retry_after: bool = True,
+        deadline: Optional[float] = None,
+    ) -> None:
+        """
+        :param max_retries: Maximum number of times to retry a request
+        :param backoff_factor: The wait before the first retry, doubled
+            for every subsequent retry
+        :param max_backoff: The longest time to wait between attempts
+        :param jitter: Whether to randomise the waits
+        :param status_forcelist: Status codes which should be retried
+        :param respect_retry_after: Whether to honour ``Retry-After``
+        :param deadline: Maximum number of seconds to spend on a request,
+            including every attempt and wait, ``None`` for no limit
+        """
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.status_forcelist = frozenset(status_forcelist)
+        self.respect_retry_after = respect_retry_after
+        self.deadline = deadline
+
+    def __repr__(self) -> str:
+        return (
+            f"<{self.__class__.__name__}(max_retries={self.max_retries}, "
+            f"deadline={self.deadline})>"
+        )
+
+    def should_retry(self, attempt: int, status_code: Optional[int]) -> bool:
+        """
+        Whether to retry after a failed attempt
+
+        :param attempt: The number of retries already made
+        :param status_code: The status code of the response, ``None`` if
+            the request failed to connect or timed out
+        """
+        if attempt >= self.max_retries:
+            return False
+        return status_code is None or status_code in self.status_forcelist
+
+    def get_backoff(
+        self, attempt: int, response: Optional[Any] = None
+    ) -> float:
+        """
+        The number of seconds to wait before the next attempt
+
+        :param attempt: The number of retries already made
+        :param response: The response to the failed attempt, if any, from
+            ``requests`` or ``httpx``
+        """
+        delay = min(self.max_backoff, self.backoff_factor * 2**attempt)
+        if self.jitter:
+            delay = random.uniform(0, delay)
+        if self.respect_retry_after and response is not None:
+            retry_after = parse_retry_after(
+                response.headers.get("Retry-After")
+            )
+            if retry_after is not None:
+                delay = max(delay, min(retry_after, self.max_backoff))
+        return delay
+
+
+class RetryState:
+    """
+    The attempts made at one request, shared by the blocking and
+    ``asyncio`` senders. It decides whether a failed attempt is retried,
+    and how long each attempt may take, so that every attempt and wait
+    ends by the policy's deadline
+
+    :attr attempt: int: The number of retries already made
+    """
+
+    def __init__(self, policy: Optional[RetryPolicy]) -> None:
+        """
+        :param policy: Decides which requests to retry, ``None`` to
+            never retry
+        """
+        self.policy = policy
+        self.attempt = 0
+        self.deadline: Optional[float] = None
+        if policy is not None and policy.deadline is not None:
+            self.deadline = time.monotonic() + policy.deadline
+
+    def timeout(self, timeout: Any) -> Any:
+        """
+        Shorten the timeout of an attempt so that it ends by the deadline
+
+        :param timeout: The timeout asked for by the caller
+        """
+        if self.deadline is None:
+            return timeout
+        remaining = max(self.deadline - time.monotonic(), 0.001)
+        if isinstance(timeout, (int, float)) and timeout <= remaining:
+            return timeout
+        return remaining
+
+    def backoff(self, response: Optional[Any] = None) -> Optional[float]:
+        """
+        The number of seconds to wait before retrying a failed attempt
+
+        :param response: The response to the attempt, from ``requests``
+            or ``httpx``, ``None`` if it failed to connect or timed out
+        :return: The wait, or ``None`` if the attempt should not be
+            retried
+        """
+        if self.policy is None:
+            return None
+        status_code = None if response is None else response.status_code
+        if not self.policy.should_retry(self.attempt, status_code):
+            return None
+        delay = self.policy.get_backoff(self.attempt, response)
+        if (
+            self.deadline is not None
+            and time.monotonic() + delay > self.deadline
+        ):
+            return None
+        return delay
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Parse a ``Retry-After`` header, given in seconds or as a HTTP date
+
+    :param value: The value of the header
+    :return: The number of seconds to wait, or ``None`` if the header is
+        missing or invalid
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+class ThrottledHTTPAdapter(HTTPAdapter):
+    """
+    A ``requests`` transport adapter which waits for a
+    :class:`RateLimiter` before sending each request, and retries failed
+    requests according to a :class:`RetryPolicy`.
+
+    If every attempt fails, the last response is returned, or the last
+    connection error is raised, so that callers see the same errors as
+    they would without retries
+    """
+
+    def __init__(
+        self,
+        rate_limiter: Optional[RateLimiter] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        hooks: Optional[Hooks] = None,
+        **kwargs: Any,
+    ) -> None:
+        """
+        :param rate_limiter: Limits the rate of requests, ``None`` for
+            no limit
+        :param retry_policy: Decides which requests to retry, ``None``
+            to never retry
+        :param hooks: Functions to call before a request is retried, see
+            :mod:`~understatapi.metrics`
+        :param kwargs: Keyword arguments to pass to
+            ``requests.adapters.HTTPAdapter``
+        """
+        super().__init__(**kwargs)
+        self.rate_limiter = rate_limiter
+        self.retry_policy = retry_policy
+        self.hooks = hooks
+
+    def send(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+        self,
+        request: requests.PreparedRequest,
+        stream: bool = False,
+        timeout: Any = None,
+        verify: Any = True,
+        cert: Any = None,
+        proxies: Any = None,
+    ) -> requests.Response:
+        """
+        Send a request, respecting the rate limit and retry policy.
+        See ``requests.adapters.HTTPAdapter.send()`` for the parameters.
+        """
+        retry = RetryState(self.retry_policy)
+        while True:
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire()
+            try:
+                response = super().send(
+                    request,
+                    stream=stream,
+                    timeout=retry.timeout(timeout),
+                    verify=verify,
+                    cert=cert,
+                    proxies=proxies,
+                )
+            except (requests.ConnectionError, requests.Timeout):
+                delay = retry.backoff()
+                if delay is None:
+                    raise
+                status_code = None
+            else:
+                self._update_rate_limiter(response)
+                delay = retry.backoff(response)
+                if delay is None:
+                    return response
+                response.close()
+                status_code = response.status_code
+            if self.hooks is not None:
+                self.hooks.emit(
+                    "retry",
+                    RetryEvent(
+                        str(request.url), retry.attempt, status_code, delay
+                    ),
+                )
+            time.sleep(delay)
+            retry.attempt += 1
+
+    def _update_rate_limiter(self, response: requests.Response) -> None:
+        """Adapt the rate limit to the server's response"""
+        if self.rate_limiter is not None:
+            self.rate_limiter.observe(response.status_code)
@@ -0,0 +1,307 @@
+"""
+Transports, which send the ``GET`` requests made by the endpoints.
+
+Endpoints only call :meth:`Transport.get`, so where the bytes come from
+can be swapped without patching anything. :class:`RequestsTransport`
+sends requests with a ``requests`` session, and :class:`CachedTransport`
+and :class:`ReplayTransport` add the persistent HTTP cache and the
+record/replay store on top of it. :class:`HTTP2Transport` sends
+requests over HTTP/2 with ``httpx``. :class:`MemoryTransport` answers
+requests from payloads held in memory, which makes it useful in tests
+and for measuring everything but the network.
+
+:Example:
+
+.. code-block::
+
+    from understatapi import UnderstatClient
+    from understatapi.transport import CachedTransport
+
+    transport = CachedTransport("understat.sqlite")
+    with UnderstatClient(transport=transport) as understat:
+        players = understat.league("EPL").get_player_data(season="2021")
+
+"""
+
+import io
+import threading
+from types import TracebackType
+from typing import Any, Dict, Mapping, Optional, Type, Union
+import requests
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+from .cache import CachePolicy
+from .http_cache import CachingHTTPAdapter, SQLiteCacheStore
+from .protocol import BASE_URL
+from .replay import RecordingAdapter, RecordingStore
+from .session import SessionPool
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover
+    httpx = None  # type: ignore[assignment]
+
+
+class Transport:
+    """
+    Sends the ``GET`` requests made by the endpoints. Subclasses
+    implement :meth:`get`, and :meth:`close` if they hold resources
+    """
+
+    def __enter__(self) -> "Transport":
+        return self
+
+    def __exit__(
+        self,
+        exception_type: Optional[Type[BaseException]],
+        exception_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        self.close()
+
+    def get(self, url: str, **kwargs: Any) -> requests.Response:
+        """
+        Send a ``GET`` request
+
+        :param url: The url to request
+        :param kwargs: Keyword arguments accepted by ``requests.get()``,
+            e.g. ``headers``, ``params``, ``stream`` or ``timeout``
+        :return: The response, which has not been checked for errors
+        """
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """Release the resources held by the transport"""
+
+
+class RequestsTransport(Transport):
+    """
+    Send requests with a ``requests`` session, by default a
+    :class:`~understatapi.session.SessionPool` which is safe to share
+    between threads
+
+    :attr session: requests.Session: The session requests are sent with
+    """
+
+    def __init__(
+        self,
+        session: Optional[requests.Session] = None,
+        adapter: Optional[BaseAdapter] = None,
+        base_url: str = BASE_URL,
+    ) -> None:
+        """
+        :param session: The session to send requests with, ``None`` to
+            create a :class:`~understatapi.session.SessionPool`
+        :param adapter: A transport adapter to mount for ``base_url``,
+            e.g. a :class:`~understatapi.throttle.ThrottledHTTPAdapter`
+        :param base_url: The url the adapter is mounted for
+        """
+        self.session = session if session is not None else SessionPool()
+        if adapter is not None:
+            self.session.mount(base_url, adapter)
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__}({self.session!r})>"
+
+    def get(self, url: str, **kwargs: Any) -> requests.Response:
+        return self.session.get(url, **kwargs)
+
+    def close(self) -> None:
+        self.session.close()
+
+
+class CachedTransport(RequestsTransport):
+    """
+    Send requests with a ``requests`` session, answering them from a
+    persistent HTTP cache where possible, see
+    :class:`~understatapi.http_cache.CachingHTTPAdapter`
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        store: Union[str, SQLiteCacheStore],
+        max_age: Optional[float] = None,
+        policy: Optional[CachePolicy] = None,
+        session: Optional[requests.Session] = None,
+        base_url: str = BASE_URL,
+        **kwargs: Any,
+    ) -> None:
+        """
+        :param store: The cache store, or the path of its database
+        :param max_age: Number of seconds for which a stored response is
+            served without revalidation, ``None`` to always revalidate
+        :param policy: Decides which responses can never change
+        :param session: The session to send requests with, ``None`` to
+            create a :class:`~understatapi.session.SessionPool`
+        :param base_url: The url the cache is used for
+        :param kwargs: Keyword arguments to pass to
+            :class:`~understatapi.throttle.ThrottledHTTPAdapter`
+        """
+        if isinstance(store, str):
+            store = SQLiteCacheStore(store)
+        adapter = CachingHTTPAdapter(
+            store, max_age=max_age, policy=policy, **kwargs
+        )
+        super().__init__(session, adapter, base_url)
+
+
+class ReplayTransport(RequestsTransport):
+    """
+    Send requests with a ``requests`` session, recording the responses or
+    replaying recorded ones, see :class:`~understatapi.replay.RecordingAdapter`
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        store: Union[str, RecordingStore],
+        mode: str = "replay",
+        session: Optional[requests.Session] = None,
+        base_url: str = BASE_URL,
+        **kwargs: Any,
+    ) -> None:
+        """
+        :param store: The recordings, or the directory holding them
+        :param mode: One of ``record``, ``replay`` or ``auto``
+        :param session: The session to send requests with, ``None`` to
+            create a :class:`~understatapi.session.SessionPool`
+        :param base_url: The url the recordings are used for
+        :param kwargs: Keyword arguments to pass to
+            :class:`~understatapi.throttle.ThrottledHTTPAdapter`
+        """
+        if isinstance(store, str):
+            store = RecordingStore(store)
+        adapter = RecordingAdapter(store, mode=mode, **kwargs)
+        super().__init__(session, adapter, base_url)
+
+
+class HTTP2Transport(Transport):
+    """
+    Send requests over HTTP/2 with an ``httpx.Client``. Requests made at
+    once, e.g. by a batch call on an endpoint, share a handful of
+    connections as concurrent streams, rather than each thread using a
+    connection of its own, and repeated headers are compressed. This
+    suits fetching many small payloads, such as the data of thousands of
+    matches. Requires ``httpx`` and ``h2``, install them with
+    ``pip install understatapi[http2]``.
+
+    Rate limits, retries and the persistent cache are ``requests``
+    adapters, so do not apply to requests sent with this transport.
+
+    :Example:
+
+    .. code-block::
+
+        from understatapi import UnderstatClient
+        from understatapi.transport import HTTP2Transport
+
+        with UnderstatClient(transport=HTTP2Transport()) as understat:
+            shots = understat.match(match_ids).get_shot_data(max_workers=32)
+
+    :attr client: httpx.Client: The client requests are sent with
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 4,
+        prior_knowledge: bool = False,
+        timeout: Optional[float] = 30.0,
+        client: Optional["httpx.Client"] = None,
+    ) -> None:
+        """
+        :param max_connections: Maximum number of connections to open,
+            each of which carries many requests at once
+        :param prior_knowledge: Speak HTTP/2 without TLS from the start,
+            e.g. to a :class:`~understatapi.replay.StandInServer` started
+            with ``http2=True``, rather than agreeing on it with TLS
+        :param timeout: Number of seconds to wait for a response
+        :param client: The client to send requests with, ``None`` to
+            create one from the other parameters
+        """
+        if httpx is None:  # pragma: no cover
+            raise ImportError(
+                "HTTP2Transport requires httpx, install it with "
+                "``pip install understatapi[http2]``"
+            )
+        if client is None:
+            try:
+                client = httpx.Client(
+                    http1=not prior_knowledge,
+                    http2=True,
+                    limits=httpx.Limits(max_connections=max_connections),
+                    timeout=timeout,
+                )
+            except ImportError as err:  # pragma: no cover
+                raise ImportError(
+                    "HTTP2Transport requires h2, install it with "
+                    "``pip install understatapi[http2]``"
+                ) from err
+        self.client = client
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__}({self.client!r})>"
+
+    def get(self, url: str, **kwargs: Any) -> requests.Response:
+        # Bodies are read in full, understat's payloads are small
+        kwargs.pop("stream", None)
+        follow_redirects = kwargs.pop("allow_redirects", True)
+        res = self.client.get(url, follow_redirects=follow_redirects, **kwargs)
+        response = requests.Response()
+        response.status_code = res.status_code
+        response.reason = res.reason_phrase
+        response.url = str(res.url)
+        response.headers = CaseInsensitiveDict(res.headers)
+        # httpx has already decoded any compression
+        response.headers.pop("Content-Encoding", None)
+        response.raw = io.BytesIO(res.content)
+        setattr(response, "http_version", res.http_version)
+        return response
+
+    def close(self) -> None:
+        self.client.close()
+
+
+class MemoryTransport(Transport):
+    """
+    Answer requests from payloads held in memory, keyed by the path of the
+    request, e.g. ``getLeagueData/EPL/2021``. Requests for any other path
+    get a ``404``.
+
+    :attr requests: int: Number of requests which have been answered
+    """
+
+    def __init__(self, payloads: Mapping[str, bytes]) -> None:
+        """
+        :param payloads: The body of the response to each path
+        """
+        self.payloads: Dict[str, bytes] = dict(payloads)
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__}(payloads={len(self.payloads)})>"
+
+    def get(self, url: str, **kwargs: Any) -> requests.Response:
+        with self._lock:
+            self.requests += 1
+        if kwargs.get("params"):
+            url = str(
+                requests.Request("GET", url, params=kwargs["params"])
+                .prepare()
+                .url
+            )
+        content = self.payloads.get(RecordingStore.key(url))
+        response = requests.Response()
+        response.url = url
+        response.encoding = "utf-8"
+        if content is None:
+            response.status_code = 404
+            response.reason = "Not Found"
+            content = b""
+        else:
+            response.status_code = 200
+            response.reason = "OK"
+            response.headers = CaseInsensitiveDict(
+                {"Content-Type": "application/json"}
+            )
+        response.raw = io.BytesIO(content)
+        return response
@@ -0,0 +1,426 @@
+"""
+A local SQLite warehouse for answering queries offline.
+
+:class:`Warehouse` ingests the league, team, player and match payloads
+returned by understat into normalized tables, one row per fixture,
+player season, player match, shot and roster entry, linked by
+``player_id`` and ``match_id``. The tables are indexed on players,
+matches, teams and seasons, so a question such as "every shot taken by a
+player in 2021" is answered locally without making a request.
+
+When an :class:`~understatapi.api.UnderstatClient` is created with a
+``warehouse``, every payload it downloads is ingested automatically
+"""
+
+import sqlite3
+import threading
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+)
+from .models import (
+    Fixture,
+    Player,
+    PlayerMatch,
+    RosterEntry,
+    Shot,
+    field_types,
+    iter_records,
+)
+
+SQL_TYPES = {int: "INTEGER", float: "REAL", bool: "INTEGER", str: "TEXT"}
+
+# Columns which are not part of a record, but are known from the request
+CONTEXT_TYPES = {
+    "league": "TEXT",
+    "season": "INTEGER",
+    "player_id": "INTEGER",
+    "match_id": "INTEGER",
+}
+
+
+class Table(NamedTuple):
+    """
+    How the records of one entity are stored
+
+    :attr record_type: The record class describing each row
+    :attr id_column: The name of the column holding the record's ``id``
+    :attr context: Columns which are filled in from the request
+    :attr key: The columns of the primary key
+    :attr indexes: The columns of each index
+    :attr team_columns: The columns matched by the ``team`` filter
+    :attr exclude: Fields of the record which are not stored
+    """
+
+    record_type: type
+    id_column: str
+    context: Tuple[str, ...]
+    key: Tuple[str, ...]
+    indexes: Tuple[Tuple[str, ...], ...]
+    team_columns: Tuple[str, ...] = ()
+    exclude: Tuple[str, ...] = ()
+
+
+TABLES = {
+    "fixtures": Table(
+        Fixture,
+        id_column="match_id",
+        context=("league", "season"),
+        key=("match_id",),
+        indexes=(("season",), ("h_title",), ("a_title",)),
+        team_columns=("h_title", "a_title"),
+        # These describe the fixture from one team's point of view
+        exclude=("side", "result"),
+    ),
+    "players": Table(
+        Player,
+        id_column="player_id",
+        context=("league", "season"),
+        key=("player_id", "season", "team_title"),
+        indexes=(("season",), ("team_title",)),
+        team_columns=("team_title",),
+    ),
+    "player_matches": Table(
+        PlayerMatch,
+        id_column="match_id",
+        context=("player_id",),
+        key=("player_id", "match_id"),
+        indexes=(("match_id",), ("season",), ("h_team",), ("a_team",)),
+        team_columns=("h_team", "a_team"),
+    ),
+    "shots": Table(
+        Shot,
+        id_column="shot_id",
+        context=(),
+        key=("shot_id",),
+        indexes=(
+            ("player_id", "season"),
+            ("match_id",),
+            ("season",),
+            ("h_team",),
+            ("a_team",),
+        ),
+        team_columns=("h_team", "a_team"),
+    ),
+    "rosters": Table(
+        RosterEntry,
+        id_column="roster_id",
+        context=("match_id",),
+        key=("roster_id",),
+        indexes=(("player_id",), ("match_id",), ("team_id",)),
+    ),
+}
+
+
+def table_columns(table: Table) -> Tuple[Tuple[str, str], ...]:
+    """
+    Get the name and SQL type of each column of a table
+
+    :param table: One of :data:`TABLES`
+    """
+    cols = [(name, CONTEXT_TYPES[name]) for name in table.context]
+    for name, field_type in field_types(table.record_type):
+        if name in table.exclude:
+            continue
+        cols.append(
+            (table.id_column if name == "id" else name, SQL_TYPES[field_type])
+        )
+    return tuple(cols)
+
+
+def _schema(name: str, table: Table) -> List[str]:
+    """Get the statements which create a table and its indexes"""
+    definitions = [
+        f"{column} {sql_type}" for column, sql_type in table_columns(table)
+    ]
+    definitions.append(f"PRIMARY KEY ({', '.join(table.key)})")
+    statements = [
+        f"CREATE TABLE IF NOT EXISTS {name} ({', '.join(definitions)})"
+    ]
+    for index in table.indexes:
+        statements.append(
+            f"CREATE INDEX IF NOT EXISTS {name}_{'_'.join(index)} "
+            f"ON {name} ({', '.join(index)})"
+        )
+    return statements
+
+
+def _upsert(name: str, table: Table) -> str:
+    """
+    Get the statement which inserts a row, or fills in the missing values
+    of a row which is already stored, e.g. the league of a player season
+    ingested from a team's payload
+    """
+    names = [column for column, _ in table_columns(table)]
+    updates = ", ".join(
+        f"{column} = COALESCE(excluded.{column}, {column})"
+        for column in names
+        if column not in table.key
+    )
+    return (
+        f"INSERT INTO {name} ({', '.join(names)}) "
+        f"VALUES ({', '.join('?' for _ in names)}) "
+        f"ON CONFLICT ({', '.join(table.key)}) DO UPDATE SET {updates}"
+    )
+
+
+def _rows(
+    table: Table, rows: Iterable[Dict[str, Any]], **context: Any
+) -> Iterator[Tuple[Any, ...]]:
+    """Convert the dictionaries returned by understat to rows of a table"""
+    fields = [
+        index
+        for index, (name, _) in enumerate(field_types(table.record_type))
+        if name not in table.exclude
+    ]
+    prefix = tuple(context.get(name) for name in table.context)
+    record: Tuple[Any, ...]
+    for record in iter_records(table.record_type, rows):
+        yield prefix + tuple(record[index] for index in fields)
+
+
+def _match_fixture(tmpl: Dict[str, Any]) -> Dict[str, Any]:
+    """Describe the fixture of a match in the same way as a league does"""
+    return {
+        "id": tmpl.get("id"),
+        "isResult": True,
+        "datetime": tmpl.get("date"),
+        "h": {"id": tmpl.get("h"), "title": tmpl.get("team_h")},
+        "a": {"id": tmpl.get("a"), "title": tmpl.get("team_a")},
+        "goals": {"h": tmpl.get("h_goals"), "a": tmpl.get("a_goals")},
+        "xG": {"h": tmpl.get("h_xg"), "a": tmpl.get("a_xg")},
+        "forecast": {
+            "w": tmpl.get("h_w"),
+            "d": tmpl.get("h_d"),
+            "l": tmpl.get("h_l"),
+        },
+    }
+
+
+class Warehouse:
+    """
+    Store understat payloads in normalized, indexed SQLite tables. Safe to
+    share between threads.
+
+    :Example:
+
+    .. doctest::
+
+        >>> from understatapi.warehouse import Warehouse
+        >>> warehouse = Warehouse(":memory:")
+        >>> warehouse.ingest("getPlayerData/647", {
+        ...     "matches": [],
+        ...     "shots": [{"id": "1", "player_id": "647", "season": "2021",
+        ...                "xG": "0.25", "result": "Goal"}],
+        ... })
+        True
+        >>> [shot["xG"] for shot in warehouse.query("shots", player_id=647)]
+        [0.25]
+        >>> warehouse.close()
+
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        :param path: Path to the SQLite database file, created if it does
+            not exist
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            for name, table in TABLES.items():
+                for statement in _schema(name, table):
+                    self._conn.execute(statement)
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__}({self.path!r})>"
+
+    def _insert(
+        self,
+        conn: sqlite3.Connection,
+        name: str,
+        rows: Iterable[Dict[str, Any]],
+        **context: Any,
+    ) -> None:
+        table = TABLES[name]
+        conn.executemany(_upsert(name, table), _rows(table, rows, **context))
+
+    def ingest_league(
+        self, league: str, season: str, data: Dict[str, Any]
+    ) -> None:
+        """
+        Store the fixtures and player seasons of a league's payload
+
+        :param league: Name of the league
+        :param season: The season
+        :param data: The payload of ``getLeagueData/<league>/<season>``
+        """
+        context = {"league": league, "season": int(season)}
+        with self._lock, self._conn:
+            self._insert(
+                self._conn, "fixtures", data.get("dates", []), **context
+            )
+            self._insert(
+                self._conn, "players", data.get("players", []), **context
+            )
+
+    def ingest_team(self, season: str, data: Dict[str, Any]) -> None:
+        """
+        Store the fixtures and player seasons of a team's payload
+
+        :param season: The season
+        :param data: The payload of ``getTeamData/<team>/<season>``
+        """
+        context = {"season": int(season)}
+        with self._lock, self._conn:
+            self._insert(
+                self._conn, "fixtures", data.get("dates", []), **context
+            )
+            self._insert(
+                self._conn, "players", data.get("players", []), **context
+            )
+
+    def ingest_player(self, player_id: str, data: Dict[str, Any]) -> None:
+        """
+        Store the matches and shots of a player's payload
+
+        :param player_id: Id of the player
+        :param data: The payload of ``getPlayerData/<player_id>``
+        """
+        with self._lock, self._conn:
+            self._insert(
+                self._conn,
+                "player_matches",
+                data.get("matches", []),
+                player_id=int(player_id),
+            )
+            self._insert(self._conn, "shots", data.get("shots", []))
+
+    def ingest_match(self, match_id: str, data: Dict[str, Any]) -> None:
+        """
+        Store the fixture, shots and rosters of a match's payload
+
+        :param match_id: Id of the match
+        :param data: The payload of ``getMatchData/<match_id>``
+        """
+        tmpl = data.get("tmpl") or {}
+        shots = data.get("shots") or {}
+        rosters = data.get("rosters") or {}
+        with self._lock, self._conn:
+            if tmpl:
+                self._insert(
+                    self._conn,
+                    "fixtures",
+                    [_match_fixture(tmpl)],
+                    league=tmpl.get("league"),
+                    season=tmpl.get("season"),
+                )
+            self._insert(
+                self._conn, "shots", shots.get("h", []) + shots.get("a", [])
+            )
+            self._insert(
+                self._conn,
+                "rosters",
+                [
+                    entry
+                    for side in ("h", "a")
+                    for entry in (rosters.get(side) or {}).values()
+                ],
+                match_id=int(match_id),
+            )
+
+    def ingest(self, endpoint: str, data: Dict[str, Any]) -> bool:
+        """
+        Store an AJAX payload, working out what it describes from its
+        endpoint path
+
+        :param endpoint: The AJAX endpoint path, e.g.
+            ``getLeagueData/EPL/2021``
+        :param data: The decoded payload
+        :return: Whether the payload was stored
+        """
+        name, *args = endpoint.split("?")[0].split("/")
+        if name == "getLeagueData" and len(args) == 2:
+            self.ingest_league(args[0], args[1], data)
+        elif name == "getTeamData" and len(args) == 2:
+            self.ingest_team(args[1], data)
+        elif name == "getPlayerData" and len(args) == 1:
+            self.ingest_player(args[0], data)
+        elif name == "getMatchData" and len(args) == 1:
+            self.ingest_match(args[0], data)
+        else:
+            return False
+        return True
+
+    def query(
+        self,
+        table: str,
+        order_by: Optional[Sequence[str]] = None,
+        **filters: Any,
+    ) -> List[Dict[str, Any]]:
+        """
+        Select rows from one of :data:`TABLES`
+
+        :param table: The name of the table, one of ``fixtures``,
+            ``players``, ``player_matches``, ``shots`` or ``rosters``
+        :param order_by: The columns to sort by, defaults to the primary key
+        :param filters: Values which columns must equal, a list or tuple
+            matches any of its values. ``team`` matches the name of either
+            team, e.g. ``team="Manchester_United"``
+        :return: The rows, as dictionaries keyed by column name
+        """
+        if table not in TABLES:
+            raise ValueError(
+                f"{table} is not a valid table, choose from {list(TABLES)}"
+            )
+        spec = TABLES[table]
+        names = [column for column, _ in table_columns(spec)]
+        conditions = []
+        params: List[Any] = []
+        team = filters.pop("team", None)
+        if team is not None:
+            if not spec.team_columns:
+                raise ValueError(f"{table} cannot be filtered by team")
+            team = team.replace("_", " ")
+            conditions.append(
+                "("
+                + " OR ".join(f"{column} = ?" for column in spec.team_columns)
+                + ")"
+            )
+            params.extend(team for _ in spec.team_columns)
+        for column, value in filters.items():
+            if column not in names:
+                raise ValueError(f"{table} has no column {column}")
+            if isinstance(value, (list, tuple)):
+                conditions.append(
+                    f"{column} IN ({', '.join('?' for _ in value)})"
+                )
+                params.extend(value)
+            else:
+                conditions.append(f"{column} = ?")
+                params.append(value)
+        order = list(order_by) if order_by is not None else list(spec.key)
+        invalid = set(order) - set(names)
+        if invalid:
+            raise ValueError(f"{table} has no columns {sorted(invalid)}")
+        sql = f"SELECT {', '.join(names)} FROM {table}"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += f" ORDER BY {', '.join(order)}"
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [dict(zip(names, row)) for row in rows]
+
+    def close(self) -> None:
+        """Close the database connection"""
+        with self._lock:
+            self._conn.close()